@@ -0,0 +1,101 @@
+"""Measures singleton resolution under thread contention.
+
+Run with: python -m benchmarks.contention [--threads 8] [--iterations 20000]
+"""
+import argparse
+import threading
+import time
+from typing import Dict
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+
+loader = ClassLoader()
+constructions: Dict[str, int] = {}
+constructions_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with constructions_lock:
+        constructions[name] = constructions.get(name, 0) + 1
+
+
+@autowired(class_loader=loader)
+class Config:
+    def __init__(self) -> None:
+        _count("Config")
+
+
+@autowired(class_loader=loader)
+class Service:
+    def __init__(self, config: Config, name: str = "default") -> None:
+        _count("Service")
+        time.sleep(0.001)
+        self.config = config
+        self.name = name
+
+
+def _run(threads: int, target) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        target(index)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+
+    return time.perf_counter() - start
+
+
+def run(threads: int, iterations: int) -> Dict[str, float]:
+    """Runs the contention benchmark.
+
+    Args:
+        threads (int): The number of concurrent threads.
+        iterations (int): The number of lookups per thread.
+
+    Returns:
+        Dict[str, float]: The measured results.
+    """
+    Service()  # type: ignore[call-arg]
+
+    def hits(_: int) -> None:
+        for _ in range(iterations):
+            Service()  # type: ignore[call-arg]
+
+    hit_seconds = _run(threads, hits)
+
+    def misses(index: int) -> None:
+        for i in range(100):
+            Service(name=f"service-{i}")  # type: ignore[call-arg]
+
+    miss_seconds = _run(threads, misses)
+
+    return {
+        "threads": threads,
+        "hit_lookups_per_second": threads * iterations / hit_seconds,
+        "miss_seconds": miss_seconds,
+        "service_constructions": constructions["Service"],
+        "expected_service_constructions": 101,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=20000)
+    arguments = parser.parse_args()
+
+    for name, value in run(arguments.threads, arguments.iterations).items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""The benchmark suite of smarti. The results are written as JSON, so releases can be compared.
+
+Run with: python -m benchmarks.suite [--output results.json] [--repeat 5] [--quick]
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import types
+from typing import Any, Callable, Dict, List
+
+import smarti
+from benchmarks import contention
+from smarti.class_loader import ClassLoader
+from smarti.instance_storage import InstanceStorage
+
+DEPTHS = [10, 50, 100, 250, 500]
+WIDTHS = [10, 100, 300]
+QUICK_DEPTHS = [10, 50]
+QUICK_WIDTHS = [10, 100]
+
+_generated_modules = 0
+
+
+def _build_module(source: str) -> types.ModuleType:
+    """Executes generated classes in a fresh module, so annotations and class lookups resolve like in user code."""
+    global _generated_modules
+    _generated_modules += 1
+
+    name = f"benchmarks._generated_{_generated_modules}"
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    module.__dict__["loader"] = ClassLoader()
+    exec(compile(source, name, "exec"), module.__dict__)
+
+    return module
+
+
+def _chain_source(depth: int, decorated: bool) -> str:
+    decorator = "@autowired(class_loader=loader, as_singleton=False)\n" if decorated else ""
+    lines = ["from smarti import autowired", "", f"{decorator}class Node0:", "    pass", ""]
+    for i in range(1, depth):
+        lines += [
+            f"{decorator}class Node{i}:",
+            f"    def __init__(self, dependency: Node{i - 1}) -> None:",
+            "        self.dependency = dependency",
+            "",
+        ]
+
+    lines += [
+        "@autowired(class_loader=loader, as_singleton=False)",
+        "class Root:",
+        f"    def __init__(self, dependency: Node{depth - 1}) -> None:",
+        "        self.dependency = dependency",
+    ]
+    return "\n".join(lines)
+
+
+def _wide_source(width: int) -> str:
+    lines = ["from smarti import autowired", ""]
+    for i in range(width):
+        lines += ["@autowired(class_loader=loader)", f"class Leaf{i}:", "    pass", ""]
+
+    parameters = ", ".join(f"p{i}: Leaf{i}" for i in range(width))
+    lines += [
+        "@autowired(class_loader=loader, as_singleton=False)",
+        "class Root:",
+        f"    def __init__(self, {parameters}) -> None:",
+        "        pass",
+    ]
+    return "\n".join(lines)
+
+
+def measure(function: Callable[[], Any], number: int, repeat: int) -> Dict[str, float]:
+    """Measures a function like timeit: the function is called number times per repetition.
+
+    Args:
+        function (Callable[[], Any]): The function to measure.
+        number (int): The calls per repetition.
+        repeat (int): The number of repetitions.
+
+    Returns:
+        Dict[str, float]: The best and median time per call in microseconds and the number of calls per repetition.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number * 1e6)
+
+    return {
+        "number": number,
+        "best_us": min(timings),
+        "median_us": statistics.median(timings),
+    }
+
+
+def bench_deep_chains(depths: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for depth in depths:
+        module = _build_module(_chain_source(depth, True))
+        number = max(1, 2000 // depth)
+
+        results[f"deep_chain_{depth}"] = measure(module.Root, number, repeat)
+
+        module.loader.freeze()
+        results[f"deep_chain_{depth}_frozen"] = measure(module.Root, number, repeat)
+
+    return results
+
+
+def bench_wide_graphs(widths: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for width in widths:
+        module = _build_module(_wide_source(width))
+        module.Root()
+
+        results[f"wide_graph_{width}"] = measure(module.Root, max(1, 2000 // width), repeat)
+
+    return results
+
+
+def bench_singletons(repeat: int) -> Dict[str, Dict[str, float]]:
+    storage = InstanceStorage()
+    keys = [{"name": f"instance-{i}", "options": {"size": i}} for i in range(1000)]
+    for kwargs in keys:
+        storage.get_or_create(object, [], kwargs, object)
+
+    position = [0]
+
+    def hit() -> None:
+        storage.get_or_create(object, [], keys[position[0] % 1000], object)
+        position[0] += 1
+
+    def miss() -> None:
+        storage.get_or_create(object, [], {"name": f"miss-{position[0]}", "options": {"size": 0}}, object)
+        position[0] += 1
+
+    return {
+        "singleton_hit": measure(hit, 10000, repeat),
+        "singleton_miss": measure(miss, 2000, repeat),
+    }
+
+
+def bench_default_singleton(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Compares the hit of an argument-less singleton, e.g. Service(), with a plain attribute access."""
+    module = _build_module("\n".join([
+        "from smarti import autowired",
+        "",
+        "@autowired(class_loader=loader)",
+        "class Service:",
+        "    pass",
+    ]))
+    module.Service()
+    holder = types.SimpleNamespace(service=module.Service())
+
+    return {
+        "default_singleton_hit": measure(module.Service, 100000, repeat),
+        "attribute_access": measure(lambda: holder.service, 100000, repeat),
+    }
+
+
+def bench_implicit_wiring(depths: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for depth in depths:
+        module = _build_module(_chain_source(depth, False))
+        results[f"implicit_chain_{depth}"] = measure(module.Root, max(1, 2000 // depth), repeat)
+
+    return results
+
+
+def run(quick: bool = False, repeat: int = 5) -> Dict[str, Any]:
+    """Runs all benchmarks.
+
+    Args:
+        quick (bool, optional): Only run the small graphs. Defaults to False.
+        repeat (int, optional): The repetitions per benchmark. Defaults to 5.
+
+    Returns:
+        Dict[str, Any]: The environment and the results per benchmark.
+    """
+    depths = QUICK_DEPTHS if quick else DEPTHS
+    widths = QUICK_WIDTHS if quick else WIDTHS
+
+    # every level of a chain needs a few frames
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, max(depths) * 20 + 1000))
+    try:
+        results: Dict[str, Any] = {}
+        results.update(bench_deep_chains(depths, repeat))
+        results.update(bench_wide_graphs(widths, repeat))
+        results.update(bench_singletons(repeat))
+        results.update(bench_default_singleton(repeat))
+        results.update(bench_implicit_wiring(depths, repeat))
+        results["contention"] = contention.run(8, 2000 if quick else 20000)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    return {
+        "smarti": smarti.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="The JSON file to write. Defaults to stdout.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="Only run the small graphs.")
+    arguments = parser.parse_args()
+
+    report = json.dumps(run(arguments.quick, arguments.repeat), indent=2)
+    if arguments.output is None:
+        print(report)
+    else:
+        with open(arguments.output, "w") as file:
+            file.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 set -e
 
-flake8 ./smarti/ ./tests/ --count --show-source --statistics --ignore=E501,W503
-mypy ./smarti/ ./tests/
+flake8 ./smarti/ ./tests/ ./benchmarks/ --count --show-source --statistics --ignore=E501,W503
+mypy ./smarti/ ./tests/ ./benchmarks/
 pytest
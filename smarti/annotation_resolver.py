@@ -0,0 +1,126 @@
+import builtins
+import inspect
+import sys
+from threading import Lock
+from typing import Any, Callable, Dict, ForwardRef, List, Tuple, get_args, get_origin, get_type_hints
+
+from smarti.lazy import Lazy
+
+_MISSING = object()
+
+
+class AnnotationResolver:
+    """Resolves the parameter annotations of callables, including string annotations (PEP 563 and quoted forward references).
+    Plain names are looked up in the module globals, other expressions are evaluated once per module and cached.
+    The cache of a module is dropped when the module is reloaded. Names which are not defined yet (e.g. classes defined later in the module)
+    are reported as unresolved instead of failing the whole callable, so they can be resolved later.
+    """
+
+    def __init__(self) -> None:
+        self._modules: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._lock = Lock()
+
+    def resolve(self, callable: Callable) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+        """Resolves the parameter annotations of a callable.
+
+        Args:
+            callable (Callable): The callable.
+
+        Returns:
+            Tuple[Dict[str, Any], Tuple[str, ...]]: The resolved annotations by parameter name and the names of the parameters
+                whose annotations reference names which are not defined yet.
+        """
+        if not inspect.isfunction(callable):
+            hints = get_type_hints(callable)
+            hints.pop("return", None)
+            return hints, ()
+
+        hints = {}
+        unresolved: List[str] = []
+        module = callable.__module__
+        globalns = callable.__globals__
+        for name, annotation in callable.__annotations__.items():
+            if name == "return":
+                continue
+
+            try:
+                hints[name] = self._resolve_annotation(module, globalns, annotation)
+            except NameError:
+                unresolved.append(name)
+
+        return hints, tuple(unresolved)
+
+    def evaluate(self, module: str, globalns: Dict[str, Any], expression: str) -> Any:
+        """Evaluates a string annotation in the globals of a module.
+
+        Args:
+            module (str): The name of the module.
+            globalns (Dict[str, Any]): The globals of the module.
+            expression (str): The annotation, e.g. "Service" or "Lazy[Service]".
+
+        Raises:
+            NameError: If the annotation references a name which is not defined (yet).
+
+        Returns:
+            Any: The value of the annotation.
+        """
+        if expression.isidentifier():
+            # plain names are always looked up, so they are up to date, even after the name is rebound
+            value = globalns.get(expression, _MISSING)
+            if value is _MISSING:
+                value = getattr(builtins, expression, _MISSING)
+            if value is _MISSING:
+                raise NameError(f"name '{expression}' is not defined")
+
+            return value
+
+        cache = self._cache_of(module)
+        value = cache.get(expression, _MISSING)
+        if value is _MISSING:
+            # annotations are code of the module, evaluated like typing.get_type_hints does
+            value = eval(expression, globalns)
+            cache[expression] = value
+
+        return value
+
+    def reset_lock(self) -> None:
+        """Replaces the lock guarding the module caches, e.g. in a forked child. The cached values are kept."""
+        self._lock = Lock()
+
+    def clear(self) -> None:
+        """Drops the cached values of all modules."""
+        with self._lock:
+            self._modules.clear()
+
+    def _resolve_annotation(self, module: str, globalns: Dict[str, Any], annotation: Any) -> Any:
+        if isinstance(annotation, ForwardRef):
+            annotation = annotation.__forward_arg__
+        if isinstance(annotation, str):
+            annotation = self.evaluate(module, globalns, annotation)
+
+        # Annotated[Service, ...] is injected as Service, like get_type_hints does without include_extras
+        if hasattr(annotation, "__metadata__"):
+            return self._resolve_annotation(module, globalns, annotation.__origin__)
+
+        # Lazy["Service"] keeps the forward reference as argument
+        if get_origin(annotation) is Lazy:
+            argument = get_args(annotation)[0]
+            resolved = self._resolve_annotation(module, globalns, argument)
+            if resolved is not argument:
+                return Lazy[resolved]  # type: ignore
+
+        return annotation
+
+    def _cache_of(self, module: str) -> Dict[str, Any]:
+        """Gets the cache of a module. importlib.reload replaces the __spec__ of a module, which invalidates the cache."""
+        generation = getattr(sys.modules.get(module, None), "__spec__", None)
+        entry = self._modules.get(module, None)
+        if entry is not None and entry[0] is generation:
+            return entry[1]
+
+        with self._lock:
+            entry = self._modules.get(module, None)
+            if entry is None or entry[0] is not generation:
+                entry = self._modules[module] = (generation, {})
+
+            return entry[1]
@@ -0,0 +1,229 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, MutableMapping, Optional, Tuple, Type, TypeVar
+
+import smarti.constants as cst
+from smarti.autowire_options import get_options, original_constructors
+from smarti.class_loader_flags import ClassLoaderFlags
+from smarti.exceptions import ScopeNotActiveException
+
+T = TypeVar("T")
+
+
+class AsyncResolver:
+    """Resolves dependency graphs inside an event loop. Independent dependencies are constructed concurrently with asyncio.gather.
+    Singletons are never created while holding a lock; concurrent awaiters of the same key share one in-flight construction.
+    """
+
+    def __init__(self, class_loader: Any) -> None:
+        self._class_loader = class_loader
+        self._check_autowire = class_loader._check_autowire
+        self._factories: Dict[Type, Tuple[Callable[..., Awaitable], bool]] = {}
+        self._in_flight: MutableMapping[asyncio.AbstractEventLoop, Dict[Tuple[int, Hashable], asyncio.Future]] = weakref.WeakKeyDictionary()
+
+    def reset_after_fork(self) -> None:
+        """Forgets the constructions in flight, e.g. in a forked child, where the event loops of the parent do not run."""
+        self._in_flight = weakref.WeakKeyDictionary()
+
+    def register_factory(self, type_: Type, factory: Callable[..., Awaitable], as_singleton: bool = True) -> None:
+        """Registers an async factory of a type. The annotated parameters of the factory are autowired like constructor parameters.
+
+        Args:
+            type_ (Type): The type the factory creates.
+            factory (Callable[..., Awaitable]): The async factory.
+            as_singleton (bool, optional): True if the created instances are singletons. Defaults to True.
+        """
+        self._factories[type_] = (factory, as_singleton)
+
+    async def resolve(self, type_: Type[T], kwargs: Dict[str, Any], as_singleton: bool, seen_types: List[Type]) -> T:
+        """Resolves an instance of a type and all its dependencies.
+
+        Args:
+            type_ (Type[T]): The type to resolve.
+            kwargs (Dict[str, Any]): The custom arguments of the instance.
+            as_singleton (bool): True if singletons should be used for classes which are not autowired.
+            seen_types (List[Type]): The types of this depencency chain, including type_.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+            ScopeNotActiveException: If a scoped class is resolved outside of its scope.
+
+        Returns:
+            T: The instance.
+        """
+        class_loader = self._class_loader
+        options = get_options(type_)
+
+        if options is not None and options.class_loader is not class_loader:
+            return await options.class_loader._async_resolver.resolve(type_, kwargs, as_singleton, seen_types)
+
+        scope = None
+        registered = self._factories.get(type_, None)
+        if registered is not None:
+            factory, as_singleton = registered
+            init_kwargs = kwargs
+            if options is not None:
+                init_kwargs = {**options.annotation_args, **kwargs}
+
+            async def build() -> Any:
+                arguments = await self._resolve_arguments(
+                    type_, factory, init_kwargs, as_singleton, seen_types, check_flags=False)
+                return await self._run_hook(await factory(**arguments))
+        else:
+            if options is not None:
+                scope = options.scope
+                as_singleton = options.as_singleton and scope is None
+                init = getattr(type_, cst.UNMODIFIED_INIT)
+                new = getattr(type_, cst.UNMODIFIED_NEW)
+                init_kwargs = {**options.annotation_args, **kwargs}
+            else:
+                self._check_autowire.ensure_unwired_allowed(class_loader._flags)
+                new, init = original_constructors(type_)
+                init_kwargs = kwargs
+
+            async def build() -> Any:
+                arguments = await self._resolve_arguments(type_, init, init_kwargs, as_singleton, seen_types)
+                instance = new(type_)
+                init(instance, **arguments)
+                return await self._run_hook(instance)
+
+        storage = class_loader._instance_storage
+        if scope is not None:
+            active_scope = class_loader.get_active_scope(scope)
+            if active_scope is None:
+                raise ScopeNotActiveException(
+                    f"Cannot create {type_} outside of an active {scope} scope")
+
+            key = storage.generate_key(type_, [], kwargs)
+            return await self._single_flight(
+                active_scope, key, build, lambda: active_scope.get(key), lambda i: active_scope.put(key, i))
+
+        if as_singleton:
+            key = storage.generate_key(type_, [], kwargs)
+            return await self._single_flight(
+                storage,
+                key,
+                build,
+                lambda: storage.get_by_key(type_, key),
+                lambda i: storage.add_or_get_by_key(type_, key, i),
+            )
+
+        return await build()
+
+    async def _resolve_arguments(
+        self,
+        type_: Type,
+        function: Callable,
+        kwargs: Dict[str, Any],
+        as_singleton: bool,
+        seen_types: List[Type],
+        check_flags: bool = True,
+    ) -> Dict[str, Any]:
+        """Resolves the arguments of a callable. All dependencies are resolved concurrently."""
+        class_loader = self._class_loader
+        plan = self._check_autowire.get_plan(function)
+        flags = class_loader._flags if check_flags else ClassLoaderFlags.NO_FLAGS
+        if not self._check_autowire.can_autowire_plan(plan, flags, type_, seen_types, kwargs):
+            raise RuntimeError(f"Cannot Autowire function {function}")
+
+        arguments, injected = plan.bind(kwargs, function)
+        names = []
+        dependencies = []
+        for parameter in injected:
+            name = parameter.name
+            if parameter.lazy:
+                arguments[name] = class_loader._lazy_dependency(parameter.type_, name, kwargs, as_singleton)
+                continue
+
+            dependency = class_loader._load_class_type(parameter.type_)
+            names.append(name)
+            dependencies.append(self.resolve(
+                dependency,
+                class_loader._get_kwargs_for_argument(name, kwargs),
+                as_singleton,
+                [*seen_types, dependency],
+            ))
+
+        if dependencies:
+            arguments.update(zip(names, await asyncio.gather(*dependencies)))
+
+        return arguments
+
+    async def _run_hook(self, instance: T) -> T:
+        hook = getattr(instance, cst.ASYNC_INIT_HOOK, None)
+        if hook is not None:
+            await hook()
+
+        return instance
+
+    async def _single_flight(
+        self,
+        container: Any,
+        key: Hashable,
+        build: Callable[[], Awaitable[T]],
+        lookup: Callable[[], Optional[T]],
+        store: Callable[[T], T],
+    ) -> T:
+        """Returns the stored instance or builds it. Concurrent awaiters of the same key await the same construction.
+        The construction runs in its own task, so cancelling one awaiter, even the first, does not cancel the others.
+        """
+        instance = lookup()
+        if instance is not None:
+            return instance
+
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get(loop, None)
+        if in_flight is None:
+            in_flight = self._in_flight.setdefault(loop, {})
+
+        flight_key = (id(container), key)
+        future = in_flight.get(flight_key, None)
+        if future is None:
+            future = in_flight[flight_key] = loop.create_task(self._construct(in_flight, flight_key, build, store))
+            # the exception is raised by the awaiters, if all of them were cancelled nobody retrieves it
+            future.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get(loop, None)
+        if in_flight is None:
+            in_flight = self._in_flight.setdefault(loop, {})
+
+        flight_key = (id(container), key)
+        future = in_flight.get(flight_key, None)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        in_flight[flight_key] = future
+        try:
+            instance = store(await build())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # the exception is raised here, waiters are optional
+            future.exception()
+            raise
+        else:
+            future.set_result(instance)
+        finally:
+            in_flight.pop(flight_key, None)
+
+        return instance
+
+    async def _construct(
+        self,
+        in_flight: Dict[Tuple[int, Hashable], asyncio.Future],
+        flight_key: Tuple[int, Hashable],
+        build: Callable[[], Awaitable[T]],
+        store: Callable[[T], T],
+    ) -> T:
+        try:
+            return store(await build())
+        finally:
+            in_flight.pop(flight_key, None)
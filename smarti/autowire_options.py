@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from smarti import constants as cst
+
+
+class AutowireOptions:
+    """The options a class was decorated with. They are attached to the class by the autowired decorator."""
+    __slots__ = ("as_singleton", "class_loader", "annotation_args", "scope")
+
+    def __init__(
+        self, as_singleton: bool, class_loader: Any, annotation_args: Dict[str, Any], scope: Optional[str] = None
+    ) -> None:
+        self.as_singleton = as_singleton
+        self.class_loader = class_loader
+        self.annotation_args = annotation_args
+        self.scope = scope
+
+
+def get_options(class_: Type) -> Optional[AutowireOptions]:
+    """Gets the options of a decorated class. Options are not inherited by subclasses.
+
+    Args:
+        class_ (Type): The class.
+
+    Returns:
+        Optional[AutowireOptions]: The options or None if the class was not decorated.
+    """
+    try:
+        return vars(class_).get(cst.AUTOWIRE_OPTIONS, None)
+    except TypeError:
+        return None
+
+
+def original_constructors(class_: Type) -> Tuple[Callable, Callable]:
+    """Gets the __new__ and __init__ of a class as written by the user, bypassing the wrappers of the autowired decorator.
+
+    Args:
+        class_ (Type): The class.
+
+    Returns:
+        Tuple[Callable, Callable]: The __new__ and __init__ of the class.
+    """
+    return _original(class_, "__new__", cst.UNMODIFIED_NEW), _original(class_, "__init__", cst.UNMODIFIED_INIT)
+
+
+def _original(class_: Type, name: str, unmodified_name: str) -> Callable:
+    for base in class_.__mro__:
+        attributes = vars(base)
+        if unmodified_name in attributes:
+            return getattr(base, unmodified_name)
+        if name in attributes:
+            return getattr(base, name)
+
+    return getattr(class_, name)
@@ -1,22 +1,66 @@
 import builtins
 import inspect
-from typing import Callable, List, Type, get_type_hints, Any, Dict
+from typing import Callable, Iterable, Optional, Type, Any, Dict
 import enum
 
 from smarti.class_loader_flags import ClassLoaderFlags
 from smarti.exceptions import CyclicDependencyException
+from smarti.annotation_resolver import AnnotationResolver
+from smarti.injection_plan import InjectionPlan, InjectionPlanCache
+from smarti.plan_disk_cache import PlanDiskCache
+from smarti.resolution_chain import ResolutionChain
+from smarti.type_registry import TypeRegistry
 
 
 class CheckAutowire:
     """A central class to rule them all :)"""
     ANNOTATIONS_MODULE = "smarti.annotations"
     IGNORED_ARGUMENTS = ["self"]
+    BUILTIN_NAMES = frozenset(name for name in dir(builtins) if name[0].islower())
 
     def __init__(self) -> None:
-        self._known_types: List[Type] = []
+        self._known_types = TypeRegistry()
+        self._plan_cache = InjectionPlanCache()
+        self._disk_cache: Optional[PlanDiskCache] = None
+        self._annotation_resolver = AnnotationResolver()
+
+    def get_plan(self, callable: Callable) -> InjectionPlan:
+        """Gets the cached injection plan of a callable. The callable is only introspected on the first call.
+
+        Args:
+            callable (Callable): The callable to get the plan for.
+
+        Returns:
+            InjectionPlan: The plan of the callable.
+        """
+        return self._plan_cache.get(callable, self._create_plan)
+
+    def reset_locks(self) -> None:
+        """Replaces the locks of the registered types, the plan caches and the annotation resolver, e.g. in a forked child."""
+        self._known_types.reset_lock()
+        self._plan_cache.reset_lock()
+        self._annotation_resolver.reset_lock()
+
+        disk_cache = self._disk_cache
+        if disk_cache is not None:
+            disk_cache.reset_lock()
+
+    def _create_plan(self, callable: Callable) -> InjectionPlan:
+        disk_cache = self._disk_cache
+        if disk_cache is not None:
+            plan = disk_cache.load(callable)
+            if plan is not None:
+                return plan
+
+        plan = InjectionPlan.from_callable(
+            callable, self.can_autowire_type, CheckAutowire.IGNORED_ARGUMENTS, self._annotation_resolver)
+        if disk_cache is not None and not plan.unresolved:
+            disk_cache.store(callable, plan)
+
+        return plan
 
     def can_autowire(
-        self, callable: Callable, flags: ClassLoaderFlags, type_: Type, seen_types: List[Type], kwargs: Dict[str, Any]
+        self, callable: Callable, flags: ClassLoaderFlags, type_: Type, seen_types: Iterable[Type], kwargs: Dict[str, Any]
     ) -> bool:
         """Checks if a callable can be autowired
 
@@ -24,40 +68,51 @@ class CheckAutowire:
             callable (Callable): The callable to check
             flags (ClassLoaderFlags): The flags of the classloader
             type_ (Type): The type the callable belongs to
-            seen_types (List[Type]): The already instanciated types (CDC)
+            seen_types (Iterable[Type]): The already instanciated types (CDC), preferably a ResolutionChain
             kwargs (Dict[str, Any]): All the custom arguments for the function.
 
         Raises:
             CyclicDependencyException: Is raised if the Callable needs a Type, which needs the type of the callable. e.g. A -> B -> A.
+            NameError: If an annotation references a name which is not defined (yet) and there is no custom argument for it.
 
         Returns:
             bool: True if the callable can be autowired, False otherwise.
         """
-        hints = get_type_hints(callable)
+        return self.can_autowire_plan(self.get_plan(callable), flags, type_, seen_types, kwargs)
 
-        signature = inspect.signature(callable)
+    def can_autowire_plan(
+        self, plan: InjectionPlan, flags: ClassLoaderFlags, type_: Type, seen_types: Iterable[Type], kwargs: Dict[str, Any]
+    ) -> bool:
+        """Checks if the callable of a plan can be autowired. See can_autowire.
 
-        for name, param_type in get_type_hints(callable).items():
-            if param_type in seen_types and name not in kwargs:
-                circle = [
-                    t_.__name__ for t_ in seen_types[seen_types.index(param_type):] + [param_type]
-                ]
+        Args:
+            plan (InjectionPlan): The plan of the callable to check.
+            flags (ClassLoaderFlags): The flags of the classloader
+            type_ (Type): The type the callable belongs to
+            seen_types (Iterable[Type]): The already instanciated types (CDC), preferably a ResolutionChain
+            kwargs (Dict[str, Any]): All the custom arguments for the function.
+
+        Raises:
+            CyclicDependencyException: Is raised if the Callable needs a Type, which needs the type of the callable. e.g. A -> B -> A.
+            NameError: If an annotation references a name which is not defined (yet) and there is no custom argument for it.
+
+        Returns:
+            bool: True if the callable can be autowired, False otherwise.
+        """
+        missing = [name for name in plan.unresolved if name not in kwargs]
+        if missing:
+            raise NameError(f"Cannot resolve the annotations of {', '.join(missing)}, they reference undefined names")
+
+        chain = ResolutionChain.of(seen_types)
+        for parameter in plan.parameters:
+            if parameter.type_ in chain and parameter.name not in kwargs and not parameter.lazy:
+                circle = [t_.__name__ for t_ in chain.cycle(parameter.type_)]
                 raise CyclicDependencyException(
                     f"Found cyclic dependencies: {' -> '.join(circle)}")
 
-        problems = {
-            k: v
-            for k, v in signature.parameters.items()
-            if k not in hints
-            and k not in CheckAutowire.IGNORED_ARGUMENTS
-            and v.kind
-            not in [inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD]
-            and v.default is inspect.Parameter.empty
-        }
-
         is_autowired = self.is_autowired_or_ignored(type_, flags)
 
-        return not problems and is_autowired
+        return not plan.problems and is_autowired
 
     def can_autowire_type(self, type_: Type) -> bool:
         """Check is a type can be autowired.
@@ -70,14 +125,13 @@ class CheckAutowire:
         """
         type_to_check = type_
 
-        if type.__module__.endswith(CheckAutowire.ANNOTATIONS_MODULE):
+        if type_.__module__.endswith(CheckAutowire.ANNOTATIONS_MODULE):
             type_to_check = type_.__bases__[0]
 
         type_str = type_to_check.__name__
 
         return (
-            type_str not in [name for name in dir(
-                builtins) if name[0].islower()]
+            type_str not in CheckAutowire.BUILTIN_NAMES
             and not inspect.isabstract(type_to_check)
             and not issubclass(type_to_check, enum.Enum)
         )
@@ -110,6 +164,18 @@ class CheckAutowire:
         """
         return class_ in self._known_types
 
+    def ensure_unwired_allowed(self, flags: ClassLoaderFlags) -> None:
+        """Ensures that classes which are not autowired may be created.
+
+        Args:
+            flags (ClassLoaderFlags): The class loader flags.
+
+        Raises:
+            RuntimeError: If thread-safe mode is set.
+        """
+        if self.is_thread_safe(flags):
+            raise RuntimeError(f"Cannot create unwired class in {ClassLoaderFlags.ALL_DEPENDENCIES_AUTOWIRED} mode")
+
     def is_thread_safe(self, flags: ClassLoaderFlags) -> bool:
         """Determines if thread-safe mode is set.
 
@@ -0,0 +1,168 @@
+from threading import Lock
+from typing import Any, Dict, Optional, Type, TypeVar
+
+import smarti.constants as cst
+from smarti.autowire_options import get_options, original_constructors
+from smarti.dependency_graph import reachable_types
+from smarti.exceptions import ScopeNotActiveException
+from smarti.instance_storage import InstanceStorage
+from smarti.lazy import LazyProxy
+from smarti.resolution_chain import ResolutionChain
+
+T = TypeVar("T")
+
+
+class ChildClassLoader:
+    """A container derived from a ClassLoader (see ClassLoader.child), e.g. per tenant or per test.
+    Types which are neither overridden nor depend on an overridden type are resolved by the parent, so its singletons and plans are shared.
+    Overridden types are replaced, and the types depending on them are built lazily by the child and stored in its own InstanceStorage.
+    """
+
+    def __init__(self, parent: Any, overrides: Optional[Dict[Type, Any]] = None) -> None:
+        self._parent = parent
+        self._root = getattr(parent, "_root", parent)
+        self._check_autowire = self._root._check_autowire
+        self._overrides: Dict[Type, Any] = {} if overrides is None else dict(overrides)
+        self._instance_storage = InstanceStorage(self._root._instance_storage._key_strategy)
+        self._affected: Dict[Type, bool] = {}
+        self._lock = Lock()
+
+    def child(self, overrides: Optional[Dict[Type, Any]] = None) -> "ChildClassLoader":
+        """Creates a child of this child. See ClassLoader.child.
+
+        Args:
+            overrides (Optional[Dict[Type, Any]], optional): The instance or the replacing class per type. Defaults to None.
+
+        Returns:
+            ChildClassLoader: The child.
+        """
+        return ChildClassLoader(self, overrides)
+
+    def override(self, type_: Type, override: Any) -> None:
+        """Overrides another type. Instances already built by this child are kept.
+
+        Args:
+            type_ (Type): The overridden type.
+            override (Any): The instance or the replacing class.
+        """
+        with self._lock:
+            # both are replaced, never mutated: a concurrent _is_affected stores its result in the discarded cache
+            self._overrides = {**self._overrides, type_: override}
+            self._affected = {}
+
+    def get(self, type_: Type[T], **kwargs) -> T:
+        """Resolves an instance in this child, like calling an autowired class.
+
+        Args:
+            type_ (Type[T]): The type to resolve.
+            **kwargs: The custom arguments, like when calling an autowired class.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+            ScopeNotActiveException: If a scoped class is resolved outside of its scope.
+
+        Returns:
+            T: The instance.
+        """
+        return self._get(type_, kwargs, ResolutionChain([type_]))
+
+    def is_overridden(self, type_: Type) -> bool:
+        """Checks if this child builds a type itself, as it is overridden, replaces an overridden type or depends on an overridden type.
+
+        Args:
+            type_ (Type): The type.
+
+        Returns:
+            bool: True if the type is built by this child, False if it is resolved by the parent.
+        """
+        return self._is_affected(self._root._load_class_type(type_))
+
+    def _get(self, type_: Type[T], kwargs: Dict[str, Any], chain: ResolutionChain) -> T:
+        class_ = self._root._load_class_type(type_)
+
+        override = self._overrides.get(class_, self._overrides.get(type_, None))
+        if override is not None:
+            if not isinstance(override, type):
+                return override
+
+            if override is not class_:
+                chain.push(override)
+                try:
+                    return self._get(override, kwargs, chain)
+                finally:
+                    chain.pop()
+
+        if not self._is_affected(class_):
+            return self._parent.get(class_, **kwargs)
+
+        return self._build(class_, kwargs, chain)
+
+    def _build(self, class_: Type[T], kwargs: Dict[str, Any], chain: ResolutionChain) -> T:
+        options = get_options(class_)
+        if options is not None:
+            new = getattr(class_, cst.UNMODIFIED_NEW)
+            init = getattr(class_, cst.UNMODIFIED_INIT)
+            kwargs = {**options.annotation_args, **kwargs}
+            as_singleton = options.as_singleton
+            scope = options.scope
+        else:
+            self._check_autowire.ensure_unwired_allowed(self._root._flags)
+            new, init = original_constructors(class_)
+            as_singleton = True
+            scope = None
+
+        def factory() -> T:
+            plan = self._check_autowire.get_plan(init)
+            if not self._check_autowire.can_autowire_plan(plan, self._root._flags, class_, chain, kwargs):
+                raise RuntimeError(f"Cannot Autowire function {init}")
+
+            arguments, injected = plan.bind(kwargs, init)
+            for parameter in injected:
+                name = parameter.name
+                custom_args = self._root._get_kwargs_for_argument(name, kwargs)
+                if parameter.lazy:
+                    arguments[name] = self._lazy_dependency(parameter.type_, custom_args)
+                    continue
+
+                chain.push(parameter.type_)
+                try:
+                    arguments[name] = self._get(parameter.type_, custom_args, chain)
+                finally:
+                    chain.pop()
+
+            instance = new(class_)
+            init(instance, **arguments)
+            return instance
+
+        if scope is not None:
+            active_scope = self._root.get_active_scope(scope)
+            if active_scope is None:
+                raise ScopeNotActiveException(f"Cannot create {class_} outside of an active {scope} scope")
+
+            # the child shares the scope with its parent, but not the instances
+            return active_scope.get_or_create((self, self._instance_storage.generate_key(class_, [], kwargs)), factory)
+
+        if as_singleton:
+            return self._instance_storage.get_or_create(class_, [], kwargs, factory)
+
+        return factory()
+
+    def _lazy_dependency(self, type_: Type, custom_args: Dict[str, Any]) -> LazyProxy:
+        return LazyProxy(lambda: self._get(type_, custom_args, ResolutionChain([type_])))
+
+    def _is_affected(self, class_: Type) -> bool:
+        """Checks if a class is overridden, replaces an overridden class or (lazily) depends on an overridden class.
+        The result is cached per class.
+        """
+        # the cache is read before the overrides, as override replaces them in the opposite order
+        cache = self._affected
+        affected = cache.get(class_, None)
+        if affected is None:
+            overrides = self._overrides
+            # replacing classes are built by the child, otherwise the parent would store them for all its children
+            affected = cache[class_] = any(override is class_ for override in overrides.values()) or any(
+                t in overrides for t in reachable_types(self._root, class_))
+
+        return affected
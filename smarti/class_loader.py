@@ -1,11 +1,35 @@
+import asyncio
+import atexit
 import inspect
-import smarti as sti
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock, RLock
 import smarti.constants as cst
-from typing import Any, Callable, Dict, List, Optional, Type, get_type_hints, TypeVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Type, TypeVar, Union
 
+from smarti.async_resolver import AsyncResolver
+from smarti.autowire_options import get_options, original_constructors
 from smarti.check_autowire import CheckAutowire
+from smarti.child_loader import ChildClassLoader
+from smarti.exceptions import CyclicDependencyException, ScopeNotActiveException
 from smarti.class_loader_flags import ClassLoaderFlags
+from smarti.dependency_graph import DependencyGraph, DependencyNode, reachable_types
+from smarti.factory_compiler import FactoryCompiler, FrozenFactory
+from smarti.fork import ForkPolicy, register_fork_hooks
+from smarti.graph_export import graph_to_dot, graph_to_json
+from smarti.injection_plan import InjectionPlan
 from smarti.instance_storage import InstanceStorage
+from smarti.key_strategy import KeyStrategy
+from smarti.lazy import LazyProxy
+from smarti.lifecycle import DependencyRecords, adispose, dispose, disposal_levels
+from smarti.metrics import ResolutionMetrics
+from smarti.plan_disk_cache import PlanDiskCache
+from smarti.pool import ObjectPool
+from smarti.resolution_chain import ResolutionChain
+from smarti.scope import Scope
+from smarti.storage_policy import StoragePolicy
 
 T = TypeVar('T')
 
@@ -13,19 +37,716 @@ T = TypeVar('T')
 class ClassLoader:
     """This classloader is responsible for instanciating the new instances. It automatically detects if a class is autowired or not and loads it correspondingly."""
 
-    def __init__(self, flags: ClassLoaderFlags = ClassLoaderFlags.NO_FLAGS) -> None:
+    def __init__(self, flags: ClassLoaderFlags = ClassLoaderFlags.NO_FLAGS, key_strategy: Optional[KeyStrategy] = None) -> None:
         self._check_autowire = CheckAutowire()
-        self._instance_storage = InstanceStorage()
+        self._instance_storage = InstanceStorage(key_strategy)
+        self._frozen_factories: Dict[Type, FrozenFactory] = {}
+        self._implicit_policy_factory: Optional[Callable[[], StoragePolicy]] = None
+        # serializes changes of the flags and the frozen factories, so a freeze never publishes factories validated with outdated flags
+        self._state_lock = RLock()
+        self._async_resolver = AsyncResolver(self)
+        self._active_scope: ContextVar[Optional[Scope]] = ContextVar(f"smarti_scope_{id(self)}", default=None)
+        self._pending_cycle_checks: Dict[Type, None] = {}
+        self._cycle_check_lock = Lock()
+        self._metrics: Optional[ResolutionMetrics] = None
+        self._pools: Dict[Type, ObjectPool] = {}
+        # the ids of the autowired dependencies of every singleton, used to dispose them in reverse dependency order
+        self._dependencies = DependencyRecords()
 
         self.set_flags(flags)
+        register_fork_hooks(self)
 
     def set_flags(self, flags: ClassLoaderFlags):
-        """Updates the flags to this ClassLoader.
+        """Updates the flags to this ClassLoader. This unfreezes the ClassLoader, as the flags influence the validation.
 
         Args:
             flags (ClassLoaderFlags): The new flags.
         """
-        self._flags = flags
+        with self._state_lock:
+            self._flags = flags
+            self.unfreeze()
+
+    def freeze(self, strict: bool = True) -> Dict[Type, Exception]:
+        """Validates the whole dependency graph of all classes autowired with this ClassLoader once and generates a specialized factory per class.
+        Afterwards, calls without custom arguments use these factories instead of the generic recursive path.
+        Classes autowired after freezing use the generic path until the next freeze.
+
+        Args:
+            strict (bool, optional): If True, the first problem of the graph is raised. Otherwise, classes with problems keep using the generic path. Defaults to True.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            NameError: If an annotation of the dependency graph references an undefined name.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            Dict[Type, Exception]: The classes which could not be frozen and the reason.
+        """
+        with self._state_lock:
+            compiler = FactoryCompiler(self)
+            factories: Dict[Type, FrozenFactory] = {}
+            problems: Dict[Type, Exception] = {}
+
+            for class_ in list(self._check_autowire._known_types):
+                try:
+                    factories[class_] = compiler.compile(class_)
+                except (RuntimeError, TypeError, NameError, CyclicDependencyException) as e:
+                    if strict:
+                        raise
+                    problems[class_] = e
+
+            # published as a whole, readers never see a partially frozen ClassLoader
+            self._frozen_factories = factories
+
+        return problems
+
+    def set_pool(self, type_: Type, pool: Optional[ObjectPool]) -> None:
+        """Pools the instances of a transient autowired class. Calls without custom arguments check out a pooled instance instead of building a new one;
+        instances are handed back with release, which resets them with the reset callable of the pool or their __reset__ method.
+
+        Args:
+            type_ (Type): The transient class.
+            pool (Optional[ObjectPool]): The pool or None to stop pooling.
+
+        Raises:
+            ValueError: If the class is not a transient class autowired with this ClassLoader.
+        """
+        if pool is None:
+            self._pools.pop(type_, None)
+            return
+
+        options = get_options(type_)
+        if options is None or options.class_loader is not self or options.as_singleton or options.scope is not None:
+            raise ValueError(f"Only transient classes autowired with this ClassLoader can be pooled, not {type_}")
+
+        self._pools[type_] = pool
+
+    def release(self, instance: Any) -> bool:
+        """Returns an instance checked out from the pool of its class. The instance must not be used afterwards.
+
+        Args:
+            instance (Any): The instance.
+
+        Raises:
+            ValueError: If the class of the instance is not pooled.
+
+        Returns:
+            bool: True if the instance was pooled, False if the pool was full and the instance was discarded.
+        """
+        pool = self._pools.get(type(instance), None)
+        if pool is None:
+            raise ValueError(f"{type(instance)} is not pooled")
+
+        return pool.release(instance)
+
+    @contextmanager
+    def checkout(self, type_: Type[T]) -> Iterator[T]:
+        """Checks out a pooled instance and releases it at exit, e.g. with loader.checkout(Parser) as parser:.
+
+        Args:
+            type_ (Type[T]): The pooled class.
+
+        Raises:
+            ValueError: If the class is not pooled.
+
+        Yields:
+            T: The instance.
+        """
+        if type_ not in self._pools:
+            raise ValueError(f"{type_} is not pooled")
+
+        instance = type_()
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def set_fork_policy(self, type_: Type, policy: Union[ForkPolicy, str]) -> None:
+        """Sets what happens to the singletons of a type in forked children, e.g. the workers of gunicorn.
+        Inherited singletons ("inherit", the default) are shared copy-on-write, so warm them up in the parent.
+        Per-process singletons ("per-process") are dropped in every child and rebuilt lazily on first use.
+
+        Args:
+            type_ (Type): The type.
+            policy (Union[ForkPolicy, str]): The policy, e.g. ForkPolicy.PER_PROCESS or "per-process".
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        self._instance_storage.set_per_process(type_, ForkPolicy(policy) is ForkPolicy.PER_PROCESS)
+
+    def _after_fork_in_child(self) -> None:
+        """Resets all locks, which may be held by threads of the parent, and drops the per-process singletons."""
+        self._cycle_check_lock = Lock()
+        self._state_lock = RLock()
+        self._check_autowire.reset_locks()
+        self._instance_storage.reset_after_fork()
+        self._async_resolver.reset_after_fork()
+        self._drop_per_process_dependents()
+
+        for pool in self._pools.values():
+            pool.reset_lock()
+
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.reset_locks()
+
+    def _drop_per_process_dependents(self) -> None:
+        """Drops the inherited singletons which (transitively) depend on a per-process singleton, so they are rebuilt with the child's instances."""
+        per_process = self._instance_storage.per_process_types()
+        if not per_process:
+            return
+
+        candidates = set(self._check_autowire._known_types)
+        candidates.update(type(instance) for instance in self._instance_storage.instances())
+        self._instance_storage.drop({
+            type_ for type_ in candidates - per_process if not per_process.isdisjoint(reachable_types(self, type_))
+        })
+
+    def enable_plan_cache(self, directory: str, validation: str = "mtime") -> None:
+        """Persists the injection plans in a directory, so later process starts skip the introspection of unchanged modules.
+        The plans are written at exit and on save_plan_cache. Enabling it again writes the plans of the previous cache and replaces it.
+
+        Args:
+            directory (str): The cache directory, e.g. ".smarti_cache".
+            validation (str, optional): "mtime" compares modification time and size of the module source, "hash" a hash of the source. Defaults to "mtime".
+
+        Raises:
+            ValueError: If the validation is unknown.
+        """
+        disk_cache = PlanDiskCache(directory, validation)
+        previous = self._check_autowire._disk_cache
+        if previous is not None:
+            atexit.unregister(previous.flush)
+            previous.flush()
+
+        self._check_autowire._disk_cache = disk_cache
+        self._check_autowire._plan_cache.clear()
+        atexit.register(disk_cache.flush)
+
+    def save_plan_cache(self) -> None:
+        """Writes the injection plans computed since the last save, if the plan cache is enabled."""
+        disk_cache = self._check_autowire._disk_cache
+        if disk_cache is not None:
+            disk_cache.flush()
+
+    def enable_metrics(self) -> None:
+        """Starts collecting resolution metrics (see stats). Enabling the metrics again resets them."""
+        metrics = ResolutionMetrics()
+        self._metrics = metrics
+        self._instance_storage._metrics = metrics
+
+    def disable_metrics(self) -> None:
+        """Stops collecting resolution metrics. Disabled metrics cost a single None check per construction."""
+        self._metrics = None
+        self._instance_storage._metrics = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Gets the resolution metrics, collected since enable_metrics.
+        Per class, it reports the constructions, the construction time (cumulative and percentiles, including dependencies),
+        the time spent in introspection compared with the __init__ of the class, the singleton hits and misses and the lock wait time.
+        Classes constructed by a frozen factory only report the construction time.
+
+        Returns:
+            Dict[str, Any]: The totals and the metrics per class, keyed by the qualified class name. "enabled" is False if metrics are disabled.
+        """
+        metrics = self._metrics
+        if metrics is None:
+            return {**ResolutionMetrics().snapshot(), "enabled": False}
+
+        return metrics.snapshot()
+
+    def memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """Gets the number of stored singletons and the memory taken by their storage keys per class.
+        Keys with large pickled arguments can be compacted with DigestKeyStrategy.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The instances and key bytes per qualified class name.
+        """
+        return self._instance_storage.memory_usage()
+
+    def export_graph(
+        self, format: str = "json", roots: Optional[Iterable[Type]] = None, timings: Optional[Dict[Type, float]] = None,
+    ) -> str:
+        """Exports the dependency graph, i.e. which class is built from which parameters, annotated with construction times.
+
+        Args:
+            format (str, optional): "json" or "dot" (Graphviz). Defaults to "json".
+            roots (Optional[Iterable[Type]], optional): The classes whose graph should be exported. If None, all classes autowired with this ClassLoader. Defaults to None.
+            timings (Optional[Dict[Type, float]], optional): The construction time per class without its dependencies, e.g. the result of warmup.
+                If None, the times measured by the metrics are used, if enabled. Defaults to None.
+
+        Raises:
+            ValueError: If the format is unknown.
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            str: The exported graph.
+        """
+        exporters = {"json": graph_to_json, "dot": graph_to_dot}
+        if format not in exporters:
+            raise ValueError(f"Unknown graph format {format}, expected one of {list(exporters)}")
+
+        if roots is None:
+            roots = list(self._check_autowire._known_types)
+
+        metrics = self._metrics
+        if timings is None and metrics is not None:
+            timings = metrics.self_seconds()
+
+        return exporters[format](DependencyGraph.from_roots(self, roots), timings)
+
+    def export_collapsed_stacks(self) -> str:
+        """Exports all constructions measured since enable_metrics in the collapsed stack format, e.g. for flamegraph.pl or speedscope.
+        Enable the metrics before the startup to get the flame graph of the whole startup resolution.
+
+        Raises:
+            RuntimeError: If metrics are disabled.
+
+        Returns:
+            str: One line per resolution path with the time of its last class in microseconds.
+        """
+        metrics = self._metrics
+        if metrics is None:
+            raise RuntimeError("Metrics are disabled, call enable_metrics first")
+
+        return "".join(f"{line}\n" for line in metrics.collapsed_stacks())
+
+    def check_cycles(self, class_: Type) -> None:
+        """Statically checks the dependency graph of a class for cycles, without constructing anything.
+        Only annotation arguments are considered as custom arguments; lazy dependencies and parameters with defaults are skipped.
+
+        Args:
+            class_ (Type): The class to check.
+
+        Raises:
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+            NameError: If a forward reference of the dependency graph cannot be resolved yet.
+        """
+        self._check_cycles(class_, ResolutionChain([class_]), set())
+
+    def _check_cycles(self, class_: Type, chain: ResolutionChain, acyclic: Set[Type]) -> None:
+        if class_ in acyclic:
+            return
+
+        options = get_options(class_)
+        if options is not None and options.class_loader is not self:
+            options.class_loader._check_cycles(class_, chain, acyclic)
+            return
+
+        if options is not None:
+            init = getattr(class_, cst.UNMODIFIED_INIT)
+            constants = options.annotation_args
+        else:
+            init = original_constructors(class_)[1]
+            constants = {}
+
+        plan = self._check_autowire.get_plan(init)
+        missing = [name for name in plan.unresolved if name not in constants]
+        if missing:
+            raise NameError(f"Cannot resolve the annotations of {', '.join(missing)} of {class_}, they reference undefined names")
+
+        for parameter in plan.parameters:
+            if parameter.lazy or parameter.has_default or not parameter.can_autowire or parameter.name in constants:
+                continue
+
+            if parameter.type_ in chain:
+                circle = [t_.__name__ for t_ in chain.cycle(parameter.type_)]
+                raise CyclicDependencyException(
+                    f"Found cyclic dependencies: {' -> '.join(circle)}")
+
+            dependency = self._load_class_type(parameter.type_)
+            chain.push(dependency)
+            try:
+                self._check_cycles(dependency, chain, acyclic)
+            finally:
+                chain.pop()
+
+        acyclic.add(class_)
+
+    def _register(self, class_: Type) -> None:
+        """Registers an autowired class. With CHECK_CYCLES_ON_REGISTER its dependency graph is checked for cycles once.
+        Classes with forward references which cannot be resolved yet (e.g. the class itself) are checked on the next registration.
+
+        Args:
+            class_ (Type): The class.
+
+        Raises:
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+        """
+        self._check_autowire._known_types.register(class_)
+
+        if not self._flags & ClassLoaderFlags.CHECK_CYCLES_ON_REGISTER:
+            return
+
+        with self._cycle_check_lock:
+            pending = [*self._pending_cycle_checks, class_]
+            self._pending_cycle_checks = {}
+
+        for index, pending_class in enumerate(pending):
+            try:
+                self.check_cycles(pending_class)
+            except NameError:
+                with self._cycle_check_lock:
+                    self._pending_cycle_checks[pending_class] = None
+            except CyclicDependencyException:
+                with self._cycle_check_lock:
+                    self._pending_cycle_checks.update(dict.fromkeys(pending[index + 1:]))
+                raise
+
+    def unfreeze(self) -> None:
+        """Removes all generated factories. All classes use the generic recursive path again."""
+        with self._state_lock:
+            self._frozen_factories = {}
+
+    def set_storage_policy(self, type_: Type, policy: Optional[StoragePolicy]) -> None:
+        """Sets how long the singletons of a type are retained, e.g. LRUPolicy, TTLPolicy or WeakValuePolicy.
+
+        Args:
+            type_ (Type): The type.
+            policy (Optional[StoragePolicy]): The policy or None to retain instances forever.
+        """
+        self._instance_storage.set_policy(type_, policy)
+
+    def set_implicit_storage_policy(self, policy_factory: Optional[Callable[[], StoragePolicy]]) -> None:
+        """Sets the policy for classes which are not autowired, but instantiated as singleton dependency.
+        Each of these classes gets its own policy created by the factory.
+
+        Args:
+            policy_factory (Optional[Callable[[], StoragePolicy]]): Creates the policy of a class. None retains instances forever.
+        """
+        self._implicit_policy_factory = policy_factory
+
+    def warmup(
+        self, roots: Optional[Iterable[Type]] = None, max_workers: Optional[int] = None, include_per_process: bool = True,
+    ) -> Dict[Type, float]:
+        """Eagerly creates all singletons of the dependency graph, e.g. before the first request.
+        The singletons are created in waves on a thread pool; all singletons of one wave only depend on singletons of earlier waves.
+
+        Args:
+            roots (Optional[Iterable[Type]], optional): The classes whose graph should be warmed up. If None, all classes autowired with this ClassLoader. Defaults to None.
+            max_workers (Optional[int], optional): The number of threads. Defaults to None, the ThreadPoolExecutor default.
+            include_per_process (bool, optional): If False, per-process singletons (see set_fork_policy) and all singletons depending on them are skipped,
+                e.g. when warming up a pre-fork server before forking the workers. Defaults to True.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            Dict[Type, float]: The construction time in seconds per class.
+        """
+        if roots is None:
+            roots = list(self._check_autowire._known_types)
+
+        graph = DependencyGraph.from_roots(self, roots)
+        timings: Dict[Type, float] = {}
+        skipped: Set[int] = set()
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            for level in graph.levels():
+                if not include_per_process:
+                    skipped.update(id(node) for node in level if self._instance_storage.is_per_process(node.type_) or any(
+                        id(dependency) in skipped for _, dependency in node.dependencies))
+
+                singletons = [node for node in level if node.as_singleton and node.scope is None and id(node) not in skipped]
+                for node, duration in zip(singletons, executor.map(self._warm_node, singletons)):
+                    timings[node.type_] = timings.get(node.type_, 0.0) + duration
+
+        return timings
+
+    def _warm_node(self, node: DependencyNode) -> float:
+        start = time.perf_counter()
+        if node.autowired:
+            node.type_(**node.call_kwargs)
+        else:
+            self._create_unwired(node.type_, True, node.call_kwargs, ResolutionChain([node.type_]))
+
+        return time.perf_counter() - start
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[Scope]:
+        """Activates a scope, e.g. with loader.scope("request"):. Classes autowired with scope=name exist once per active scope.
+        The active scope is stored in a contextvar, so each thread and asyncio task sees its own scopes. All instances are dropped at exit.
+
+        Args:
+            name (str): The name of the scope.
+
+        Yields:
+            Scope: The activated scope.
+        """
+        scope = Scope(name, self._active_scope.get())
+        token = self._active_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            self._active_scope.reset(token)
+            scope.close()
+
+    def get_active_scope(self, name: str) -> Optional[Scope]:
+        """Gets the innermost active scope with the given name in the current context.
+
+        Args:
+            name (str): The name of the scope.
+
+        Returns:
+            Optional[Scope]: The scope or None if it is not active.
+        """
+        scope = self._active_scope.get()
+        return None if scope is None else scope.find(name)
+
+    def get(self, type_: Type[T], **kwargs) -> T:
+        """Resolves an instance, like calling an autowired class. Classes which are not autowired are created like a dependency, i.e. as singleton.
+
+        Args:
+            type_ (Type[T]): The type to resolve.
+            **kwargs: The custom arguments, like when calling an autowired class.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+            ScopeNotActiveException: If a scoped class is resolved outside of its scope.
+
+        Returns:
+            T: The instance.
+        """
+        class_ = self._load_class_type(type_)
+        if self._check_autowire.is_autowired(class_):
+            return class_(**kwargs)
+
+        return self._create_unwired(class_, True, kwargs, ResolutionChain([class_]))
+
+    def child(self, overrides: Optional[Dict[Type, Any]] = None) -> ChildClassLoader:
+        """Creates a child container, e.g. per tenant or per test, with some types replaced. Resolve instances in the child with child.get(Type).
+        The child shares the singletons and plans of this ClassLoader; only the overridden types and the types depending on them are built again,
+        lazily and stored in the child. Calling an autowired class directly always uses the ClassLoader of the class.
+
+        Args:
+            overrides (Optional[Dict[Type, Any]], optional): The instance or the replacing class per type, e.g. {Database: FakeDatabase()}. Defaults to None.
+
+        Returns:
+            ChildClassLoader: The child.
+        """
+        return ChildClassLoader(self, overrides)
+
+    async def aget(self, type_: Type[T], **kwargs) -> T:
+        """Resolves an instance inside an event loop. Independent dependencies are constructed concurrently.
+        Dependencies with a registered async factory are created by awaiting it, and instances defining an async __ainit__ method are awaited after construction.
+
+        Args:
+            type_ (Type[T]): The type to resolve.
+            **kwargs: The custom arguments, like when calling an autowired class.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+            ScopeNotActiveException: If a scoped class is resolved outside of its scope.
+
+        Returns:
+            T: The instance.
+        """
+        return await self._async_resolver.resolve(type_, kwargs, True, [type_])
+
+    def create_many(self, type_: Type[T], overrides: Iterable[Dict[str, Any]]) -> List[T]:
+        """Creates one instance per override, e.g. one transient object per message of a stream. See iter_many.
+
+        Args:
+            type_ (Type[T]): The class to instantiate.
+            overrides (Iterable[Dict[str, Any]]): The custom arguments per instance, like when calling an autowired class.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            List[T]: The instances.
+        """
+        return list(self.iter_many(type_, overrides))
+
+    def iter_many(self, type_: Type[T], overrides: Iterable[Dict[str, Any]]) -> Iterator[T]:
+        """Lazily creates one instance per override. The plan is resolved and validated once, and singleton dependencies which are
+        not overridden are resolved once and shared; only transient dependencies and the instance itself are created per item.
+        Transient dependencies without custom arguments are created by factories compiled once, like after freeze.
+        Singleton or scoped classes are created by calling the class per item.
+
+        Args:
+            type_ (Type[T]): The class to instantiate.
+            overrides (Iterable[Dict[str, Any]]): The custom arguments per instance, like when calling an autowired class.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Yields:
+            T: The instances, in the order of the overrides.
+        """
+        options = get_options(type_)
+        if options is not None and (options.class_loader is not self or options.as_singleton or options.scope is not None):
+            for override in overrides:
+                yield type_(**override)
+            return
+
+        if options is not None:
+            new = getattr(type_, cst.UNMODIFIED_NEW)
+            init = getattr(type_, cst.UNMODIFIED_INIT)
+            base_kwargs = options.annotation_args
+        else:
+            self._check_autowire.ensure_unwired_allowed(self._flags)
+            new, init = original_constructors(type_)
+            base_kwargs = {}
+
+        plan = self._check_autowire.get_plan(init)
+        if not self._check_autowire.can_autowire_plan(plan, self._flags, type_, ResolutionChain([type_]), base_kwargs):
+            raise RuntimeError(f"Cannot Autowire function {init}")
+
+        shareable = {
+            parameter.name for parameter in plan.parameters
+            if parameter.can_autowire and not parameter.lazy and self._is_shared_dependency(parameter.type_)
+        }
+        shared: Dict[str, Any] = {}
+        compiled = self._compile_transient_dependencies(plan, base_kwargs, shareable)
+
+        for override in overrides:
+            kwargs = {**base_kwargs, **override} if override else base_kwargs
+            args, injected = plan.bind(kwargs, init)
+            for parameter in injected:
+                name = parameter.name
+                if parameter.lazy:
+                    args[name] = self._lazy_dependency(parameter.type_, name, kwargs, False)
+                    continue
+
+                if f"{name}{cst.KWARGS_VALUE}" not in override:
+                    if name in shareable:
+                        if name not in shared:
+                            shared[name] = self._instantiate_class(
+                                parameter.type_, name, kwargs, False, ResolutionChain([type_, parameter.type_]))
+                        args[name] = shared[name]
+                        continue
+
+                    factory = compiled.get(name, None)
+                    # pooled instances are acquired by the generic path only
+                    if factory is not None and factory.type_ not in self._pools:
+                        args[name] = factory.create()
+                        continue
+
+                args[name] = self._instantiate_class(
+                    parameter.type_, name, kwargs, False, ResolutionChain([type_, parameter.type_]))
+
+            instance = new(type_)
+            init(instance, **args)
+            yield instance
+
+    def _compile_transient_dependencies(
+        self, plan: InjectionPlan, kwargs: Dict[str, Any], shareable: Set[str],
+    ) -> Dict[str, FrozenFactory]:
+        """Compiles the factories of the transient dependencies of a plan once, for the items of iter_many without custom arguments for them.
+        Dependencies which cannot be compiled, e.g. as every item passes a missing argument, are left to the generic path.
+        """
+        compiler = FactoryCompiler(self)
+        factories = {}
+        for parameter in plan.parameters:
+            name = parameter.name
+            if not parameter.can_autowire or parameter.lazy or name in kwargs or name in shareable:
+                continue
+
+            try:
+                factories[name] = compiler.compile(
+                    self._load_class_type(parameter.type_), self._get_kwargs_for_argument(name, kwargs), as_singleton=False)
+            except (RuntimeError, TypeError, NameError, CyclicDependencyException):
+                continue
+
+        return factories
+
+    def _is_shared_dependency(self, type_: Type) -> bool:
+        """Checks if a dependency of a transient class is a singleton, i.e. equal custom arguments yield the same instance."""
+        options = get_options(self._load_class_type(type_))
+        return options is not None and options.as_singleton and options.scope is None
+
+    def shutdown(self, max_workers: Optional[int] = None) -> List[Tuple[Any, BaseException]]:
+        """Disposes all singletons which define close, __exit__ or aclose, e.g. on a graceful shutdown, and drops all singletons.
+        Every singleton is disposed before its dependencies, and singletons which do not depend on each other are disposed in parallel.
+        A failing disposal does not stop the shutdown.
+
+        Args:
+            max_workers (Optional[int], optional): The threads disposing in parallel. Defaults to None, the default of ThreadPoolExecutor.
+
+        Returns:
+            List[Tuple[Any, BaseException]]: The instances which could not be disposed and the reason.
+        """
+        failures: List[Tuple[Any, BaseException]] = []
+        levels = self._disposal_levels()
+        with ThreadPoolExecutor(max_workers) as executor:
+            for level in levels:
+                futures = [(instance, executor.submit(dispose, instance)) for instance in level]
+                for instance, future in futures:
+                    error = future.exception()
+                    if error is not None:
+                        failures.append((instance, error))
+
+        return failures
+
+    async def ashutdown(self) -> List[Tuple[Any, BaseException]]:
+        """Disposes all singletons inside an event loop, like shutdown. aclose methods are awaited, blocking close and __exit__ methods run in the default executor.
+
+        Returns:
+            List[Tuple[Any, BaseException]]: The instances which could not be disposed and the reason.
+        """
+        failures: List[Tuple[Any, BaseException]] = []
+        for level in self._disposal_levels():
+            results = await asyncio.gather(*(adispose(instance) for instance in level), return_exceptions=True)
+            failures.extend((instance, result) for instance, result in zip(level, results) if isinstance(result, BaseException))
+
+        return failures
+
+    def _disposal_levels(self) -> List[List[Any]]:
+        """Takes all singletons out of the storage and groups them for disposal. Singletons built by the generic path use the dependencies
+        recorded by autowire_function; for others (e.g. of frozen factories), all singletons of the parameter types of their plan count as dependencies.
+        """
+        instances = self._instance_storage.instances()
+        self._instance_storage.clear()
+        recorded, self._dependencies = self._dependencies, DependencyRecords()
+
+        by_type: Dict[Type, List[int]] = {}
+        for instance in instances:
+            by_type.setdefault(type(instance), []).append(id(instance))
+
+        def dependencies_of(instance: Any) -> Iterable[int]:
+            dependencies = recorded.get(instance)
+            if dependencies is not None:
+                return dependencies
+
+            options = get_options(type(instance))
+            init = getattr(type(instance), cst.UNMODIFIED_INIT) if options is not None else original_constructors(type(instance))[1]
+            try:
+                plan = self._check_autowire.get_plan(init)
+            except (TypeError, ValueError):
+                return ()
+
+            return [
+                dependency
+                for parameter in plan.parameters if parameter.can_autowire and not parameter.lazy
+                for dependency in by_type.get(parameter.type_, ())
+            ]
+
+        return disposal_levels(instances, dependencies_of)
+
+    def register_async_factory(self, type_: Type[T], factory: Callable[..., Awaitable[T]], as_singleton: bool = True) -> None:
+        """Registers an async factory used by aget to create a type. The annotated parameters of the factory are autowired like constructor parameters.
+
+        Args:
+            type_ (Type[T]): The type the factory creates.
+            factory (Callable[..., Awaitable[T]]): The async factory.
+            as_singleton (bool, optional): True if the created instances are singletons. Defaults to True.
+        """
+        self._async_resolver.register_factory(type_, factory, as_singleton)
 
     def manually_add_instance(self, type_: Type[T], instance: T, arguments: List[Any], kwargs: Optional[Dict[str, Any]] = None) -> T:
         """Manually adds an instance to the instance storage. This has only an effect if singletons are used!
@@ -47,7 +768,7 @@ class ClassLoader:
         function: Callable,
         self_arg: Any,
         as_singleton: bool,
-        seen_types: List[Type],
+        seen_types: Iterable[Type],
         **kwargs,
     ):
         """Autowired a callable.
@@ -57,41 +778,70 @@ class ClassLoader:
             function (Callable): The callable itself.
             self_arg (Any): The self-arg of the callable.
             as_singleton (bool): True if singletons should be used, False otherwise.
-            seen_types (List[Type]): The already instanciated types of this depencency chain.
+            seen_types (Iterable[Type]): The already instanciated types of this depencency chain. A ResolutionChain is shared, other iterables are copied once.
 
         Raises:
             RuntimeError: If the function cannot be autowired.
             TypeError: If a type cannot be autowired.
             CyclicDependencyException: If there exists a cyclic dependency between types.
         """
-        args = [self_arg]
-
-        sign = inspect.signature(function)
-        if not self._check_autowire.can_autowire(function, self._flags, type_, seen_types, kwargs):
-            raise RuntimeError(f"Cannot Autowire function {function}")
-
-        for name, arg_type in get_type_hints(function).items():
-            if name == "self" or name == "return":
-                continue
-
-            if name in kwargs:
-                args.append(kwargs[name])
-                continue
-
-            if sign.parameters[name].default is not inspect.Parameter.empty:
-                continue
-
-            if not self._check_autowire.can_autowire_type(arg_type):
-                raise TypeError(
-                    f"Cannot Autowire {name}: {arg_type} of {function}")
+        metrics = self._metrics
+        frame = None if metrics is None else metrics.enter(type_)
+        try:
+            chain = ResolutionChain.of(seen_types)
+            plan = self._check_autowire.get_plan(function)
+            if not self._check_autowire.can_autowire_plan(plan, self._flags, type_, chain, kwargs):
+                raise RuntimeError(f"Cannot Autowire function {function}")
+
+            if frame is not None:
+                frame.introspected()
+
+            args, injected = plan.bind(kwargs, function)
+            dependencies = []
+            for parameter in injected:
+                name = parameter.name
+                if parameter.lazy:
+                    args[name] = self._lazy_dependency(parameter.type_, name, kwargs, as_singleton)
+                    continue
+
+                chain.push(parameter.type_)
+                try:
+                    args[name] = self._instantiate_class(
+                        parameter.type_, name, kwargs, as_singleton, chain)
+                finally:
+                    chain.pop()
+                dependencies.append(id(args[name]))
+
+            if as_singleton:
+                self._dependencies.record(self_arg, tuple(dependencies))
+
+            if frame is None:
+                function(self_arg, **args)
+                return
+
+            frame.init_started()
+            function(self_arg, **args)
+            frame.init_finished()
+        finally:
+            if metrics is not None and frame is not None:
+                metrics.exit(frame)
+
+    def _lazy_dependency(self, type_: Type[T], name: str, kwargs: Dict[str, Any], as_singleton: bool) -> LazyProxy:
+        """Creates a proxy which instantiates the dependency on first use. The dependency starts a new dependency chain, so lazy dependencies may be cyclic.
 
-            args.append(self._instantiate_class(
-                arg_type, name, kwargs, as_singleton, [*seen_types, arg_type]))
+        Args:
+            type_ (Type[T]): The type of the dependency.
+            name (str): Argument name for the kwargs
+            kwargs (Dict[str, Any]): The kwargs.
+            as_singleton (bool): True if singletons should be used, False otherwise.
 
-        function(*args)
+        Returns:
+            LazyProxy: The proxy of the dependency.
+        """
+        return LazyProxy(lambda: self._instantiate_class(type_, name, kwargs, as_singleton, ResolutionChain([type_])))
 
     def _instantiate_class(
-        self, type: Type[T], name: str, kwargs: Dict[str, Any], as_singleton: bool, seen_types: List[Type]
+        self, type: Type[T], name: str, kwargs: Dict[str, Any], as_singleton: bool, seen_types: ResolutionChain
     ) -> T:
         """Instantiate a class.
 
@@ -100,7 +850,7 @@ class ClassLoader:
             name (str): Argument name for the kwargs
             kwargs (Dict[str, Any]): The kwargs.
             as_singleton (bool): True if singletons should be used, False otherwise.
-            seen_types (List[Type]): The already instanciated types of this depencency chain.
+            seen_types (ResolutionChain): The already instanciated types of this depencency chain.
 
         Returns:
             T: The new or stored instance of the type.
@@ -117,7 +867,7 @@ class ClassLoader:
         return instance
 
     def _recursive_instantiate(
-        self, class_: Type[T], as_singleton: bool, name: str, kwargs: Dict[str, Any], seen_types: List[Type],
+        self, class_: Type[T], as_singleton: bool, name: str, kwargs: Dict[str, Any], seen_types: ResolutionChain,
     ) -> T:
         """Recursively instantiates a class.
 
@@ -126,7 +876,7 @@ class ClassLoader:
             as_singleton (bool): If singletons should be used.
             name (str): The name of the argument.
             kwargs (Dict[str, Any]): The kwargs.
-            seen_types (List[Type]): The already instanciated types of this depencency chain.
+            seen_types (ResolutionChain): The already instanciated types of this depencency chain.
 
         Raises:
             RuntimeError: If thread-safety is flagged and one of the classes of the dependency chain is not autowired.
@@ -136,23 +886,68 @@ class ClassLoader:
         """
         custom_args = self._get_kwargs_for_argument(name, kwargs)
 
-        # TODO: check if thread safety is an option; due to new decorator may be not possible anymore
-        if self._check_autowire.is_thread_safe(self._flags):
-            raise RuntimeError(
-                f"Cannot create unwired class in {ClassLoaderFlags.ALL_DEPENDENCIES_AUTOWIRED} mode"
-            )
+        return self._create_unwired(class_, as_singleton, custom_args, seen_types)
+
+    def _create_unwired(
+        self, class_: Type[T], as_singleton: bool, custom_args: Dict[str, Any], seen_types: ResolutionChain,
+    ) -> T:
+        """Creates an instance of a class which is not autowired.
 
-        class_ = sti.autowired(
-            class_, as_singleton, self, **{cst.DONT_ADD_TO_KNOWN: True}
-        )
-        instance = self._create_instance(class_, custom_args, seen_types)
+        Args:
+            class_ (Type[T]): The class to instantiate
+            as_singleton (bool): If singletons should be used.
+            custom_args (Dict[str, Any]): The custom arguments of the instance.
+            seen_types (ResolutionChain): The already instanciated types of this depencency chain.
 
-        class_.__init__ = getattr(class_, cst.UNMODIFIED_INIT)  # type: ignore
-        class_.__new__ = getattr(class_, cst.UNMODIFIED_NEW)  # type: ignore
+        Raises:
+            RuntimeError: If thread-safety is flagged and one of the classes of the dependency chain is not autowired.
 
-        return instance
+        Returns:
+            T: The instance.
+        """
+        self._check_autowire.ensure_unwired_allowed(self._flags)
+
+        def create() -> T:
+            # the constructors are looked up per instance; caching them per class would keep the class alive
+            new, init = original_constructors(class_)
+            instance = new(class_)
+            self.autowire_function(class_, init, instance, as_singleton, seen_types, **custom_args)
+            return instance
+
+        if not as_singleton:
+            return create()
+
+        self._apply_implicit_policy(class_)
+        return self._instance_storage.get_or_create(class_, [], custom_args, create)
+
+    def _get_scoped(self, type_: Type[T], scope_name: str, key: Hashable, factory: Callable[[], T]) -> T:
+        """Gets the instance of a scoped class from the active scope or creates it.
+
+        Args:
+            type_ (Type[T]): The scoped class.
+            scope_name (str): The name of the scope of the class.
+            key (Hashable): The storage key of the instance.
+            factory (Callable[[], T]): Creates the instance if it does not exist in the scope yet.
+
+        Raises:
+            ScopeNotActiveException: If the scope is not active.
+
+        Returns:
+            T: The instance.
+        """
+        scope = self.get_active_scope(scope_name)
+        if scope is None:
+            raise ScopeNotActiveException(
+                f"Cannot create {type_} outside of an active {scope_name} scope")
+
+        return scope.get_or_create(key, factory)
+
+    def _apply_implicit_policy(self, class_: Type) -> None:
+        policy_factory = self._implicit_policy_factory
+        if policy_factory is not None:
+            self._instance_storage.ensure_policy(class_, policy_factory)
 
-    def _create_instance(self, type_: Type[T], custom_args: Dict[str, Any], seen_types: List[Type]) -> T:
+    def _create_instance(self, type_: Type[T], custom_args: Dict[str, Any], seen_types: ResolutionChain) -> T:
         try:
             return type_(
                 **{**custom_args, cst.ALREADY_SEEN_TYPES: seen_types})  # type: ignore
@@ -8,3 +8,6 @@ class ClassLoaderFlags(Flag):
     IGNORE_POSSIBLE_THREAD_ERRORS = enum.auto()
 
     NO_FLAGS = enum.auto()
+
+    # statically checks the dependency graph of every autowired class for cycles when it is registered
+    CHECK_CYCLES_ON_REGISTER = enum.auto()
@@ -2,7 +2,12 @@ UNMODIFIED_INIT = "__unmodified__init__"
 UNMODIFIED_NEW = "__unmodified__new__"
 
 DONT_ADD_TO_KNOWN = "__dont_add_to_known__"
+AUTOWIRE_OPTIONS = "__autowire_options__"
 
 KWARGS_VALUE = "_kwargs"
 
 ALREADY_SEEN_TYPES = "__already_seen_types__"
+
+ASYNC_INIT_HOOK = "__ainit__"
+
+RESET_HOOK = "__reset__"
@@ -1,15 +1,23 @@
-from typing import Optional, Type, TypeVar
+from typing import Optional, Type, TypeVar, Union
 import smarti.class_loader as cl
 import smarti.constants as cst
+from smarti.autowire_options import AutowireOptions
+from smarti.fork import ForkPolicy
+from smarti.pool import ObjectPool
+from smarti.storage_policy import StoragePolicy
 
 GLOBAL_CLASSLOADER = cl.ClassLoader()
 T = TypeVar("T")
 
 
 def autowired(
-    class_: Type[T] = None,
+    class_: Optional[Type[T]] = None,
     as_singleton: bool = True,
     class_loader: Optional[cl.ClassLoader] = None,
+    storage_policy: Optional[StoragePolicy] = None,
+    scope: Optional[str] = None,
+    fork_policy: Union[ForkPolicy, str] = ForkPolicy.INHERIT,
+    pool: Optional[ObjectPool] = None,
     **kwargs
 ):
     """The main decorator of this package. It allows to autowire classes by decorating them. It also supports singletons and custom class loader!
@@ -19,20 +27,59 @@ def autowired(
         class_ (Type[T], optional): The class, typically inserted by python itself using the decorator syntax. Defaults to None.
         as_singleton (bool, optional): True if this class should be loaded as a singleton, False otherwise. Defaults to True.
         class_loader (Optional[cl.ClassLoader], optional): The custom class loader. If None smarti.decorator.GLOBAL_CLASSLOADER will be used. Defaults to None.
+        storage_policy (Optional[StoragePolicy], optional): How long singletons of this class are retained, e.g. LRUPolicy(100). If None they are retained forever. Defaults to None.
+        scope (Optional[str], optional): The name of a scope, e.g. "request". If set, one instance exists per active scope (see ClassLoader.scope) instead of a singleton. Defaults to None.
+        fork_policy (Union[ForkPolicy, str], optional): "inherit" shares the singletons with forked children, "per-process" rebuilds them in every child (see ClassLoader.set_fork_policy). Defaults to ForkPolicy.INHERIT.
+        pool (Optional[ObjectPool], optional): Pools the instances of a transient class, e.g. ObjectPool(32). Calls without custom arguments check out a pooled instance,
+            which is handed back with ClassLoader.release (see ClassLoader.set_pool). Defaults to None.
     """
     def decorator(decorated_class: Type[T]):
         used_class_loader = GLOBAL_CLASSLOADER if class_loader is None else class_loader
         annotation_args = kwargs
+        instance_storage = used_class_loader._instance_storage
+        default_instances = instance_storage._defaults
+        is_plain_singleton = as_singleton and scope is None
 
         def __new__(cls, *args, **kwargs) -> T:
+            if is_plain_singleton and not args and not kwargs:
+                # fast path for the most common call, e.g. Service()
+                instance = default_instances.get(decorated_class, None)
+                if instance is not None and instance_storage._metrics is None:
+                    return instance
+
+                return instance_storage.get_or_create_default(
+                    decorated_class, lambda: _create(cls, getattr(decorated_class, cst.UNMODIFIED_NEW), kwargs)
+                )
+
+            original_new = getattr(decorated_class, cst.UNMODIFIED_NEW)
+
+            if scope is not None and not args:
+                return used_class_loader._get_scoped(
+                    decorated_class,
+                    scope,
+                    used_class_loader._instance_storage.generate_key(decorated_class, [], kwargs),
+                    lambda: _create(cls, original_new, kwargs),
+                )
+
             if as_singleton:
+                if not args:
+                    return used_class_loader._instance_storage.get_or_create(
+                        decorated_class, [], kwargs, lambda: _create(cls, original_new, kwargs)
+                    )
+
                 existing_instance = used_class_loader._instance_storage.get_instance(
                     decorated_class, list(args), kwargs
                 )
-                if existing_instance:
+                if existing_instance is not None:
                     return existing_instance
+            elif scope is None and not args and cls is decorated_class and _is_default_call(kwargs):
+                # built completely here, so __init__ decides by its arguments only and never sees a pool set in between
+                object_pool = used_class_loader._pools.get(decorated_class, None)
+                if object_pool is not None:
+                    return object_pool.acquire(lambda: _create(cls, original_new, kwargs))
+
+                return _create(cls, original_new, kwargs)
 
-            original_new = getattr(decorated_class, cst.UNMODIFIED_NEW)
             return original_new(cls)
 
         def __init__(self, *args, **kwargs) -> None:
@@ -41,27 +88,52 @@ def autowired(
                 original_init(self, *args)
                 return
 
-            existing_instance = None
-            if as_singleton:
-                existing_instance = used_class_loader._instance_storage.get_instance(
-                    decorated_class, [], kwargs
-                )
+            if as_singleton or scope is not None:
+                # the instance was already created and initialized by __new__
+                return
 
-            if not existing_instance:
-                original_init = getattr(decorated_class, cst.UNMODIFIED_INIT)
-                seen_types = kwargs.get(cst.ALREADY_SEEN_TYPES, [])
-                used_class_loader.autowire_function(
-                    decorated_class,
-                    original_init,
-                    self,
-                    as_singleton,
-                    seen_types,
-                    **{**annotation_args, **kwargs}
-                )
+            if type(self) is decorated_class and _is_default_call(kwargs):
+                # the instance was created (or reused by the pool) in __new__
+                return
 
-                used_class_loader._instance_storage.add_or_get(
-                    decorated_class, self, [], kwargs
-                )
+            _autowire(self, kwargs)
+
+        def _create(cls, original_new, kwargs) -> T:
+            instance = original_new(cls)
+            _autowire(instance, kwargs)
+            return instance
+
+        def _autowire(instance, kwargs) -> None:
+            frozen_init = None
+            if _is_default_call(kwargs):
+                frozen_factory = used_class_loader._frozen_factories.get(decorated_class)
+                # only factories of classes autowired with another ClassLoader lack init, they are never frozen roots
+                frozen_init = None if frozen_factory is None else frozen_factory.init
+
+            if frozen_init is not None:
+                metrics = used_class_loader._metrics
+                if metrics is None:
+                    frozen_init(instance)
+                    return
+
+                frame = metrics.enter(decorated_class)
+                try:
+                    frozen_init(instance)
+                    frame.finished()
+                finally:
+                    metrics.exit(frame)
+                return
+
+            original_init = getattr(decorated_class, cst.UNMODIFIED_INIT)
+            seen_types = kwargs.get(cst.ALREADY_SEEN_TYPES, [])
+            used_class_loader.autowire_function(
+                decorated_class,
+                original_init,
+                instance,
+                as_singleton and scope is None,
+                seen_types,
+                **{**annotation_args, **kwargs}
+            )
 
         setattr(decorated_class, cst.UNMODIFIED_INIT, decorated_class.__init__)
         setattr(decorated_class, cst.UNMODIFIED_NEW, decorated_class.__new__)
@@ -73,8 +145,18 @@ def autowired(
         )
 
         if not dont_add:
-            used_class_loader._check_autowire._known_types.append(
-                decorated_class)
+            setattr(decorated_class, cst.AUTOWIRE_OPTIONS, AutowireOptions(
+                as_singleton, used_class_loader, annotation_args, scope))
+            used_class_loader._register(decorated_class)
+
+            if storage_policy is not None:
+                used_class_loader.set_storage_policy(decorated_class, storage_policy)
+
+            if ForkPolicy(fork_policy) is not ForkPolicy.INHERIT:
+                used_class_loader.set_fork_policy(decorated_class, fork_policy)
+
+            if pool is not None:
+                used_class_loader.set_pool(decorated_class, pool)
 
         return decorated_class
 
@@ -82,3 +164,8 @@ def autowired(
         return decorator
     else:
         return decorator(class_)
+
+
+def _is_default_call(kwargs) -> bool:
+    """Checks if a class is called without custom arguments. The dependency chain is passed internally and does not count."""
+    return not kwargs or (len(kwargs) == 1 and cst.ALREADY_SEEN_TYPES in kwargs)
@@ -0,0 +1,226 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Type
+
+import smarti.constants as cst
+from smarti.autowire_options import get_options, original_constructors
+from smarti.resolution_chain import ResolutionChain
+
+
+def reachable_types(class_loader: Any, class_: Type) -> Set[Type]:
+    """Gets a class and all classes it may be built from, following the injection plans, including lazy dependencies.
+    Unlike DependencyGraph, nothing is validated; parameters which cannot be autowired or have a default are skipped.
+
+    Args:
+        class_loader (Any): The ClassLoader whose plans are used.
+        class_ (Type): The class to start from.
+
+    Returns:
+        Set[Type]: The reachable classes, including class_.
+    """
+    check_autowire = class_loader._check_autowire
+    seen: Set[Type] = set()
+    pending: List[Type] = [class_]
+    while pending:
+        current = pending.pop()
+        if current in seen or not isinstance(current, type):
+            continue
+
+        seen.add(current)
+        options = get_options(current)
+        init = getattr(current, cst.UNMODIFIED_INIT) if options is not None else original_constructors(current)[1]
+        try:
+            plan = check_autowire.get_plan(init)
+        except (TypeError, ValueError):
+            continue
+
+        pending.extend(
+            class_loader._load_class_type(parameter.type_)
+            for parameter in plan.parameters
+            if parameter.can_autowire and not parameter.has_default
+        )
+
+    return seen
+
+
+class DependencyNode:
+    """A class of the dependency graph, constructed with fixed custom arguments."""
+    __slots__ = (
+        "type_", "call_kwargs", "key", "as_singleton", "scope", "autowired", "foreign",
+        "new", "init", "constants", "dependencies", "lazy_dependencies",
+    )
+
+    def __init__(self, type_: Type, call_kwargs: Dict[str, Any], key: Hashable, as_singleton: bool) -> None:
+        self.type_ = type_
+        self.call_kwargs = call_kwargs
+        self.key = key
+        self.as_singleton = as_singleton
+        self.scope: Optional[str] = None
+        self.autowired = False
+        self.foreign = False
+        self.new: Optional[Callable] = None
+        self.init: Optional[Callable] = None
+        self.constants: List[Tuple[str, Any]] = []
+        self.dependencies: List[Tuple[str, "DependencyNode"]] = []
+        # lazy dependencies are not expanded, they are resolved on first use: (name, type, kwargs of the node)
+        self.lazy_dependencies: List[Tuple[str, Type, Dict[str, Any]]] = []
+
+    @property
+    def name(self) -> str:
+        return self.type_.__qualname__
+
+    def __repr__(self) -> str:
+        return f"DependencyNode({self.name})"
+
+
+class DependencyGraph:
+    """The dependency graph of a ClassLoader, computed from the injection plans of the constructors.
+    Building the graph validates it: cycles, un-autowirable parameters and unwired classes in ALL_DEPENDENCIES_AUTOWIRED mode raise.
+    """
+
+    def __init__(self, class_loader: Any) -> None:
+        self._class_loader = class_loader
+        self._check_autowire = class_loader._check_autowire
+        self.nodes: Dict[Tuple[Type, bool, Hashable], DependencyNode] = {}
+        self.roots: List[DependencyNode] = []
+
+    @classmethod
+    def from_roots(cls, class_loader: Any, roots: Iterable[Type]) -> "DependencyGraph":
+        """Builds the graph of the given classes and all their dependencies.
+
+        Args:
+            class_loader (Any): The ClassLoader.
+            roots (Iterable[Type]): The classes to start from.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            DependencyGraph: The graph.
+        """
+        graph = cls(class_loader)
+        for root in roots:
+            graph.add_root(root)
+
+        return graph
+
+    def add_root(
+        self, class_: Type, call_kwargs: Optional[Dict[str, Any]] = None, as_singleton: Optional[bool] = None,
+    ) -> DependencyNode:
+        """Adds a class and all its dependencies to the graph.
+
+        Args:
+            class_ (Type): The class.
+            call_kwargs (Optional[Dict[str, Any]], optional): The custom arguments of the class. Defaults to None.
+            as_singleton (Optional[bool], optional): If unwired classes are singletons. Defaults to None, the option of the class or True.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            DependencyNode: The node of the class.
+        """
+        if as_singleton is None:
+            options = get_options(class_)
+            as_singleton = options.as_singleton if options is not None else True
+
+        node = self._node(class_, call_kwargs or {}, as_singleton, ResolutionChain([class_]))
+        if node not in self.roots:
+            self.roots.append(node)
+
+        return node
+
+    def _node(self, class_: Type, call_kwargs: Dict[str, Any], as_singleton: bool, chain: ResolutionChain) -> DependencyNode:
+        class_loader = self._class_loader
+        options = get_options(class_)
+
+        if options is not None:
+            as_singleton = options.as_singleton and options.scope is None
+
+        key = class_loader._instance_storage.generate_key(class_, [], call_kwargs)
+        memo_key = (class_, as_singleton, key)
+        node = self.nodes.get(memo_key, None)
+        if node is not None:
+            return node
+
+        node = DependencyNode(class_, call_kwargs, key, as_singleton)
+
+        if options is not None and options.class_loader is not class_loader:
+            node.autowired = True
+            node.foreign = True
+            node.scope = options.scope
+            self.nodes[memo_key] = node
+            return node
+
+        if options is not None:
+            node.autowired = True
+            node.scope = options.scope
+            node.init = getattr(class_, cst.UNMODIFIED_INIT)
+            node.new = getattr(class_, cst.UNMODIFIED_NEW)
+            kwargs = {**options.annotation_args, **call_kwargs}
+        else:
+            self._check_autowire.ensure_unwired_allowed(class_loader._flags)
+            node.new, node.init = original_constructors(class_)
+            kwargs = call_kwargs
+
+        plan = self._check_autowire.get_plan(node.init)
+        if not self._check_autowire.can_autowire_plan(plan, class_loader._flags, class_, chain, kwargs):
+            raise RuntimeError(f"Cannot Autowire function {node.init}")
+
+        constants, injected = plan.bind(kwargs, node.init)
+        node.constants.extend(constants.items())
+        for parameter in injected:
+            name = parameter.name
+            if parameter.lazy:
+                node.lazy_dependencies.append((name, parameter.type_, kwargs))
+                continue
+
+            dependency = class_loader._load_class_type(parameter.type_)
+            chain.push(dependency)
+            try:
+                node.dependencies.append((name, self._node(
+                    dependency,
+                    class_loader._get_kwargs_for_argument(name, kwargs),
+                    as_singleton,
+                    chain,
+                )))
+            finally:
+                chain.pop()
+
+        self.nodes[memo_key] = node
+        return node
+
+    def topological_order(self) -> List[DependencyNode]:
+        """Gets all nodes, dependencies before their dependents.
+
+        Returns:
+            List[DependencyNode]: The nodes.
+        """
+        return [node for level in self.levels() for node in level]
+
+    def levels(self) -> List[List[DependencyNode]]:
+        """Groups the nodes into waves. Every node only depends on nodes of earlier waves, so the nodes of one wave are independent.
+
+        Returns:
+            List[List[DependencyNode]]: The waves, leaves first.
+        """
+        heights: Dict[int, int] = {}
+
+        def height(node: DependencyNode) -> int:
+            result = heights.get(id(node), None)
+            if result is None:
+                result = 1 + max((height(d) for _, d in node.dependencies), default=-1)
+                heights[id(node)] = result
+
+            return result
+
+        levels: List[List[DependencyNode]] = []
+        for node in self.nodes.values():
+            level = height(node)
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(node)
+
+        return levels
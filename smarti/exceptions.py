@@ -2,3 +2,9 @@ class CyclicDependencyException(Exception):
     """Represents a cyclic dependency. E.g. A -> B -> A.
     """
     pass
+
+
+class ScopeNotActiveException(Exception):
+    """Represents the resolution of a scoped class outside of its scope. E.g. a request scoped class outside of a request.
+    """
+    pass
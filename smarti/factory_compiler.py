@@ -0,0 +1,124 @@
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Type
+
+from smarti.dependency_graph import DependencyGraph, DependencyNode
+
+
+class FrozenFactory:
+    """The generated factory functions of a class.
+
+    init(instance) initializes an already allocated instance with its dependencies.
+    create() returns a fully initialized instance, respecting singletons and scopes.
+    """
+    __slots__ = ("type_", "init", "create")
+
+    def __init__(self, type_: Type, init: Optional[Callable[[Any], None]], create: Callable[[], Any]) -> None:
+        self.type_ = type_
+        self.init = init
+        self.create = create
+
+
+class FactoryCompiler:
+    """Validates the dependency graph of a ClassLoader and generates a specialized factory function per class.
+    The generated functions construct the dependencies directly, without walking the generic recursive path.
+    """
+
+    def __init__(self, class_loader: Any) -> None:
+        self._class_loader = class_loader
+        self._graph = DependencyGraph(class_loader)
+        self._factories: Dict[int, FrozenFactory] = {}
+
+    def compile(
+        self, class_: Type, call_kwargs: Optional[Dict[str, Any]] = None, as_singleton: Optional[bool] = None,
+    ) -> FrozenFactory:
+        """Compiles the factory of a class for calls with fixed custom arguments.
+
+        Args:
+            class_ (Type): The class.
+            call_kwargs (Optional[Dict[str, Any]], optional): The custom arguments of the class. Defaults to None.
+            as_singleton (Optional[bool], optional): If unwired classes are singletons. Defaults to None, the option of the class or True.
+
+        Raises:
+            RuntimeError: If a class of the dependency graph cannot be autowired.
+            TypeError: If a type cannot be autowired.
+            CyclicDependencyException: If there exists a cyclic dependency between types.
+
+        Returns:
+            FrozenFactory: The factory of the class.
+        """
+        return self._compile_node(self._graph.add_root(class_, call_kwargs, as_singleton))
+
+    def _compile_node(self, node: DependencyNode) -> FrozenFactory:
+        factory = self._factories.get(id(node), None)
+        if factory is not None:
+            return factory
+
+        if node.foreign:
+            type_, call_kwargs = node.type_, node.call_kwargs
+            factory = FrozenFactory(type_, None, lambda: type_(**call_kwargs))
+        else:
+            if node.as_singleton and not node.autowired:
+                self._class_loader._apply_implicit_policy(node.type_)
+
+            producers = [(name, self._compile_node(dependency).create) for name, dependency in node.dependencies]
+            producers += [
+                (name, partial(self._class_loader._lazy_dependency, type_, name, kwargs, node.as_singleton))
+                for name, type_, kwargs in node.lazy_dependencies
+            ]
+            factory = self._generate(node, producers)
+
+        self._factories[id(node)] = factory
+        return factory
+
+    def _generate(self, node: DependencyNode, producers: list) -> FrozenFactory:
+        """Generates the source of the factory functions and compiles it."""
+        storage = self._class_loader._instance_storage
+        namespace: Dict[str, Any] = {
+            "_cls": node.type_,
+            "_new": node.new,
+            "_init": node.init,
+            "_get": storage.get_by_key,
+            "_get_or_create": storage.get_or_create_by_key,
+            "_scoped": self._class_loader._get_scoped,
+            "_scope": node.scope,
+            "_key": node.key,
+        }
+
+        arguments = []
+        for i, (name, value) in enumerate(node.constants):
+            namespace[f"_c{i}"] = value
+            arguments.append(f"{name}=_c{i}")
+        for i, (name, producer) in enumerate(producers):
+            namespace[f"_p{i}"] = producer
+            arguments.append(f"{name}=_p{i}()")
+        argument_source = "".join(f", {argument}" for argument in arguments)
+
+        lines = [
+            "def init(instance):",
+            f"    _init(instance{argument_source})",
+            "def build():",
+            "    instance = _new(_cls)",
+            f"    _init(instance{argument_source})",
+            "    return instance",
+        ]
+
+        if node.scope is not None:
+            lines += [
+                "def create():",
+                "    return _scoped(_cls, _scope, _key, build)",
+            ]
+        elif node.as_singleton:
+            lines += [
+                "def create():",
+                "    instance = _get(_cls, _key)",
+                "    if instance is None:",
+                "        instance = _get_or_create(_cls, _key, build)",
+                "    return instance",
+            ]
+        else:
+            lines += ["create = build"]
+
+        source = "\n".join(lines)
+        exec(compile(source, f"<smarti factory {node.type_.__qualname__}>", "exec"), namespace)
+
+        return FrozenFactory(node.type_, namespace["init"], namespace["create"])
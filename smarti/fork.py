@@ -0,0 +1,41 @@
+import os
+import weakref
+from enum import Enum
+from typing import Any
+
+
+class ForkPolicy(Enum):
+    """Decides what happens to the singletons of a class when a pre-fork server (gunicorn, multiprocessing) forks a worker."""
+
+    # the singleton is shared with the workers copy-on-write, e.g. expensive immutable models warmed in the parent
+    INHERIT = "inherit"
+    # every worker lazily builds its own singleton, e.g. connections and thread pools
+    PER_PROCESS = "per-process"
+
+
+def register_fork_hooks(class_loader: Any) -> bool:
+    """Resets the locks and the per-process singletons of a ClassLoader in every forked child.
+    A single hook of this module serves all ClassLoaders. They are weakly referenced, so the hook does not keep them alive.
+
+    Args:
+        class_loader (Any): The ClassLoader.
+
+    Returns:
+        bool: True if the hooks were registered, False if the platform does not support fork.
+    """
+    if not hasattr(os, "register_at_fork"):
+        return False
+
+    _class_loaders.add(class_loader)
+    return True
+
+
+def _after_fork_in_child() -> None:
+    for class_loader in list(_class_loaders):
+        class_loader._after_fork_in_child()
+
+
+_class_loaders: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,144 @@
+import json
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type
+
+from smarti.dependency_graph import DependencyGraph, DependencyNode
+from smarti.type_registry import qualified_name
+
+
+def critical_path(graph: DependencyGraph, timings: Mapping[Type, float]) -> Tuple[List[DependencyNode], float]:
+    """Gets the most expensive path from a root to a leaf, i.e. the lower bound of a fully parallel startup.
+
+    Args:
+        graph (DependencyGraph): The graph.
+        timings (Mapping[Type, float]): The construction time per class, without its dependencies.
+
+    Returns:
+        Tuple[List[DependencyNode], float]: The nodes of the path, root first, and its total time in seconds.
+    """
+    costs: Dict[int, Tuple[float, Optional[DependencyNode]]] = {}
+
+    for node in graph.topological_order():
+        heaviest = max(node.dependencies, key=lambda d: costs[id(d[1])][0], default=None)
+        dependency = None if heaviest is None else heaviest[1]
+        dependency_cost = 0.0 if dependency is None else costs[id(dependency)][0]
+        costs[id(node)] = (timings.get(node.type_, 0.0) + dependency_cost, dependency)
+
+    start = max(graph.roots or graph.nodes.values(), key=lambda n: costs[id(n)][0], default=None)
+    if start is None:
+        return [], 0.0
+
+    path = []
+    current: Optional[DependencyNode] = start
+    while current is not None:
+        path.append(current)
+        current = costs[id(current)][1]
+
+    return path, costs[id(start)][0]
+
+
+def graph_to_dict(graph: DependencyGraph, timings: Optional[Mapping[Type, float]] = None) -> Dict[str, Any]:
+    """Converts a dependency graph into JSON serializable data.
+
+    Args:
+        graph (DependencyGraph): The graph.
+        timings (Optional[Mapping[Type, float]], optional): The construction time per class, without its dependencies. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The nodes, the edges and the critical path of the graph.
+    """
+    timings = {} if timings is None else timings
+    ids = {id(node): index for index, node in enumerate(graph.nodes.values())}
+    roots = {id(node) for node in graph.roots}
+    path, path_seconds = critical_path(graph, timings)
+
+    nodes = []
+    edges: List[Dict[str, Any]] = []
+    for node in graph.nodes.values():
+        nodes.append({
+            "id": ids[id(node)],
+            "class": qualified_name(node.type_),
+            "name": node.name,
+            "root": id(node) in roots,
+            "autowired": node.autowired,
+            "singleton": node.as_singleton,
+            "scope": node.scope,
+            "custom_arguments": [name for name, _ in node.constants],
+            "lazy_dependencies": [
+                {"parameter": name, "class": qualified_name(type_)} for name, type_, _ in node.lazy_dependencies
+            ],
+            "seconds": timings.get(node.type_, None),
+        })
+        edges.extend(
+            {"from": ids[id(node)], "to": ids[id(dependency)], "parameter": name}
+            for name, dependency in node.dependencies
+        )
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "critical_path": [ids[id(node)] for node in path],
+        "critical_path_seconds": path_seconds,
+    }
+
+
+def graph_to_json(graph: DependencyGraph, timings: Optional[Mapping[Type, float]] = None, indent: Optional[int] = 2) -> str:
+    """Converts a dependency graph into JSON. See graph_to_dict.
+
+    Args:
+        graph (DependencyGraph): The graph.
+        timings (Optional[Mapping[Type, float]], optional): The construction time per class, without its dependencies. Defaults to None.
+        indent (Optional[int], optional): The indent of the JSON. Defaults to 2.
+
+    Returns:
+        str: The JSON document.
+    """
+    return json.dumps(graph_to_dict(graph, timings), indent=indent)
+
+
+def graph_to_dot(graph: DependencyGraph, timings: Optional[Mapping[Type, float]] = None) -> str:
+    """Converts a dependency graph into the DOT language of Graphviz.
+    Edges are labeled with the parameter names, lazy dependencies are dashed and the critical path is red.
+
+    Args:
+        graph (DependencyGraph): The graph.
+        timings (Optional[Mapping[Type, float]], optional): The construction time per class, without its dependencies. Defaults to None.
+
+    Returns:
+        str: The DOT document.
+    """
+    data = graph_to_dict(graph, timings)
+    critical = set(data["critical_path"])
+    critical_edges = set(zip(data["critical_path"], data["critical_path"][1:]))
+
+    lines = ["digraph smarti {", "    rankdir=LR;", "    node [shape=box];"]
+    for node in data["nodes"]:
+        label = node["name"]
+        if node["seconds"] is not None:
+            label += f"\\n{node['seconds'] * 1000:.2f} ms"
+        if not node["singleton"]:
+            label += "\\n(transient)" if node["scope"] is None else f"\\n(scope {node['scope']})"
+
+        attributes = [f"label={_quote(label)}"]
+        if not node["autowired"]:
+            attributes.append("style=dashed")
+        if node["id"] in critical:
+            attributes.append("color=red")
+        lines.append(f"    n{node['id']} [{', '.join(attributes)}];")
+
+        for index, lazy in enumerate(node["lazy_dependencies"]):
+            lazy_id = f"n{node['id']}_lazy{index}"
+            lines.append(f"    {lazy_id} [label={_quote(lazy['class'].rsplit('.', 1)[-1])}, style=dotted];")
+            lines.append(f"    n{node['id']} -> {lazy_id} [label={_quote(lazy['parameter'])}, style=dashed];")
+
+    for edge in data["edges"]:
+        attributes = [f"label={_quote(edge['parameter'])}"]
+        if (edge["from"], edge["to"]) in critical_edges:
+            attributes.append("color=red")
+        lines.append(f"    n{edge['from']} -> n{edge['to']} [{', '.join(attributes)}];")
+
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '\\"') + '"'
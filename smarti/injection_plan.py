@@ -0,0 +1,205 @@
+import inspect
+import os
+import weakref
+from threading import Lock
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Tuple, Type, get_args, get_origin
+
+from smarti.annotation_resolver import AnnotationResolver
+from smarti.lazy import Lazy
+
+
+class ParameterPlan:
+    """The precomputed injection information of a single parameter."""
+    __slots__ = ("name", "type_", "default", "has_default", "can_autowire", "lazy", "unresolved")
+
+    def __init__(
+        self, name: str, type_: Type, default: Any, can_autowire: bool, lazy: bool = False, unresolved: bool = False,
+    ) -> None:
+        self.name = name
+        self.type_ = type_
+        self.default = default
+        self.has_default = default is not inspect.Parameter.empty
+        self.can_autowire = can_autowire
+        self.lazy = lazy
+        self.unresolved = unresolved
+
+    def __repr__(self) -> str:
+        return f"ParameterPlan({self.name}: {self.type_})"
+
+
+class InjectionPlan:
+    """The precomputed injection information of a callable. It is computed once per callable and reused for every resolution.
+    Plans with unresolved forward references are incomplete; they are not cached, so they are computed again once the names are defined.
+    """
+    __slots__ = ("parameters", "problems", "unresolved")
+
+    def __init__(
+        self, parameters: Tuple[ParameterPlan, ...], problems: Tuple[str, ...], unresolved: Tuple[str, ...] = (),
+    ) -> None:
+        self.parameters = parameters
+        self.problems = problems
+        self.unresolved = unresolved
+
+    @classmethod
+    def from_callable(
+        cls,
+        callable: Callable,
+        can_autowire_type: Callable[[Type], bool],
+        ignored_arguments: List[str],
+        annotation_resolver: Optional[AnnotationResolver] = None,
+    ) -> "InjectionPlan":
+        """Introspects a callable and creates its plan.
+
+        Args:
+            callable (Callable): The callable to introspect.
+            can_autowire_type (Callable[[Type], bool]): Determines if a type can be autowired.
+            ignored_arguments (List[str]): The argument names which are never injected (e.g. self).
+            annotation_resolver (Optional[AnnotationResolver], optional): Resolves the annotations. Defaults to None, a shared resolver.
+
+        Returns:
+            InjectionPlan: The plan of the callable.
+        """
+        resolver = _DEFAULT_RESOLVER if annotation_resolver is None else annotation_resolver
+        hints, unresolved_hints = resolver.resolve(callable)
+        signature = inspect.signature(callable)
+
+        parameters = []
+        problems = []
+        unresolved = []
+        for name, param in signature.parameters.items():
+            if name in ignored_arguments or param.kind in (
+                inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD
+            ):
+                continue
+
+            if name in unresolved_hints:
+                # kept with its raw annotation, so a custom argument is still passed
+                unresolved.append(name)
+                parameters.append(ParameterPlan(name, param.annotation, param.default, False, unresolved=True))
+                continue
+
+            if name not in hints:
+                if param.default is inspect.Parameter.empty:
+                    problems.append(name)
+                continue
+
+            param_type = hints[name]
+            lazy = get_origin(param_type) is Lazy
+            if lazy:
+                param_type = get_args(param_type)[0]
+
+            try:
+                autowireable = can_autowire_type(param_type)
+            except (TypeError, AttributeError):
+                autowireable = False
+
+            parameters.append(ParameterPlan(
+                name, param_type, param.default, autowireable, lazy))
+
+        return cls(tuple(parameters), tuple(problems), tuple(unresolved))
+
+    def bind(self, kwargs: Dict[str, Any], callable: Callable) -> Tuple[Dict[str, Any], List[ParameterPlan]]:
+        """Splits the parameters into the custom arguments and the parameters which have to be injected.
+        Parameters with a default value and without a custom argument are left out.
+
+        Args:
+            kwargs (Dict[str, Any]): All the custom arguments for the callable.
+            callable (Callable): The callable of the plan, for the error messages.
+
+        Raises:
+            NameError: If the annotation of a parameter without custom argument references a name which is not defined (yet).
+            TypeError: If the type of a parameter without custom argument cannot be autowired.
+
+        Returns:
+            Tuple[Dict[str, Any], List[ParameterPlan]]: The custom arguments by name and the parameters to inject, in order.
+        """
+        arguments = {}
+        injected = []
+        for parameter in self.parameters:
+            name = parameter.name
+            if name in kwargs:
+                arguments[name] = kwargs[name]
+                continue
+
+            if parameter.unresolved:
+                raise NameError(f"Cannot resolve the annotation of {name} of {callable}, it references an undefined name")
+
+            if parameter.has_default:
+                continue
+
+            if not parameter.can_autowire:
+                raise TypeError(
+                    f"Cannot Autowire {name}: {parameter.type_} of {callable}")
+
+            injected.append(parameter)
+
+        return arguments, injected
+
+
+class InjectionPlanCache:
+    """Caches the plans per callable. Callables are weakly referenced, so the cache does not keep classes alive."""
+
+    def __init__(self) -> None:
+        self._plans: MutableMapping[Callable, InjectionPlan] = weakref.WeakKeyDictionary()
+        self._strong_plans: Dict[Callable, InjectionPlan] = {}
+        self._lock = Lock()
+
+    def get(self, callable: Callable, factory: Callable[[Callable], InjectionPlan]) -> InjectionPlan:
+        """Gets the cached plan of the callable or creates it.
+
+        Args:
+            callable (Callable): The callable.
+            factory (Callable[[Callable], InjectionPlan]): Creates the plan on a cache miss.
+
+        Returns:
+            InjectionPlan: The plan of the callable.
+        """
+        storage = self._storage_for(callable)
+        try:
+            plan = storage.get(callable, None)
+        except TypeError:
+            storage = self._strong_plans
+            plan = storage.get(callable, None)
+
+        if plan is not None:
+            return plan
+
+        plan = factory(callable)
+        if plan.unresolved:
+            return plan
+
+        with self._lock:
+            return storage.setdefault(callable, plan)
+
+    def reset_lock(self) -> None:
+        """Replaces the lock guarding the cached plans, e.g. in a forked child."""
+        self._lock = Lock()
+
+    def invalidate(self, callable: Callable) -> None:
+        """Removes the plan of a callable from the cache.
+
+        Args:
+            callable (Callable): The callable.
+        """
+        with self._lock:
+            self._storage_for(callable).pop(callable, None)
+
+    def clear(self) -> None:
+        """Removes all plans from the cache."""
+        with self._lock:
+            self._plans.clear()
+            self._strong_plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans) + len(self._strong_plans)
+
+    def _storage_for(self, callable: Callable) -> MutableMapping[Callable, InjectionPlan]:
+        """Builtin callables like object.__init__ cannot be weakly referenced, but live forever anyway."""
+        return self._strong_plans if isinstance(callable, _NOT_WEAKREFABLE) else self._plans
+
+
+_NOT_WEAKREFABLE = (type(object.__init__), type(len))
+_DEFAULT_RESOLVER = AnnotationResolver()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_DEFAULT_RESOLVER.reset_lock)
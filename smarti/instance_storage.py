@@ -1,21 +1,179 @@
 import inspect
-import pickle
-from threading import Lock
-from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+import time
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, Type, TypeVar
 
 from smarti import constants as cst
+from smarti.key_strategy import KeyStrategy, StructuralKeyStrategy, key_size
+from smarti.metrics import ResolutionMetrics
+from smarti.storage_policy import StoragePolicy, UnboundedPolicy
 
 T = TypeVar("T")
 
 
 class InstanceStorage:
     """This class handles all the singleton related magic.
+    Reads of existing instances are lock-free. Instances are created at most once per key, while different keys are created in parallel.
     """
     IGNORED_ARGUMENTS = [cst.ALREADY_SEEN_TYPES]
 
-    def __init__(self) -> None:
-        self._storage: Dict[Tuple, Any] = {}
+    def __init__(self, key_strategy: Optional[KeyStrategy] = None) -> None:
+        self._storage: Dict[Hashable, Any] = {}
+        # the singletons created without arguments, read directly by the decorator. Types with a policy are never cached here.
+        self._defaults: Dict[Type, Any] = {}
         self._storage_lock = Lock()
+        self._creation_locks: Dict[Hashable, RLock] = {}
+        self._key_strategy = StructuralKeyStrategy() if key_strategy is None else key_strategy
+        self._identities: Dict[Type, str] = {}
+        self._policies: Dict[Type, StoragePolicy] = {}
+        self._per_process: Set[Type] = set()
+        self._metrics: Optional[ResolutionMetrics] = None
+
+    def set_policy(self, type_: Type, policy: Optional[StoragePolicy]) -> None:
+        """Sets the storage policy of a type. Instances of types without policy are retained forever.
+        The existing singletons of the type are moved to the new policy, so they stay singletons.
+
+        Args:
+            type_ (Type): The type.
+            policy (Optional[StoragePolicy]): The policy or None to remove the policy.
+        """
+        with self._storage_lock:
+            self._defaults.pop(type_, None)
+            if policy is None and type_ in self._per_process:
+                # per-process singletons are always stored separately, so they can be dropped after a fork
+                policy = UnboundedPolicy()
+
+            previous = self._policies.get(type_, None)
+            if policy is None:
+                self._policies.pop(type_, None)
+            else:
+                self._policies[type_] = policy
+            self._move_instances(type_, previous, policy)
+
+    def set_per_process(self, type_: Type, per_process: bool) -> None:
+        """Marks the singletons of a type as per-process: forked children drop them and rebuild them lazily (see reset_after_fork).
+
+        Args:
+            type_ (Type): The type.
+            per_process (bool): True if every process needs its own singletons, False if children inherit them.
+        """
+        with self._storage_lock:
+            if not per_process:
+                self._per_process.discard(type_)
+                return
+
+            self._per_process.add(type_)
+            self._defaults.pop(type_, None)
+            if type_ not in self._policies:
+                self._policies[type_] = UnboundedPolicy()
+
+    def is_per_process(self, type_: Type) -> bool:
+        """Checks if the singletons of a type are rebuilt in every process.
+
+        Args:
+            type_ (Type): The type.
+
+        Returns:
+            bool: True if the singletons are per-process, False if they are inherited by forked children.
+        """
+        return type_ in self._per_process
+
+    def reset_after_fork(self) -> None:
+        """Prepares the storage of a forked child. All locks are replaced, as they may be held by threads of the parent,
+        constructions in flight in the parent are forgotten and the singletons of per-process types are dropped.
+        """
+        self._storage_lock = Lock()
+        self._creation_locks = {}
+
+        for type_, policy in self._policies.items():
+            policy.reset_lock()
+            if type_ in self._per_process:
+                policy.clear()
+
+    def per_process_types(self) -> Set[Type]:
+        """Gets the types whose singletons are rebuilt in every process.
+
+        Returns:
+            Set[Type]: A snapshot of the types.
+        """
+        return set(self._per_process)
+
+    def drop(self, types: Set[Type]) -> None:
+        """Drops the singletons of some types, e.g. of the dependents of per-process types in a forked child. They are created again on their next use.
+
+        Args:
+            types (Set[Type]): The types.
+        """
+        if not types:
+            return
+
+        identities = {self._identities[type_] for type_ in types if type_ in self._identities}
+        with self._storage_lock:
+            for type_ in types:
+                self._defaults.pop(type_, None)
+            # the builtin key strategies start every key with the identity of the class
+            for key in [k for k in self._storage if isinstance(k, tuple) and k and k[0] in identities]:
+                del self._storage[key]
+            policies = [policy for type_, policy in self._policies.items() if type_ in types]
+
+        for policy in policies:
+            policy.clear()
+
+    def ensure_policy(self, type_: Type, policy_factory: Callable[[], StoragePolicy]) -> StoragePolicy:
+        """Sets a new storage policy for a type, if it has none yet. The existing singletons of the type are moved to the new policy.
+
+        Args:
+            type_ (Type): The type.
+            policy_factory (Callable[[], StoragePolicy]): Creates the policy.
+
+        Returns:
+            StoragePolicy: The policy of the type.
+        """
+        policy = self._policies.get(type_, None)
+        if policy is not None:
+            return policy
+
+        with self._storage_lock:
+            policy = self._policies.get(type_, None)
+            if policy is None:
+                policy = self._policies[type_] = policy_factory()
+                self._defaults.pop(type_, None)
+                self._move_instances(type_, None, policy)
+
+            return policy
+
+    def _move_instances(self, type_: Type, previous: Optional[StoragePolicy], policy: Optional[StoragePolicy]) -> None:
+        """Moves the singletons of a type from its previous policy (or the unbounded storage) to its new one. Requires the storage lock."""
+        if previous is policy:
+            return
+
+        entries: List[Tuple[Hashable, Any]]
+        if previous is None:
+            identity = self._identities.get(type_, None)
+            # the builtin key strategies start every key with the identity of the class
+            keys = [k for k in self._storage if isinstance(k, tuple) and k and k[0] == identity] if identity is not None else []
+            entries = [(key, self._storage.pop(key)) for key in keys]
+        else:
+            entries = [(key, previous.peek(key)) for key in previous.keys()]
+
+        for key, instance in entries:
+            if instance is None:
+                continue
+            if policy is None:
+                self._storage.setdefault(key, instance)
+            else:
+                policy.put(key, instance)
+
+    def get_policy(self, type_: Type) -> Optional[StoragePolicy]:
+        """Gets the storage policy of a type.
+
+        Args:
+            type_ (Type): The type.
+
+        Returns:
+            Optional[StoragePolicy]: The policy or None.
+        """
+        return self._policies.get(type_, None)
 
     def get_instance(
         self, type_: Type[T], arguments: List, kwargs: Optional[Dict] = None
@@ -33,20 +191,113 @@ class InstanceStorage:
         Returns:
             Optional[T]: The instance of the type with the given arguments. None if there is no such instance.
         """
-        classname = type_.__name__
+        return self.get_by_key(type_, self.generate_key(type_, arguments, kwargs))
 
-        module = inspect.getmodule(type_)
-        if module is None:
-            raise RuntimeError(f"Could not get module of type {type_}")
+    def get_or_create(
+        self, type_: Type[T], arguments: List, kwargs: Optional[Dict], factory: Callable[[], T]
+    ) -> T:
+        """Gets an existing instance or creates it. Concurrent calls with the same key wait for a single creation.
+
+        Args:
+            type_ (Type[T]): The type of the instance.
+            arguments (List): The arguments of the instance.
+            kwargs (Optional[Dict]): The kwargs of the instance.
+            factory (Callable[[], T]): Creates the instance if it does not exist yet.
+
+        Raises:
+            RuntimeError: If the module of the class cannot be found.
+
+        Returns:
+            T: The existing or created instance.
+        """
+        return self.get_or_create_by_key(type_, self.generate_key(type_, arguments, kwargs), factory)
+
+    def get_or_create_default(self, type_: Type[T], factory: Callable[[], T]) -> T:
+        """Gets or creates the singleton of a type without arguments. Once it exists, it is returned by a single dict lookup,
+        unless the type has a storage policy or metrics are enabled.
+
+        Args:
+            type_ (Type[T]): The type of the instance.
+            factory (Callable[[], T]): Creates the instance if it does not exist yet.
+
+        Returns:
+            T: The existing or created instance.
+        """
+        instance = self._defaults.get(type_, None)
+        if instance is not None and self._metrics is None:
+            return instance
+
+        instance = self.get_or_create(type_, [], None, factory)
+        if type_ not in self._policies:
+            with self._storage_lock:
+                if type_ not in self._policies:
+                    self._defaults[type_] = instance
+
+        return instance
+
+    def get_by_key(self, type_: Type[T], key: Hashable) -> Optional[T]:
+        """Gets an existing instance by a key generated with generate_key. This never blocks for types without policy.
+
+        Args:
+            type_ (Type[T]): The type of the instance.
+            key (Hashable): The key of the instance.
+
+        Returns:
+            Optional[T]: The instance or None.
+        """
+        policy = self._policies.get(type_, None)
+        if policy is None:
+            return self._storage.get(key, None)
+
+        return policy.get(key)
 
-        key = self._generate_key(
-            module.__name__, classname, type_, arguments, kwargs)
+    def get_or_create_by_key(self, type_: Type[T], key: Hashable, factory: Callable[[], T]) -> T:
+        """Gets an existing instance by a key generated with generate_key or creates it. See get_or_create.
 
-        self._storage_lock.acquire()
-        data = self._storage.get(key, None)
-        self._storage_lock.release()
+        Args:
+            type_ (Type[T]): The type of the instance.
+            key (Hashable): The key of the instance.
+            factory (Callable[[], T]): Creates the instance if it does not exist yet.
+
+        Returns:
+            T: The existing or created instance.
+        """
+        instance = self.get_by_key(type_, key)
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.record_lookup(type_, instance is not None)
 
-        return data
+        if instance is not None:
+            return instance
+
+        with self._storage_lock:
+            creation_lock = self._creation_locks.get(key, None)
+            if creation_lock is None:
+                creation_lock = self._creation_locks[key] = RLock()
+
+        if metrics is None:
+            creation_lock.acquire()
+        else:
+            start = time.perf_counter()
+            creation_lock.acquire()
+            metrics.record_lock_wait(type_, time.perf_counter() - start)
+
+        try:
+            policy = self._policies.get(type_, None)
+            instance = self._storage.get(key, None) if policy is None else policy.peek(key)
+            if instance is not None:
+                return instance
+
+            try:
+                instance = self.add_or_get_by_key(type_, key, factory())
+            finally:
+                with self._storage_lock:
+                    if self._creation_locks.get(key, None) is creation_lock:
+                        del self._creation_locks[key]
+        finally:
+            creation_lock.release()
+
+        return instance
 
     def add_or_get(
         self, type_: Type[T], instance: T, arguments: List, kwargs: Optional[Dict] = None
@@ -65,24 +316,133 @@ class InstanceStorage:
         Returns:
             T: The instance.
         """
-        classname = type_.__name__
+        return self.add_or_get_by_key(type_, self.generate_key(type_, arguments, kwargs), instance)
+
+    def add_or_get_by_key(self, type_: Type[T], key: Hashable, instance: T) -> T:
+        """Adds a new instance by a key generated with generate_key or gets the equal instance. See add_or_get.
+
+        Args:
+            type_ (Type[T]): The class of the instance.
+            key (Hashable): The key of the instance.
+            instance (T): The instance itself.
+
+        Returns:
+            T: The instance.
+        """
+        policy = self._policies.get(type_, None)
+        if policy is not None:
+            return policy.put(key, instance)
+
+        with self._storage_lock:
+            return self._storage.setdefault(key, instance)
+
+    def generate_key(self, type_: Type, arguments: List, kwargs: Optional[Dict] = None) -> Hashable:
+        """Generates the storage key of a type and its arguments using the key strategy.
+
+        Args:
+            type_ (Type): The type of the instance.
+            arguments (List): The arguments of the instance.
+            kwargs (Optional[Dict], optional): The kwargs of the instance. Defaults to None.
+
+        Raises:
+            RuntimeError: If the module of the class cannot be found.
+
+        Returns:
+            Hashable: The key for the local instance storage.
+        """
+        identity = self._identities.get(type_, None)
+        if identity is None:
+            identity = self._identity_of(type_)
+
+        if kwargs and cst.ALREADY_SEEN_TYPES in kwargs:
+            kwargs = {
+                k: v for k, v in kwargs.items() if k not in InstanceStorage.IGNORED_ARGUMENTS
+            }
+
+        return self._key_strategy.generate_key(identity, type_, arguments, kwargs)
+
+    def instances(self) -> List[Any]:
+        """Gets all stored singletons.
+
+        Returns:
+            List[Any]: A snapshot of the instances.
+        """
+        with self._storage_lock:
+            instances = list(self._storage.values())
+            policies = list(self._policies.values())
+
+        for policy in policies:
+            for key in policy.keys():
+                instance = policy.peek(key)
+                if instance is not None:
+                    instances.append(instance)
+
+        return instances
+
+    def clear(self) -> None:
+        """Drops all stored singletons. They are created again on their next use."""
+        with self._storage_lock:
+            self._storage.clear()
+            self._defaults.clear()
+            policies = list(self._policies.values())
+
+        for policy in policies:
+            policy.clear()
+
+    def memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """Gets the number of stored singletons and the memory taken by their keys per class.
+        Objects shared between keys, like the identity of a class, are counted once.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The instances and key bytes per qualified class name.
+        """
+        usage: Dict[str, Dict[str, int]] = {}
+        seen: Set[int] = set()
+
+        def add(identity: str, key: Hashable) -> None:
+            entry = usage.get(identity, None)
+            if entry is None:
+                entry = usage[identity] = {"instances": 0, "key_bytes": 0}
+
+            entry["instances"] += 1
+            entry["key_bytes"] += key_size(key, seen)
+
+        with self._storage_lock:
+            keys = list(self._storage)
+            policies = list(self._policies.items())
+
+        for key in keys:
+            # the builtin key strategies start every key with the identity of the class
+            identity = key[0] if isinstance(key, tuple) and key and isinstance(key[0], str) else "<unknown>"
+            add(identity, key)
+
+        for type_, policy in policies:
+            identity = self._identities.get(type_, None) or f"{type_.__module__}.{type_.__name__}"
+            for key in policy.keys():
+                add(identity, key)
+
+        return usage
+
+    def _identity_of(self, type_: Type) -> str:
+        """Computes the qualified name of a type once and caches it.
+
+        Args:
+            type_ (Type): The type.
+
+        Raises:
+            RuntimeError: If the module of the class cannot be found.
+
+        Returns:
+            str: The qualified name, e.g. "module.Class".
+        """
         module = inspect.getmodule(type_)
         if module is None:
             raise RuntimeError(f"Could not get module of type {type_}")
 
-        key = self._generate_key(
-            module.__name__, classname, type_, arguments, kwargs)
+        identity = f"{module.__name__}.{type_.__name__}"
+        self._identities[type_] = identity
 
-        self._storage_lock.acquire()
-        data = self._storage.get(key, None)
-        if data:
-            self._storage_lock.release()
-            return data
-
-        self._storage[key] = instance
-        self._storage_lock.release()
-
-        return instance
+        return identity
 
     def _generate_key(
         self,
@@ -91,7 +451,7 @@ class InstanceStorage:
         type_: Type,
         arguments: List,
         kwargs: Optional[Dict],
-    ) -> Tuple:
+    ) -> Hashable:
         """Generates the key for the instance storage.
 
         Args:
@@ -102,36 +462,6 @@ class InstanceStorage:
             kwargs (Optional[Dict]): The kwargs of the instance.
 
         Returns:
-            Tuple: The key for the local instance storage.
+            Hashable: The key for the local instance storage.
         """
-        sig = inspect.signature(type_.__init__)
-        params = [i for i in sig.parameters.items() if i[0] != 'self']
-        args = []
-
-        for i, (name, param) in enumerate(params):
-            if param.kind == inspect.Parameter.VAR_POSITIONAL:
-                args.append((name, pickle.dumps(arguments[i:])))
-                continue
-            elif param.kind == inspect.Parameter.VAR_KEYWORD:
-                continue
-
-            args.append((name, pickle.dumps(arguments[i])))
-
-        try:
-            kw_arg_hashable = pickle.dumps(kwargs)
-        except (TypeError, pickle.PicklingError):
-            tmp_args: List[Any] = []
-            for k, v in kwargs.items():  # type: ignore
-                try:
-                    tmp_args.append(pickle.dumps((k, v)))
-                except (TypeError, AttributeError):
-                    try:
-                        tmp_args.append(hash((k, v)))
-                    except:
-                        tmp_args.append(str((k, v)))
-
-            kw_arg_hashable = tuple(tmp_args)  # type: ignore
-
-        key = tuple([f"{module}.{classname}", *args, kw_arg_hashable])
-
-        return key
+        return self._key_strategy.generate_key(f"{module}.{classname}", type_, arguments, kwargs)
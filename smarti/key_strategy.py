@@ -0,0 +1,147 @@
+import hashlib
+import pickle
+import sys
+from typing import Any, Dict, Hashable, List, Optional, Set, Type
+
+
+_PICKLED = object()
+
+
+class KeyStrategy:
+    """Generates the keys of the instance storage. Equal keys yield the same singleton."""
+
+    def generate_key(self, identity: str, type_: Type, arguments: List, kwargs: Optional[Dict]) -> Hashable:
+        """Generates the key for the instance storage.
+
+        Args:
+            identity (str): The qualified name of the type, e.g. "module.Class".
+            type_ (Type): The type of the instance.
+            arguments (List): The arguments of the instance.
+            kwargs (Optional[Dict]): The kwargs of the instance.
+
+        Returns:
+            Hashable: The key for the local instance storage.
+        """
+        raise NotImplementedError()
+
+
+class StructuralKeyStrategy(KeyStrategy):
+    """The default strategy. Values are used directly, dicts, lists and sets are hashed structurally.
+    Pickling is only used for values which are neither hashable nor containers. Every value is tagged with its type,
+    so equal values of different types (e.g. 1, 1.0 and True) yield different keys.
+    """
+
+    def generate_key(self, identity: str, type_: Type, arguments: List, kwargs: Optional[Dict]) -> Hashable:
+        if not kwargs:
+            kw_arg_hashable: Hashable = ()
+        else:
+            kw_arg_hashable = frozenset((k, make_hashable(v)) for k, v in kwargs.items())
+
+        if not arguments:
+            return (identity, (), kw_arg_hashable)
+
+        return (identity, make_hashable(tuple(arguments)), kw_arg_hashable)
+
+
+class PickleKeyStrategy(KeyStrategy):
+    """The strategy used up to smarti 1.2. Every argument and the kwargs are pickled."""
+
+    def generate_key(self, identity: str, type_: Type, arguments: List, kwargs: Optional[Dict]) -> Hashable:
+        args = [_pickle_or_hash(argument) for argument in arguments]
+
+        try:
+            kw_arg_hashable = pickle.dumps(kwargs)
+        except (TypeError, AttributeError, pickle.PicklingError):
+            kw_arg_hashable = tuple(_pickle_or_hash((k, v)) for k, v in kwargs.items())  # type: ignore
+
+        return tuple([identity, *args, kw_arg_hashable])
+
+
+def _pickle_or_hash(value: Any) -> Hashable:
+    """Pickles a value. Values which cannot be pickled are represented by their hash or, if unhashable, by their string."""
+    try:
+        return pickle.dumps(value)
+    except (TypeError, AttributeError, pickle.PicklingError):
+        try:
+            return hash(value)
+        except TypeError:
+            return str(value)
+
+
+class DigestKeyStrategy(KeyStrategy):
+    """Wraps another strategy, by default the StructuralKeyStrategy, and replaces the pickled blobs in its keys (e.g. of unhashable
+    arguments or of PickleKeyStrategy) by fixed-size digests: the length of the blob followed by its 128 bit BLAKE2b digest.
+    Keys of many parameterized singletons thereby take a few bytes per argument instead of the size of the pickled arguments.
+    Blobs up to min_size bytes are kept, as a digest would not be smaller.
+    """
+
+    def __init__(self, strategy: Optional[KeyStrategy] = None, min_size: int = 24) -> None:
+        self._strategy = StructuralKeyStrategy() if strategy is None else strategy
+        self._min_size = min_size
+
+    def generate_key(self, identity: str, type_: Type, arguments: List, kwargs: Optional[Dict]) -> Hashable:
+        return self._compact(self._strategy.generate_key(identity, type_, arguments, kwargs))
+
+    def _compact(self, value: Any) -> Any:
+        if isinstance(value, bytes):
+            if len(value) <= self._min_size:
+                return value
+
+            return len(value).to_bytes(8, "little") + hashlib.blake2b(value, digest_size=16).digest()
+        if type(value) is tuple:
+            return tuple(self._compact(v) for v in value)
+        if type(value) is frozenset:
+            return frozenset(self._compact(v) for v in value)
+
+        return value
+
+
+def key_size(key: Any, seen: Optional[Set[int]] = None) -> int:
+    """Gets the memory taken by a storage key, including its tuples, frozensets, strings and blobs.
+    Objects which are shared between keys, like the identity of a type, are only counted once per seen set.
+
+    Args:
+        key (Any): The key.
+        seen (Optional[Set[int]], optional): The ids of the objects counted already. Defaults to None.
+
+    Returns:
+        int: The size in bytes.
+    """
+    seen = set() if seen is None else seen
+    if id(key) in seen:
+        return 0
+
+    seen.add(id(key))
+    size = sys.getsizeof(key)
+    if isinstance(key, (tuple, frozenset)):
+        size += sum(key_size(value, seen) for value in key)
+
+    return size
+
+
+def make_hashable(value: Any) -> Hashable:
+    """Converts a value into a hashable representation, which is tagged with the type of the value and of all its items.
+
+    Args:
+        value (Any): The value to convert.
+
+    Returns:
+        Hashable: The hashable representation.
+    """
+    if isinstance(value, (list, tuple)):
+        return (value.__class__, tuple(make_hashable(v) for v in value))
+    if isinstance(value, dict):
+        return (value.__class__, frozenset((make_hashable(k), make_hashable(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return (value.__class__, frozenset(make_hashable(v) for v in value))
+
+    try:
+        hash(value)
+        return (value.__class__, value)
+    except TypeError:
+        pass
+
+    try:
+        return (_PICKLED, pickle.dumps(value))
+    except Exception:
+        return (value.__class__, str(value))
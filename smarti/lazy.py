@@ -0,0 +1,111 @@
+from threading import Lock
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class Lazy(Generic[T]):
+    """Marks a constructor parameter as lazy, e.g. def __init__(self, model: Lazy[Model]).
+    Instead of the dependency, a LazyProxy is injected, which constructs the dependency on first attribute access.
+    """
+
+
+class LazyProxy:
+    """Stands in for a dependency and constructs it at most once, on first use. The construction is thread-safe."""
+    __slots__ = ("_LazyProxy__factory", "_LazyProxy__instance", "_LazyProxy__lock")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_LazyProxy__factory", factory)
+        object.__setattr__(self, "_LazyProxy__instance", _MISSING)
+        object.__setattr__(self, "_LazyProxy__lock", Lock())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(resolve(self), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(resolve(self), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(resolve(self), name)
+
+    def __repr__(self) -> str:
+        if not is_resolved(self):
+            return f"<LazyProxy of {object.__getattribute__(self, '_LazyProxy__factory')!r}>"
+
+        return repr(resolve(self))
+
+    def __str__(self) -> str:
+        return str(resolve(self))
+
+    def __bool__(self) -> bool:
+        return bool(resolve(self))
+
+    def __len__(self) -> int:
+        return len(resolve(self))
+
+    def __iter__(self):
+        return iter(resolve(self))
+
+    def __contains__(self, item: Any) -> bool:
+        return item in resolve(self)
+
+    def __getitem__(self, key: Any) -> Any:
+        return resolve(self)[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        resolve(self)[key] = value
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return resolve(self)(*args, **kwargs)
+
+    def __eq__(self, other: Any) -> bool:
+        return resolve(self) == other
+
+    def __hash__(self) -> int:
+        return hash(resolve(self))
+
+    def __enter__(self) -> Any:
+        return resolve(self).__enter__()
+
+    def __exit__(self, *args) -> Any:
+        return resolve(self).__exit__(*args)
+
+
+def resolve(proxy: Any) -> Any:
+    """Gets the dependency behind a LazyProxy and constructs it, if necessary. Other values are returned unchanged.
+
+    Args:
+        proxy (Any): The proxy.
+
+    Returns:
+        Any: The dependency.
+    """
+    if not isinstance(proxy, LazyProxy):
+        return proxy
+
+    instance = object.__getattribute__(proxy, "_LazyProxy__instance")
+    if instance is not _MISSING:
+        return instance
+
+    with object.__getattribute__(proxy, "_LazyProxy__lock"):
+        instance = object.__getattribute__(proxy, "_LazyProxy__instance")
+        if instance is _MISSING:
+            instance = object.__getattribute__(proxy, "_LazyProxy__factory")()
+            object.__setattr__(proxy, "_LazyProxy__instance", instance)
+            object.__setattr__(proxy, "_LazyProxy__factory", None)
+
+        return instance
+
+
+def is_resolved(proxy: LazyProxy) -> bool:
+    """Checks if the dependency behind a LazyProxy was already constructed.
+
+    Args:
+        proxy (LazyProxy): The proxy.
+
+    Returns:
+        bool: True if the dependency exists, False otherwise.
+    """
+    return object.__getattribute__(proxy, "_LazyProxy__instance") is not _MISSING
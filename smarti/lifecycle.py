@@ -0,0 +1,149 @@
+import asyncio
+import inspect
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+DISPOSAL_METHODS = ("close", "__exit__", "aclose")
+
+
+def is_disposable(instance: Any) -> bool:
+    """Checks if an instance has a close, __exit__ or aclose method.
+
+    Args:
+        instance (Any): The instance.
+
+    Returns:
+        bool: True if the instance is disposed on shutdown.
+    """
+    return any(callable(getattr(instance, method, None)) for method in DISPOSAL_METHODS)
+
+
+def dispose(instance: Any) -> None:
+    """Disposes an instance by calling close, __exit__ or aclose, in this order of preference. An async aclose runs in a new event loop.
+
+    Args:
+        instance (Any): The instance.
+    """
+    result = _call_disposer(instance)
+    if inspect.isawaitable(result):
+        asyncio.run(_await(result))
+
+
+async def adispose(instance: Any) -> None:
+    """Disposes an instance inside an event loop. aclose is preferred and awaited, blocking close and __exit__ methods run in the default executor.
+
+    Args:
+        instance (Any): The instance.
+    """
+    aclose = getattr(instance, "aclose", None)
+    if callable(aclose):
+        await aclose()
+        return
+
+    result = await asyncio.get_running_loop().run_in_executor(None, _call_disposer, instance)
+    if inspect.isawaitable(result):
+        await result
+
+
+class DependencyRecords:
+    """The ids of the direct dependencies per instance, as recorded while building it. Instances are weakly referenced,
+    so a record vanishes with its instance and is never mistaken for a later object with the same id.
+    Instances which cannot be weakly referenced are not recorded.
+    """
+
+    def __init__(self) -> None:
+        self._records: Dict[int, Tuple[weakref.ref, Tuple[int, ...]]] = {}
+
+    def record(self, instance: Any, dependencies: Tuple[int, ...]) -> None:
+        """Records the dependencies of an instance.
+
+        Args:
+            instance (Any): The instance.
+            dependencies (Tuple[int, ...]): The ids of its direct dependencies.
+        """
+        key = id(instance)
+        records = self._records
+        try:
+            reference = weakref.ref(instance, lambda _: records.pop(key, None))
+        except TypeError:
+            return
+
+        records[key] = (reference, dependencies)
+
+    def get(self, instance: Any) -> Optional[Tuple[int, ...]]:
+        """Gets the recorded dependencies of an instance.
+
+        Args:
+            instance (Any): The instance.
+
+        Returns:
+            Optional[Tuple[int, ...]]: The ids of its direct dependencies, None if they were not recorded.
+        """
+        entry = self._records.get(id(instance), None)
+        if entry is None or entry[0]() is not instance:
+            return None
+
+        return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+def disposal_levels(
+    instances: Iterable[Any],
+    dependencies_of: Callable[[Any], Optional[Iterable[int]]],
+) -> List[List[Any]]:
+    """Groups instances for disposal: every instance is disposed before the instances it depends on.
+    Instances of the same level do not depend on each other and can be disposed concurrently. Only disposable instances are returned,
+    but the ordering also follows dependencies through instances which are not disposable themselves.
+
+    Args:
+        instances (Iterable[Any]): The instances.
+        dependencies_of (Callable[[Any], Optional[Iterable[int]]]): Gets the ids of the direct dependencies of an instance.
+
+    Returns:
+        List[List[Any]]: The disposable instances per level, dependents first.
+    """
+    by_id: Dict[int, Any] = {id(instance): instance for instance in instances}
+    dependencies: Dict[int, List[int]] = {}
+    remaining_dependents: Dict[int, int] = {key: 0 for key in by_id}
+    for key, instance in by_id.items():
+        dependencies[key] = list({d for d in dependencies_of(instance) or () if d in by_id and d != key})
+        for dependency in dependencies[key]:
+            remaining_dependents[dependency] += 1
+
+    levels: List[List[Any]] = []
+    current = [key for key, count in remaining_dependents.items() if count == 0]
+    done: Set[int] = set()
+    while current:
+        done.update(current)
+        levels.append([by_id[key] for key in current if is_disposable(by_id[key])])
+
+        following = []
+        for key in current:
+            for dependency in dependencies[key]:
+                remaining_dependents[dependency] -= 1
+                if remaining_dependents[dependency] == 0:
+                    following.append(dependency)
+        current = following
+
+    # cycles can only stem from lazy dependencies, which impose no order
+    levels.append([instance for key, instance in by_id.items() if key not in done and is_disposable(instance)])
+
+    return [level for level in levels if level]
+
+
+def _call_disposer(instance: Any) -> Any:
+    close = getattr(instance, "close", None)
+    if callable(close):
+        return close()
+
+    exit_ = getattr(instance, "__exit__", None)
+    if callable(exit_):
+        return exit_(None, None, None)
+
+    return instance.aclose()
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
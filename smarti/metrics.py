@@ -0,0 +1,256 @@
+import time
+from collections import deque
+from threading import Lock, local
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
+
+from smarti.type_registry import qualified_name
+
+
+class ClassMetrics:
+    """The counters of a single class."""
+    __slots__ = (
+        "constructions", "construction_seconds", "self_seconds", "samples", "introspection_seconds", "init_seconds",
+        "hits", "misses", "lock_wait_seconds",
+    )
+
+    def __init__(self, sample_size: int) -> None:
+        self.constructions = 0
+        self.construction_seconds = 0.0
+        self.self_seconds = 0.0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+        self.introspection_seconds = 0.0
+        self.init_seconds = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.lock_wait_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        lookups = self.hits + self.misses
+
+        return {
+            "constructions": self.constructions,
+            "construction_seconds": self.construction_seconds,
+            "self_seconds": self.self_seconds,
+            "p50_seconds": percentile(samples, 50),
+            "p90_seconds": percentile(samples, 90),
+            "p99_seconds": percentile(samples, 99),
+            "introspection_seconds": self.introspection_seconds,
+            "init_seconds": self.init_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "lock_wait_seconds": self.lock_wait_seconds,
+        }
+
+
+class ConstructionFrame:
+    """A running construction. Frames of one thread form the stack of the current resolution."""
+    __slots__ = ("type_", "parent", "start", "introspection_seconds", "init_start", "init_seconds", "child_seconds", "done")
+
+    def __init__(self, type_: Type, parent: Optional["ConstructionFrame"]) -> None:
+        self.type_ = type_
+        self.parent = parent
+        self.introspection_seconds = 0.0
+        self.init_start = 0.0
+        self.init_seconds = 0.0
+        self.child_seconds = 0.0
+        self.done = False
+        self.start = time.perf_counter()
+
+    def introspected(self) -> None:
+        """Marks the end of the introspection."""
+        self.introspection_seconds = time.perf_counter() - self.start
+
+    def init_started(self) -> None:
+        """Marks the start of the __init__ of the class."""
+        self.init_start = time.perf_counter()
+
+    def init_finished(self) -> None:
+        """Marks the end of the __init__ of the class and thereby a successful construction."""
+        self.init_seconds = time.perf_counter() - self.init_start
+        self.done = True
+
+    def finished(self) -> None:
+        """Marks a successful construction without a separate init time, e.g. of a frozen factory."""
+        self.done = True
+
+    def path(self) -> Tuple[Type, ...]:
+        frames = []
+        frame: Optional[ConstructionFrame] = self
+        while frame is not None:
+            frames.append(frame.type_)
+            frame = frame.parent
+
+        return tuple(reversed(frames))
+
+
+class ResolutionMetrics:
+    """Collects the metrics of a ClassLoader. It is only created when metrics are enabled, so disabled metrics cost a None check.
+    Construction times include the dependencies of a class, self, introspection and init times do not.
+    """
+    SAMPLE_SIZE = 1000
+
+    def __init__(self, sample_size: int = SAMPLE_SIZE) -> None:
+        self._sample_size = sample_size
+        self._classes: Dict[Type, ClassMetrics] = {}
+        self._stacks: Dict[Tuple[Type, ...], float] = {}
+        self._local = local()
+        self._lock = Lock()
+
+    def reset_locks(self) -> None:
+        """Replaces the lock and the construction stacks, e.g. in a forked child."""
+        self._lock = Lock()
+        self._local = local()
+
+    def enter(self, type_: Type) -> ConstructionFrame:
+        """Starts measuring the construction of an instance. Every frame must be passed to exit.
+
+        Args:
+            type_ (Type): The class of the instance.
+
+        Returns:
+            ConstructionFrame: The frame of the construction.
+        """
+        frame = ConstructionFrame(type_, getattr(self._local, "frame", None))
+        self._local.frame = frame
+
+        return frame
+
+    def exit(self, frame: ConstructionFrame) -> None:
+        """Stops measuring a construction. Only successful constructions (see ConstructionFrame.init_finished) are recorded.
+
+        Args:
+            frame (ConstructionFrame): The frame returned by enter.
+        """
+        seconds = time.perf_counter() - frame.start
+        self._local.frame = frame.parent
+        if frame.parent is not None:
+            frame.parent.child_seconds += seconds
+
+        if not frame.done:
+            return
+
+        self_seconds = seconds - frame.child_seconds
+        path = frame.path()
+        with self._lock:
+            self._record_construction(frame.type_, seconds, frame.introspection_seconds, frame.init_seconds)
+            self._metrics_of(frame.type_).self_seconds += self_seconds
+            self._stacks[path] = self._stacks.get(path, 0.0) + self_seconds
+
+    def record_construction(self, type_: Type, seconds: float, introspection_seconds: float, init_seconds: float) -> None:
+        """Records the construction of an instance.
+
+        Args:
+            type_ (Type): The class of the instance.
+            seconds (float): The time of the whole construction, including all dependencies.
+            introspection_seconds (float): The time spent in the injection plan and the validation.
+            init_seconds (float): The time spent in the __init__ of the class.
+        """
+        with self._lock:
+            self._record_construction(type_, seconds, introspection_seconds, init_seconds)
+            self._metrics_of(type_).self_seconds += seconds
+
+    def record_lookup(self, type_: Type, hit: bool) -> None:
+        """Records a singleton lookup.
+
+        Args:
+            type_ (Type): The class of the singleton.
+            hit (bool): True if the singleton existed, False if it had to be created.
+        """
+        with self._lock:
+            metrics = self._metrics_of(type_)
+            if hit:
+                metrics.hits += 1
+            else:
+                metrics.misses += 1
+
+    def record_lock_wait(self, type_: Type, seconds: float) -> None:
+        """Records the time spent waiting for the creation lock of a singleton.
+
+        Args:
+            type_ (Type): The class of the singleton.
+            seconds (float): The time spent waiting.
+        """
+        with self._lock:
+            self._metrics_of(type_).lock_wait_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Gets the current metrics.
+
+        Returns:
+            Dict[str, Any]: The totals and the metrics per class, keyed by the qualified class name.
+        """
+        with self._lock:
+            classes = {qualified_name(type_): metrics.snapshot() for type_, metrics in self._classes.items()}
+
+        hits = sum(c["hits"] for c in classes.values())
+        misses = sum(c["misses"] for c in classes.values())
+
+        return {
+            "enabled": True,
+            "constructions": sum(c["constructions"] for c in classes.values()),
+            "introspection_seconds": sum(c["introspection_seconds"] for c in classes.values()),
+            "init_seconds": sum(c["init_seconds"] for c in classes.values()),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            "lock_wait_seconds": sum(c["lock_wait_seconds"] for c in classes.values()),
+            "classes": classes,
+        }
+
+    def self_seconds(self) -> Dict[Type, float]:
+        """Gets the cumulative construction time per class without the time of its dependencies.
+
+        Returns:
+            Dict[Type, float]: The time in seconds per class.
+        """
+        with self._lock:
+            return {type_: metrics.self_seconds for type_, metrics in self._classes.items()}
+
+    def collapsed_stacks(self) -> List[str]:
+        """Gets the recorded constructions in the collapsed stack format of flame graph tools, e.g. "app.Root;app.Db 1520".
+        Each line is a resolution path followed by the time spent in its last class (without dependencies) in microseconds.
+
+        Returns:
+            List[str]: The lines.
+        """
+        with self._lock:
+            stacks = list(self._stacks.items())
+
+        return [
+            f"{';'.join(qualified_name(type_) for type_ in path)} {round(seconds * 1e6)}"
+            for path, seconds in stacks
+        ]
+
+    def _record_construction(self, type_: Type, seconds: float, introspection_seconds: float, init_seconds: float) -> None:
+        metrics = self._metrics_of(type_)
+        metrics.constructions += 1
+        metrics.construction_seconds += seconds
+        metrics.samples.append(seconds)
+        metrics.introspection_seconds += introspection_seconds
+        metrics.init_seconds += init_seconds
+
+    def _metrics_of(self, type_: Type) -> ClassMetrics:
+        metrics = self._classes.get(type_, None)
+        if metrics is None:
+            metrics = self._classes[type_] = ClassMetrics(self._sample_size)
+
+        return metrics
+
+
+def percentile(sorted_samples: List[float], percent: float) -> Optional[float]:
+    """Gets a percentile of sorted samples using the nearest-rank method.
+
+    Args:
+        sorted_samples (List[float]): The ascending samples.
+        percent (float): The percentile, e.g. 99.
+
+    Returns:
+        Optional[float]: The percentile or None if there are no samples.
+    """
+    if not sorted_samples:
+        return None
+
+    rank = max(1, -(-len(sorted_samples) * percent // 100))
+    return sorted_samples[int(rank) - 1]
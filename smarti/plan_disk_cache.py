@@ -0,0 +1,239 @@
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+from smarti.injection_plan import InjectionPlan, ParameterPlan
+
+
+class _ModuleEntry:
+    """The cached plans of one module and the stamp of the source they were computed from."""
+    __slots__ = ("path", "stamp", "plans", "dirty")
+
+    def __init__(self, path: str, stamp: Any, plans: Dict[str, Any]) -> None:
+        self.path = path
+        self.stamp = stamp
+        self.plans = plans
+        self.dirty = False
+
+
+class PlanDiskCache:
+    """Persists injection plans on disk, like .pyc files, so later processes skip the introspection of unchanged modules.
+    There is one file per module. It is valid as long as the source of the module is unchanged, checked by mtime and size or by a hash of the source.
+    Plans of callables which cannot be restored exactly (e.g. typing constructs as annotations or wrapped functions) are never persisted.
+    """
+    VERSION = 1
+    VALIDATIONS = ("mtime", "hash")
+
+    def __init__(self, directory: str, validation: str = "mtime") -> None:
+        if validation not in PlanDiskCache.VALIDATIONS:
+            raise ValueError(f"Unknown validation {validation}, expected one of {PlanDiskCache.VALIDATIONS}")
+
+        self.directory = directory
+        self.validation = validation
+        self._modules: Dict[str, Optional[_ModuleEntry]] = {}
+        self._lock = Lock()
+
+    def load(self, callable: Callable) -> Optional[InjectionPlan]:
+        """Gets the persisted plan of a callable.
+
+        Args:
+            callable (Callable): The callable.
+
+        Returns:
+            Optional[InjectionPlan]: The plan or None if there is no valid plan.
+        """
+        if not _is_persistable(callable):
+            return None
+
+        entry = self._entry(callable.__module__)
+        data = None if entry is None else entry.plans.get(callable.__qualname__, None)
+        if data is None:
+            return None
+
+        try:
+            return _deserialize(callable, data)
+        except (ImportError, AttributeError, TypeError, ValueError):
+            return None
+
+    def store(self, callable: Callable, plan: InjectionPlan) -> None:
+        """Adds the plan of a callable. The plans are written on flush.
+
+        Args:
+            callable (Callable): The callable.
+            plan (InjectionPlan): The plan of the callable.
+        """
+        if not _is_persistable(callable):
+            return
+
+        data = _serialize(plan)
+        if data is None:
+            return
+
+        entry = self._entry(callable.__module__)
+        if entry is None:
+            return
+
+        with self._lock:
+            entry.plans[callable.__qualname__] = data
+            entry.dirty = True
+
+    def flush(self) -> None:
+        """Writes the plans of all changed modules. Write errors are ignored, like for .pyc files."""
+        with self._lock:
+            entries = [(name, entry) for name, entry in self._modules.items() if entry is not None and entry.dirty]
+            for _, entry in entries:
+                entry.dirty = False
+
+        for name, entry in entries:
+            document = {
+                "version": PlanDiskCache.VERSION,
+                "module": name,
+                "path": entry.path,
+                "validation": self.validation,
+                "stamp": entry.stamp,
+                "plans": dict(entry.plans),
+            }
+            file = self._file_of(name, entry.path)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                temporary = f"{file}.{os.getpid()}.tmp"
+                with open(temporary, "w") as handle:
+                    json.dump(document, handle)
+                os.replace(temporary, file)
+            except OSError:
+                pass
+
+    def reset_lock(self) -> None:
+        """Replaces the lock guarding the module entries, e.g. in a forked child. Unwritten plans are kept."""
+        self._lock = Lock()
+
+    def _entry(self, module_name: str) -> Optional[_ModuleEntry]:
+        if module_name in self._modules:
+            return self._modules[module_name]
+
+        with self._lock:
+            if module_name not in self._modules:
+                self._modules[module_name] = self._read(module_name)
+
+            return self._modules[module_name]
+
+    def _read(self, module_name: str) -> Optional[_ModuleEntry]:
+        """Reads the persisted plans of a module. Stale or broken files yield an empty entry, modules without source file None."""
+        module = sys.modules.get(module_name, None)
+        path = getattr(module, "__file__", None)
+        if path is None:
+            return None
+
+        try:
+            stamp = self._stamp(path)
+        except OSError:
+            return None
+
+        try:
+            with open(self._file_of(module_name, path)) as handle:
+                document = json.load(handle)
+        except (OSError, ValueError):
+            return _ModuleEntry(path, stamp, {})
+
+        if (
+            not isinstance(document, dict)
+            or document.get("version") != PlanDiskCache.VERSION
+            or document.get("path") != path
+            or document.get("validation") != self.validation
+            or document.get("stamp") != stamp
+            or not isinstance(document.get("plans"), dict)
+        ):
+            return _ModuleEntry(path, stamp, {})
+
+        return _ModuleEntry(path, stamp, document["plans"])
+
+    def _stamp(self, path: str) -> Any:
+        if self.validation == "hash":
+            with open(path, "rb") as handle:
+                return hashlib.sha256(handle.read()).hexdigest()
+
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _file_of(self, module_name: str, path: str) -> str:
+        path_hash = hashlib.sha1(path.encode()).hexdigest()[:12]
+        return os.path.join(self.directory, f"{module_name}-{path_hash}.json")
+
+
+def _is_persistable(callable: Callable) -> bool:
+    return (
+        inspect.isfunction(callable)
+        and not hasattr(callable, "__wrapped__")
+        and not hasattr(callable, "__signature__")
+        and "<locals>" not in callable.__qualname__
+    )
+
+
+def _serialize(plan: InjectionPlan) -> Optional[Dict[str, Any]]:
+    parameters: List[Any] = []
+    for parameter in plan.parameters:
+        type_ = parameter.type_
+        if not isinstance(type_, type):
+            return None
+
+        try:
+            if _resolve(type_.__module__, type_.__qualname__) is not type_:
+                return None
+        except (ImportError, AttributeError, TypeError, ValueError):
+            return None
+
+        parameters.append([
+            parameter.name, type_.__module__, type_.__qualname__,
+            parameter.has_default, parameter.can_autowire, parameter.lazy,
+        ])
+
+    return {"parameters": parameters, "problems": list(plan.problems)}
+
+
+def _deserialize(callable: Callable, data: Dict[str, Any]) -> InjectionPlan:
+    defaults = _defaults_of(callable)
+    parameters = []
+    for name, module, qualname, has_default, can_autowire, lazy in data["parameters"]:
+        if has_default and name not in defaults:
+            raise ValueError(f"Missing default of {name}")
+
+        parameters.append(ParameterPlan(
+            name,
+            _resolve(module, qualname),
+            defaults[name] if has_default else inspect.Parameter.empty,
+            can_autowire,
+            lazy,
+        ))
+
+    return InjectionPlan(tuple(parameters), tuple(data["problems"]))
+
+
+def _resolve(module_name: str, qualname: str) -> Any:
+    if "<locals>" in qualname:
+        raise ValueError(f"Cannot resolve local class {qualname}")
+
+    value: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        value = getattr(value, part)
+
+    if not isinstance(value, type):
+        raise TypeError(f"{module_name}.{qualname} is not a class")
+
+    return value
+
+
+def _defaults_of(function: Any) -> Dict[str, Any]:
+    """Gets the defaults of a function by parameter name from its code object, without inspect.signature."""
+    code = function.__code__
+    positional = code.co_varnames[:code.co_argcount]
+    defaults = function.__defaults__ or ()
+
+    result = dict(zip(positional[len(positional) - len(defaults):], defaults))
+    result.update(function.__kwdefaults__ or {})
+
+    return result
@@ -0,0 +1,136 @@
+import weakref
+from collections import deque
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Optional
+
+from smarti import constants as cst
+
+
+class ObjectPool:
+    """A bounded, thread-safe pool of reusable instances of a transient class.
+    Released instances are reset, by the reset callable or the __reset__ method of the instance, and handed out again instead of building new ones.
+    Only checked out instances are accepted back, each of them once.
+    """
+
+    def __init__(self, max_size: int, reset: Optional[Callable[[Any], None]] = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self._reset = reset
+        self._instances: Deque[Any] = deque()
+        # the checked out instances by id, weakly referenced where possible, so dropped instances are forgotten
+        self._checked_out: Dict[int, Optional[weakref.ref]] = {}
+        self._lock = Lock()
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.discarded = 0
+
+    def acquire(self, factory: Callable[[], Any]) -> Any:
+        """Checks out a pooled instance or creates a new one.
+
+        Args:
+            factory (Callable[[], Any]): Creates an instance if the pool is empty.
+
+        Returns:
+            Any: The instance.
+        """
+        with self._lock:
+            if self._instances:
+                self.reused += 1
+                instance = self._instances.pop()
+                self._check_out(instance)
+                return instance
+
+        # counted once built, a failing factory leaves no trace
+        instance = factory()
+        with self._lock:
+            self.created += 1
+            self._check_out(instance)
+
+        return instance
+
+    def release(self, instance: Any) -> bool:
+        """Resets an instance and returns it to the pool. If the pool is full, the instance is discarded.
+        If the reset fails, the instance is discarded and the exception is raised.
+
+        Args:
+            instance (Any): The instance, checked out with acquire.
+
+        Raises:
+            ValueError: If the instance is not checked out of this pool, e.g. as it was released already.
+
+        Returns:
+            bool: True if the instance was pooled, False if it was discarded.
+        """
+        with self._lock:
+            key = id(instance)
+            if key not in self._checked_out:
+                raise ValueError(f"{instance!r} is not checked out of this pool")
+
+            reference = self._checked_out[key]
+            if reference is not None and reference() is not instance:
+                raise ValueError(f"{instance!r} is not checked out of this pool")
+
+            del self._checked_out[key]
+
+        try:
+            if self._reset is not None:
+                self._reset(instance)
+            else:
+                hook = getattr(instance, cst.RESET_HOOK, None)
+                if hook is not None:
+                    hook()
+        except BaseException:
+            with self._lock:
+                self.discarded += 1
+            raise
+
+        with self._lock:
+            self.released += 1
+            if len(self._instances) >= self.max_size:
+                self.discarded += 1
+                return False
+
+            self._instances.append(instance)
+            return True
+
+    def _check_out(self, instance: Any) -> None:
+        """Records a checked out instance. Requires the lock."""
+        key = id(instance)
+        checked_out = self._checked_out
+        try:
+            reference: Optional[weakref.ref] = weakref.ref(instance, lambda _: checked_out.pop(key, None))
+        except TypeError:
+            reference = None
+
+        checked_out[key] = reference
+
+    def clear(self) -> None:
+        """Removes all pooled instances."""
+        with self._lock:
+            self._instances.clear()
+
+    def reset_lock(self) -> None:
+        """Replaces the lock guarding the idle instances, e.g. in a forked child. The idle instances are kept."""
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def stats(self) -> Dict[str, int]:
+        """Gets the counters of this pool.
+
+        Returns:
+            Dict[str, int]: The created, reused, released and discarded instances, the checked out instances and the current size.
+        """
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "released": self.released,
+                "discarded": self.discarded,
+                "in_use": len(self._checked_out),
+                "size": len(self._instances),
+            }
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, Iterator, List, Type
+
+
+class ResolutionChain:
+    """The types of the current dependency chain, e.g. A -> B -> C while C is constructed.
+    One chain is shared by a whole synchronous resolution: dependencies are pushed before and popped after their construction.
+    Membership checks are constant-time, so deep graphs do not copy or scan the chain per level.
+    """
+    __slots__ = ("_stack", "_members")
+
+    def __init__(self, types: Iterable[Type] = ()) -> None:
+        self._stack: List[Type] = []
+        self._members: Dict[Type, int] = {}
+
+        for type_ in types:
+            self.push(type_)
+
+    @classmethod
+    def of(cls, seen_types: Iterable[Type]) -> "ResolutionChain":
+        """Gets the given chain or creates one from a sequence of types.
+
+        Args:
+            seen_types (Iterable[Type]): A chain or the types of a chain.
+
+        Returns:
+            ResolutionChain: The chain.
+        """
+        if isinstance(seen_types, ResolutionChain):
+            return seen_types
+
+        return cls(seen_types)
+
+    def push(self, type_: Type) -> None:
+        """Appends a type to the chain.
+
+        Args:
+            type_ (Type): The type which is constructed next.
+        """
+        self._stack.append(type_)
+        self._members[type_] = self._members.get(type_, 0) + 1
+
+    def pop(self) -> Type:
+        """Removes the last type of the chain.
+
+        Returns:
+            Type: The removed type.
+        """
+        type_ = self._stack.pop()
+        count = self._members[type_] - 1
+        if count:
+            self._members[type_] = count
+        else:
+            del self._members[type_]
+
+        return type_
+
+    def cycle(self, type_: Type) -> List[Type]:
+        """Gets the cycle which is closed by type_, e.g. [A, B, A].
+
+        Args:
+            type_ (Type): A type of the chain.
+
+        Returns:
+            List[Type]: The types from the first occurence of type_ to the end of the chain, followed by type_.
+        """
+        return self._stack[self._stack.index(type_):] + [type_]
+
+    def __contains__(self, type_: object) -> bool:
+        try:
+            return type_ in self._members
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator[Type]:
+        return iter(self._stack)
+
+    def __len__(self) -> int:
+        return len(self._stack)
+
+    def __repr__(self) -> str:
+        return repr(self._stack)
@@ -0,0 +1,89 @@
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Scope:
+    """The instances of one active scope, e.g. of a single request. Scopes are activated with ClassLoader.scope."""
+
+    def __init__(self, name: str, parent: Optional["Scope"] = None) -> None:
+        self.name = name
+        self.parent = parent
+        self._instances: Dict[Hashable, Any] = {}
+        self._lock = RLock()
+
+    def find(self, name: str) -> Optional["Scope"]:
+        """Finds the innermost active scope with the given name, starting at this scope.
+
+        Args:
+            name (str): The name of the scope.
+
+        Returns:
+            Optional[Scope]: The scope or None.
+        """
+        scope: Optional[Scope] = self
+        while scope is not None and scope.name != name:
+            scope = scope.parent
+
+        return scope
+
+    def get(self, key: Hashable) -> Any:
+        """Gets an instance of this scope.
+
+        Args:
+            key (Hashable): The storage key of the instance.
+
+        Returns:
+            Any: The instance or None.
+        """
+        return self._instances.get(key, None)
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        """Stores an instance, if there is no instance for the key yet.
+
+        Args:
+            key (Hashable): The storage key of the instance.
+            instance (Any): The instance.
+
+        Returns:
+            Any: The stored instance.
+        """
+        with self._lock:
+            return self._instances.setdefault(key, instance)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Gets the instance of this scope or creates it. Each key is created at most once per scope.
+
+        Args:
+            key (Hashable): The storage key of the instance.
+            factory (Callable[[], T]): Creates the instance if it does not exist yet.
+
+        Returns:
+            T: The instance.
+        """
+        instance = self._instances.get(key, None)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(key, None)
+            if instance is None:
+                instance = self._instances[key] = factory()
+
+            return instance
+
+    def instances(self) -> Dict[Hashable, Any]:
+        """Gets a copy of all instances of this scope.
+
+        Returns:
+            Dict[Hashable, Any]: The instances by their storage key.
+        """
+        return dict(self._instances)
+
+    def close(self) -> None:
+        """Drops all instances of this scope at once."""
+        self._instances = {}
+
+    def __len__(self) -> int:
+        return len(self._instances)
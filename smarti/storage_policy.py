@@ -0,0 +1,247 @@
+import time
+import weakref
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+class StoragePolicy:
+    """Stores the singletons of a class and decides how long they are retained. Every policy counts hits, misses and evictions."""
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Gets an instance and records a hit or miss.
+
+        Args:
+            key (Hashable): The key of the instance.
+
+        Returns:
+            Any: The instance or None.
+        """
+        with self._lock:
+            instance = self.peek(key)
+            if instance is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            return instance
+
+    def peek(self, key: Hashable) -> Any:
+        """Gets an instance without recording a hit or miss.
+
+        Args:
+            key (Hashable): The key of the instance.
+
+        Returns:
+            Any: The instance or None.
+        """
+        raise NotImplementedError()
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        """Stores an instance, if there is no instance for the key yet.
+
+        Args:
+            key (Hashable): The key of the instance.
+            instance (Any): The instance.
+
+        Returns:
+            Any: The stored instance.
+        """
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        """Removes all instances. This does not count as eviction."""
+        raise NotImplementedError()
+
+    def __len__(self) -> int:
+        raise NotImplementedError()
+
+    def keys(self) -> List[Hashable]:
+        """Gets the keys of the stored instances.
+
+        Returns:
+            List[Hashable]: A snapshot of the keys.
+        """
+        raise NotImplementedError()
+
+    def reset_lock(self) -> None:
+        """Replaces the lock guarding the stored instances and the counters, e.g. in a forked child."""
+        self._lock = RLock()
+
+    def stats(self) -> Dict[str, int]:
+        """Gets the counters of this policy.
+
+        Returns:
+            Dict[str, int]: The hits, misses, evictions and the current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self),
+            }
+
+
+class UnboundedPolicy(StoragePolicy):
+    """Retains every instance forever. This is the behaviour of classes without policy."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._instances: Dict[Hashable, Any] = {}
+
+    def peek(self, key: Hashable) -> Any:
+        return self._instances.get(key, None)
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        with self._lock:
+            return self._instances.setdefault(key, instance)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._instances)
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+class LRUPolicy(StoragePolicy):
+    """Retains at most max_entries instances. The least recently used instance is evicted first."""
+
+    def __init__(self, max_entries: int) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        super().__init__()
+        self.max_entries = max_entries
+        self._instances: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def peek(self, key: Hashable) -> Any:
+        with self._lock:
+            instance = self._instances.get(key, None)
+            if instance is not None:
+                self._instances.move_to_end(key)
+
+            return instance
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        with self._lock:
+            existing = self.peek(key)
+            if existing is not None:
+                return existing
+
+            self._instances[key] = instance
+            while len(self._instances) > self.max_entries:
+                self._instances.popitem(last=False)
+                self.evictions += 1
+
+            return instance
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._instances)
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+class TTLPolicy(StoragePolicy):
+    """Retains instances for ttl seconds after their creation. Expired instances are evicted on access."""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        super().__init__()
+        self.ttl = ttl
+        self._clock = clock
+        self._instances: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def peek(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._instances.get(key, None)
+            if entry is None:
+                return None
+
+            instance, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._instances[key]
+                self.evictions += 1
+                return None
+
+            return instance
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        with self._lock:
+            existing = self.peek(key)
+            if existing is not None:
+                return existing
+
+            self._instances[key] = (instance, self._clock() + self.ttl)
+            return instance
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._instances)
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+class WeakValuePolicy(StoragePolicy):
+    """Retains instances only as long as they are referenced elsewhere. The class must support weak references."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._instances: Dict[Hashable, weakref.ref] = {}
+
+    def peek(self, key: Hashable) -> Any:
+        reference = self._instances.get(key, None)
+        return None if reference is None else reference()
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        with self._lock:
+            existing = self.peek(key)
+            if existing is not None:
+                return existing
+
+            self._instances[key] = weakref.ref(instance, self._evicted(key))
+            return instance
+
+    def _evicted(self, key: Hashable) -> Callable[[weakref.ref], None]:
+        def callback(reference: weakref.ref) -> None:
+            with self._lock:
+                if self._instances.get(key, None) is reference:
+                    del self._instances[key]
+                    self.evictions += 1
+
+        return callback
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._instances)
+
+    def __len__(self) -> int:
+        return len(self._instances)
@@ -0,0 +1,127 @@
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+
+
+class TypeRegistry:
+    """The thread-safe registry of autowired classes. Membership checks are constant-time dict lookups and never block.
+    Classes are additionally indexed by their qualified name and by their module.
+    """
+
+    def __init__(self, types: Iterable[Type] = ()) -> None:
+        self._types: Dict[Type, None] = {}
+        self._by_name: Dict[str, Type] = {}
+        self._by_module: Dict[str, Dict[Type, None]] = {}
+        self._lock = Lock()
+
+        self.register_all(types)
+
+    def register(self, type_: Type) -> None:
+        """Registers a class.
+
+        Args:
+            type_ (Type): The class.
+        """
+        with self._lock:
+            self._register(type_)
+
+    # backwards compatibility to the former list of known types
+    append = register
+
+    def register_all(self, types: Iterable[Type]) -> None:
+        """Registers multiple classes at once.
+
+        Args:
+            types (Iterable[Type]): The classes.
+        """
+        with self._lock:
+            for type_ in types:
+                self._register(type_)
+
+    def unregister(self, type_: Type) -> None:
+        """Unregisters a class. Unknown classes are ignored.
+
+        Args:
+            type_ (Type): The class.
+        """
+        with self._lock:
+            self._unregister(type_)
+
+    def unregister_all(self, types: Iterable[Type]) -> None:
+        """Unregisters multiple classes at once. Unknown classes are ignored.
+
+        Args:
+            types (Iterable[Type]): The classes.
+        """
+        with self._lock:
+            for type_ in list(types):
+                self._unregister(type_)
+
+    def reset_lock(self) -> None:
+        """Replaces the lock guarding the registered types, e.g. in a forked child."""
+        self._lock = Lock()
+
+    def get_by_name(self, qualified_name: str) -> Optional[Type]:
+        """Gets a class by its qualified name, e.g. "package.module.Class".
+
+        Args:
+            qualified_name (str): The qualified name.
+
+        Returns:
+            Optional[Type]: The class or None.
+        """
+        return self._by_name.get(qualified_name, None)
+
+    def get_by_module(self, module: str) -> List[Type]:
+        """Gets all classes of a module.
+
+        Args:
+            module (str): The name of the module.
+
+        Returns:
+            List[Type]: The classes.
+        """
+        with self._lock:
+            return list(self._by_module.get(module, ()))
+
+    def __contains__(self, type_: object) -> bool:
+        try:
+            return type_ in self._types
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator[Type]:
+        with self._lock:
+            return iter(list(self._types))
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def _register(self, type_: Type) -> None:
+        self._types[type_] = None
+        self._by_name[qualified_name(type_)] = type_
+        self._by_module.setdefault(type_.__module__, {})[type_] = None
+
+    def _unregister(self, type_: Type) -> None:
+        if self._types.pop(type_, False) is False:
+            return
+
+        name = qualified_name(type_)
+        if self._by_name.get(name, None) is type_:
+            del self._by_name[name]
+
+        module_types = self._by_module.get(type_.__module__, {})
+        module_types.pop(type_, None)
+        if not module_types:
+            self._by_module.pop(type_.__module__, None)
+
+
+def qualified_name(type_: Type) -> str:
+    """Gets the qualified name of a class, e.g. "package.module.Class".
+
+    Args:
+        type_ (Type): The class.
+
+    Returns:
+        str: The qualified name.
+    """
+    return f"{type_.__module__}.{type_.__qualname__}"
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Annotated, List, Optional
+
+from smarti.lazy import Lazy
+
+
+class Early:
+    def __init__(self, late: Late, lazy: Lazy[Late], later: Optional[List[Late]] = None) -> None:
+        self.late = late
+
+
+class Undefined:
+    def __init__(self, missing: NotDefinedYet) -> None:  # type: ignore[name-defined] # noqa: F821
+        self.missing = missing
+
+
+class Annotations:
+    def __init__(self, late: Annotated[Late, "meta"], lazy: Lazy[Annotated[Late, "meta"]]) -> None:
+        self.late = late
+
+
+class Late:
+    pass
@@ -0,0 +1,73 @@
+import importlib
+import sys
+from typing import List, Optional, Tuple
+
+from smarti.annotation_resolver import AnnotationResolver
+from smarti.check_autowire import CheckAutowire
+from smarti.class_loader import ClassLoader
+from smarti.class_loader_flags import ClassLoaderFlags
+from smarti.lazy import Lazy
+import tests.forward_references as fr
+import pytest
+
+
+def test_resolves_string_annotations():
+    hints, unresolved = AnnotationResolver().resolve(fr.Early.__init__)
+
+    assert hints == {"late": fr.Late, "lazy": Lazy[fr.Late], "later": Optional[List[fr.Late]]}
+    assert unresolved == ()
+
+
+def test_annotated_is_unwrapped():
+    hints, unresolved = AnnotationResolver().resolve(fr.Annotations.__init__)
+
+    assert hints == {"late": fr.Late, "lazy": Lazy[fr.Late]}
+    assert unresolved == ()
+
+
+def test_undefined_names_are_deferred():
+    checker = CheckAutowire()
+    plan = checker.get_plan(fr.Undefined.__init__)
+
+    assert plan.unresolved == ("missing",)
+    assert [parameter.name for parameter in plan.parameters] == ["missing"]
+    assert plan.parameters[0].unresolved
+    assert len(checker._plan_cache) == 0
+
+    with pytest.raises(NameError):
+        checker.can_autowire_plan(plan, ClassLoaderFlags.NO_FLAGS, fr.Undefined, [], {})
+
+    fr.NotDefinedYet = fr.Late
+    try:
+        plan = checker.get_plan(fr.Undefined.__init__)
+        assert plan.unresolved == ()
+        assert plan.parameters[0].type_ is fr.Late
+        assert len(checker._plan_cache) == 1
+    finally:
+        del fr.NotDefinedYet
+
+
+def test_custom_arguments_of_undefined_names_are_passed():
+    loader = ClassLoader()
+
+    assert loader.get(fr.Undefined, missing=42).missing == 42
+    with pytest.raises(NameError):
+        loader.get(fr.Undefined)
+
+
+def test_cache_is_dropped_on_reload(tmp_path, monkeypatch):
+    (tmp_path / "reloaded_module.py").write_text("from typing import Tuple\n\n\nclass Target:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    resolver = AnnotationResolver()
+
+    module = importlib.import_module("reloaded_module")
+    try:
+        first = resolver.evaluate(module.__name__, vars(module), "Tuple[Target]")
+        assert first == Tuple[module.Target]
+
+        importlib.reload(module)
+        second = resolver.evaluate(module.__name__, vars(module), "Tuple[Target]")
+        assert second == Tuple[module.Target]
+        assert second != first
+    finally:
+        sys.modules.pop("reloaded_module", None)
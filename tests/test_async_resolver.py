@@ -0,0 +1,143 @@
+import asyncio
+from typing import List
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.exceptions import CyclicDependencyException
+import pytest
+
+loader = ClassLoader()
+created: List[str] = []
+
+
+class Client:
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+
+class SlowA:
+    async def __ainit__(self) -> None:
+        created.append("A")
+        await asyncio.sleep(0.01)
+        created.append("A done")
+        self.ready = True
+
+
+class SlowB:
+    async def __ainit__(self) -> None:
+        created.append("B")
+        await asyncio.sleep(0.01)
+        created.append("B done")
+        self.ready = True
+
+
+@autowired(class_loader=loader, client_kwargs={"url": "db://"})
+class Service:
+    def __init__(self, a: SlowA, b: SlowB, client: Client) -> None:
+        self.a = a
+        self.b = b
+        self.client = client
+
+
+@autowired(class_loader=loader, as_singleton=False)
+class Transient:
+    def __init__(self, service: Service) -> None:
+        self.service = service
+
+
+class Pool:
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+
+async def create_pool(client: Client) -> Pool:
+    await asyncio.sleep(0)
+    return Pool(len(client.url))
+
+
+class Cyclic:
+    def __init__(self, other: "Cyclic") -> None:
+        pass
+
+
+def test_aget_resolves_dependencies_concurrently():
+    created.clear()
+
+    service = asyncio.run(loader.aget(Service))
+
+    assert service.a.ready and service.b.ready
+    assert service.client.url == "db://"
+    # both constructions started before either finished
+    assert sorted(created[:2]) == ["A", "B"]
+    assert sorted(created[2:]) == ["A done", "B done"]
+    assert Service() is service
+
+
+def test_aget_shares_in_flight_singletons():
+    loader_ = ClassLoader()
+
+    @autowired(class_loader=loader_)
+    class Shared:
+        async def __ainit__(self) -> None:
+            created.append("Shared")
+            await asyncio.sleep(0.01)
+
+    async def main():
+        return await asyncio.gather(*[loader_.aget(Shared) for _ in range(5)])
+
+    created.clear()
+    instances = asyncio.run(main())
+
+    assert created == ["Shared"]
+    assert all(instance is instances[0] for instance in instances)
+
+
+def test_cancelling_the_first_awaiter_keeps_the_construction():
+    loader_ = ClassLoader()
+
+    @autowired(class_loader=loader_)
+    class Slow:
+        async def __ainit__(self) -> None:
+            await asyncio.sleep(0.01)
+
+    async def main():
+        first = asyncio.ensure_future(loader_.aget(Slow))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(loader_.aget(Slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return first, await second
+
+    first, instance = asyncio.run(main())
+
+    assert first.cancelled()
+    assert isinstance(instance, Slow)
+    assert Slow() is instance
+
+
+def test_aget_transient():
+    async def main():
+        return await loader.aget(Transient), await loader.aget(Transient)
+
+    first, second = asyncio.run(main())
+
+    assert first is not second
+    assert first.service is second.service
+
+
+def test_async_factory():
+    loader.register_async_factory(Pool, create_pool)
+
+    @autowired(class_loader=loader, as_singleton=False, pool_kwargs={"client_kwargs": {"url": "abc"}})
+    class User:
+        def __init__(self, pool: Pool) -> None:
+            self.pool = pool
+
+    user = asyncio.run(loader.aget(User))
+
+    assert user.pool.size == 3
+
+
+def test_aget_detects_cycles():
+    with pytest.raises(CyclicDependencyException):
+        asyncio.run(loader.aget(Cyclic))
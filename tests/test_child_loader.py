@@ -0,0 +1,120 @@
+import smarti.child_loader as child_loader
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.lazy import Lazy, resolve
+
+loader = ClassLoader()
+
+
+@autowired(class_loader=loader)
+class Config:
+    pass
+
+
+@autowired(class_loader=loader)
+class Database:
+    def __init__(self, config: Config) -> None:
+        self.config = config
+
+
+class FakeDatabase(Database):
+    def __init__(self, config: Config) -> None:
+        self.config = config
+
+
+@autowired(class_loader=loader)
+class Repository:
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+
+@autowired(class_loader=loader)
+class Service:
+    def __init__(self, repository: Repository, config: Config, report: Lazy["Report"]) -> None:
+        self.repository = repository
+        self.config = config
+        self.report = report
+
+
+@autowired(class_loader=loader)
+class Report:
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+
+@autowired(class_loader=loader, as_singleton=False)
+class Handler:
+    def __init__(self, config: Config, name: str = "handler") -> None:
+        self.config = config
+        self.name = name
+
+
+def test_get():
+    assert loader.get(Service) is Service()
+    assert loader.get(Handler, name="x").name == "x"
+
+
+def test_child_overrides_instance():
+    database = FakeDatabase(Config())
+    child = loader.child({Database: database})
+
+    service = child.get(Service)
+
+    assert service.repository.database is database
+    assert service is child.get(Service)
+    assert service is not Service()
+    assert service.config is Config()
+    assert resolve(service.report).database is database
+    assert Repository().database is not database
+
+
+def test_child_overrides_class():
+    child = loader.child({Database: FakeDatabase})
+
+    repository = child.get(Repository)
+
+    assert isinstance(repository.database, FakeDatabase)
+    assert repository.database.config is Config()
+    assert child.get(Handler) is not child.get(Handler)
+    assert child.get(Handler).config is Config()
+    assert child.is_overridden(Repository)
+    assert not child.is_overridden(Handler)
+
+
+def test_nested_children():
+    parent = loader.child({Database: FakeDatabase})
+    config = object.__new__(Config)
+    child = parent.child({Config: config})
+
+    assert child.get(Repository).database.config is config
+    assert parent.get(Repository).database.config is Config()
+
+
+def test_override_during_is_overridden(monkeypatch):
+    child = loader.child()
+    reachable = child_loader.reachable_types
+
+    def override_while_walking(class_loader, class_):
+        types = reachable(class_loader, class_)
+        child.override(Database, FakeDatabase)
+        return types
+
+    monkeypatch.setattr(child_loader, "reachable_types", override_while_walking)
+    assert not child.is_overridden(Repository)
+    monkeypatch.setattr(child_loader, "reachable_types", reachable)
+
+    assert child.is_overridden(Repository)
+    assert isinstance(child.get(Repository).database, FakeDatabase)
+
+
+def test_replacing_classes_are_built_per_child():
+    first = loader.child({Database: FakeDatabase})
+    second = loader.child({Database: FakeDatabase})
+
+    database = first.get(Database)
+
+    assert isinstance(database, FakeDatabase)
+    assert database is first.get(Database)
+    assert database is not second.get(Database)
+    assert first.is_overridden(FakeDatabase)
+    assert not any(isinstance(instance, FakeDatabase) for instance in loader._instance_storage.instances())
@@ -2,8 +2,13 @@ from smarti import autowired
 from smarti.class_loader import ClassLoader
 from smarti.class_loader_flags import ClassLoaderFlags
 import pytest
+import threading
+import time
+from typing import List
 
 from smarti.exceptions import CyclicDependencyException
+from smarti.pool import ObjectPool
+from smarti.storage_policy import LRUPolicy
 
 multithread_classloader = ClassLoader(
     ClassLoaderFlags.ALL_DEPENDENCIES_AUTOWIRED)
@@ -93,6 +98,36 @@ class K:
         self.s = s
 
 
+warmup_loader = ClassLoader()
+# the leaves of the warmup graph are only built if they are built in parallel
+leaves_barrier = threading.Barrier(2, timeout=5)
+
+
+class SlowLeaf:
+    def __init__(self) -> None:
+        leaves_barrier.wait()
+
+
+@autowired(class_loader=warmup_loader)
+class SlowA:
+    def __init__(self) -> None:
+        leaves_barrier.wait()
+        time.sleep(0.05)
+
+
+@autowired(class_loader=warmup_loader)
+class SlowB:
+    def __init__(self, leaf: SlowLeaf) -> None:
+        self.leaf = leaf
+
+
+@autowired(class_loader=warmup_loader, as_singleton=False)
+class WarmRoot:
+    def __init__(self, a: SlowA, b: SlowB) -> None:
+        self.a = a
+        self.b = b
+
+
 def dummyA():
     pass
 
@@ -175,3 +210,249 @@ def test_throws_on_cyclic_dependencies():
     import tests.cyclic_classes as cc
     with pytest.raises(CyclicDependencyException):
         cc.A()
+
+
+def test_warmup_creates_singletons_in_waves():
+    timings = warmup_loader.warmup([WarmRoot], max_workers=4)
+
+    assert set(timings) == {SlowLeaf, SlowA, SlowB}
+    assert timings[SlowA] >= 0.05
+
+    root = WarmRoot()
+    assert root.a is SlowA()
+    assert root.b.leaf is SlowB().leaf
+
+
+def test_unwired_classes_are_not_modified():
+    init = F.__init__
+    new = F.__new__
+
+    instance = E()
+
+    assert instance.b.a == "123"
+    assert F.__init__ is init
+    assert F.__new__ is new
+    assert "__unmodified__init__" not in vars(F)
+    assert F("x").a == "x"
+
+
+def test_unwired_classes_concurrently():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(8) as executor:
+        instances = list(executor.map(lambda i: E(f_kwargs={"a": str(i)}), range(200)))
+
+    assert [instance.b.a for instance in instances] == [str(i) for i in range(200)]
+
+
+def test_check_cycles_statically():
+    import tests.cyclic_classes as cc
+    loader = ClassLoader()
+
+    with pytest.raises(CyclicDependencyException, match="A -> B -> C -> A"):
+        loader.check_cycles(cc.A)
+
+    loader.check_cycles(WarmRoot)
+
+
+def test_check_cycles_on_register():
+    import tests.cyclic_classes as cc
+    loader = ClassLoader(ClassLoaderFlags.CHECK_CYCLES_ON_REGISTER)
+
+    with pytest.raises(CyclicDependencyException, match="B -> C -> A -> B"):
+        loader._register(cc.B)
+
+
+metrics_loader = ClassLoader()
+
+
+@autowired(class_loader=metrics_loader)
+class MetricsLeaf:
+    pass
+
+
+@autowired(class_loader=metrics_loader, as_singleton=False)
+class MetricsRoot:
+    def __init__(self, leaf: MetricsLeaf) -> None:
+        self.leaf = leaf
+
+
+def test_stats():
+    assert metrics_loader.stats()["enabled"] is False
+
+    metrics_loader.enable_metrics()
+    MetricsRoot()
+    MetricsRoot()
+
+    stats = metrics_loader.stats()
+    root = stats["classes"][f"{__name__}.MetricsRoot"]
+    leaf = stats["classes"][f"{__name__}.MetricsLeaf"]
+
+    assert stats["enabled"] is True
+    assert root["constructions"] == 2
+    assert leaf["constructions"] == 1
+    assert (leaf["hits"], leaf["misses"]) == (1, 1)
+    assert root["construction_seconds"] >= root["init_seconds"]
+
+    metrics_loader.disable_metrics()
+    MetricsRoot()
+    assert metrics_loader.stats()["constructions"] == 0
+
+
+def test_export_collapsed_stacks():
+    metrics_loader.disable_metrics()
+    with pytest.raises(RuntimeError):
+        metrics_loader.export_collapsed_stacks()
+
+    metrics_loader.enable_metrics()
+    metrics_loader._instance_storage._storage.clear()
+    MetricsRoot()
+
+    lines = metrics_loader.export_collapsed_stacks().splitlines()
+    paths = sorted(line.rsplit(" ", 1)[0] for line in lines)
+
+    assert paths == [f"{__name__}.MetricsRoot", f"{__name__}.MetricsRoot;{__name__}.MetricsLeaf"]
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in lines)
+    metrics_loader.disable_metrics()
+
+
+batch_loader = ClassLoader()
+
+
+@autowired(class_loader=batch_loader)
+class BatchConfig:
+    pass
+
+
+@autowired(class_loader=batch_loader, as_singleton=False)
+class BatchBuffer:
+    pass
+
+
+@autowired(class_loader=batch_loader, as_singleton=False, topic="default")
+class BatchMessage:
+    def __init__(self, config: BatchConfig, buffer: BatchBuffer, topic: str, payload: str = "") -> None:
+        self.config = config
+        self.buffer = buffer
+        self.topic = topic
+        self.payload = payload
+
+
+def test_create_many():
+    messages = batch_loader.create_many(BatchMessage, [{"payload": "a"}, {"payload": "b", "topic": "x"}, {}])
+
+    assert [(m.topic, m.payload) for m in messages] == [("default", "a"), ("x", "b"), ("default", "")]
+    assert all(m.config is BatchConfig() for m in messages)
+    assert len({id(m.buffer) for m in messages}) == 3
+    assert all(isinstance(m, BatchMessage) for m in messages)
+
+
+def test_iter_many_is_lazy():
+    def overrides():
+        yield {"payload": "first"}
+        raise AssertionError("consumed too early")
+
+    assert next(batch_loader.iter_many(BatchMessage, overrides())).payload == "first"
+    assert [b is BatchConfig() for b in batch_loader.create_many(BatchConfig, [{}, {}])] == [True, True]
+
+
+def test_iter_many_compiles_transient_dependencies(monkeypatch):
+    instantiated = []
+    instantiate = batch_loader._instantiate_class
+
+    def recording_instantiate(type_, *args):
+        instantiated.append(type_)
+        return instantiate(type_, *args)
+
+    monkeypatch.setattr(batch_loader, "_instantiate_class", recording_instantiate)
+    messages = batch_loader.create_many(BatchMessage, [{"payload": "a"}, {"payload": "b"}])
+
+    assert BatchBuffer not in instantiated
+    assert all(isinstance(m.buffer, BatchBuffer) for m in messages)
+    assert messages[0].buffer is not messages[1].buffer
+
+
+pool_loader = ClassLoader()
+
+
+@autowired(class_loader=pool_loader)
+class PoolConfig:
+    pass
+
+
+@autowired(class_loader=pool_loader, as_singleton=False, pool=ObjectPool(4))
+class PooledParser:
+    def __init__(self, config: PoolConfig, strict: bool = False) -> None:
+        self.config = config
+        self.strict = strict
+        self.tokens: List[str] = []
+
+    def __reset__(self) -> None:
+        self.tokens.clear()
+
+
+def test_pooled_instances_are_reused():
+    parser = PooledParser()
+    parser.tokens.append("a")
+    assert pool_loader.release(parser)
+
+    with pool_loader.checkout(PooledParser) as reused:
+        assert reused is parser
+        assert reused.tokens == []
+        assert reused.config is PoolConfig()
+
+    assert PooledParser(strict=True) is not parser
+    assert PooledParser(strict=True).strict
+
+
+def test_pool_rejects_singletons():
+    with pytest.raises(ValueError):
+        pool_loader.set_pool(PoolConfig, ObjectPool(1))
+    with pytest.raises(ValueError):
+        pool_loader.release(PoolConfig())
+
+
+default_loader = ClassLoader()
+
+
+@autowired(class_loader=default_loader)
+class DefaultService:
+    pass
+
+
+def test_default_singleton_fast_path():
+    service = DefaultService()
+
+    assert default_loader._instance_storage._defaults[DefaultService] is service
+    assert DefaultService() is service
+
+    default_loader.enable_metrics()
+    try:
+        assert DefaultService() is service
+        assert default_loader.stats()["hits"] == 1
+    finally:
+        default_loader.disable_metrics()
+
+    default_loader.set_storage_policy(DefaultService, LRUPolicy(1))
+    assert DefaultService not in default_loader._instance_storage._defaults
+    assert DefaultService() is service
+
+
+@autowired(class_loader=default_loader)
+class CountedService:
+    constructions = 0
+
+    def __init__(self, n: int = 0) -> None:
+        CountedService.constructions += 1
+        self.n = n
+
+
+def test_storage_policy_set_after_creation_keeps_singletons():
+    first = CountedService(n=1)
+
+    default_loader.set_storage_policy(CountedService, LRUPolicy(10))
+    assert CountedService(n=1) is first
+
+    default_loader.set_storage_policy(CountedService, None)
+    assert CountedService(n=1) is first
+    assert CountedService.constructions == 1
@@ -0,0 +1,167 @@
+"""Stress tests for concurrent resolution, registration and singleton creation.
+They are most meaningful on free-threaded CPython (3.13t), but the short switch interval makes races likely with the GIL, too.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, List
+
+import pytest
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.pool import ObjectPool
+
+THREADS = 8
+ROUNDS = 200
+
+loader = ClassLoader()
+constructions: Counter = Counter()
+constructions_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with constructions_lock:
+        constructions[name] += 1
+
+
+@pytest.fixture(autouse=True)
+def short_switch_interval():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def _hammer(target: Callable[[int], None], threads: int = THREADS) -> None:
+    """Runs the target in all threads at once and re-raises the first error."""
+    barrier = threading.Barrier(threads)
+    errors: List[BaseException] = []
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            target(index)
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+
+class Settings:
+    def __init__(self) -> None:
+        _count("Settings")
+        time.sleep(0.001)
+
+
+@autowired(class_loader=loader)
+class Connection:
+    def __init__(self, settings: Settings) -> None:
+        _count("Connection")
+        time.sleep(0.001)
+        self.settings = settings
+
+
+@autowired(class_loader=loader)
+class Tenant:
+    def __init__(self, connection: Connection, name: str = "default") -> None:
+        _count(f"Tenant-{name}")
+        self.connection = connection
+        self.name = name
+
+
+@autowired(class_loader=loader, as_singleton=False)
+class Request:
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+
+def test_singletons_are_constructed_exactly_once():
+    results: List[Tenant] = []
+
+    def target(index: int) -> None:
+        for i in range(ROUNDS):
+            results.append(Tenant(name=f"t{i % 10}"))  # type: ignore[call-arg]
+            results.append(Tenant())  # type: ignore[call-arg]
+
+    _hammer(target)
+
+    assert constructions["Settings"] == 1
+    assert constructions["Connection"] == 1
+    assert all(constructions[f"Tenant-t{i}"] == 1 for i in range(10))
+    assert constructions["Tenant-default"] == 1
+    assert len({id(tenant) for tenant in results}) == 11
+
+
+def test_registration_during_resolution():
+    registered: List[type] = []
+
+    def target(index: int) -> None:
+        for i in range(ROUNDS // 10):
+            if index % 2:
+                @autowired(class_loader=loader, as_singleton=False)
+                class Dynamic:
+                    def __init__(self, connection: Connection) -> None:
+                        self.connection = connection
+
+                registered.append(Dynamic)
+                assert Dynamic().connection is Connection()  # type: ignore[call-arg]
+            else:
+                assert Request().connection is Connection()  # type: ignore[call-arg]
+
+    _hammer(target)
+
+    assert all(type_ in loader._check_autowire._known_types for type_ in registered)
+
+
+def test_freeze_and_flags_during_resolution():
+    def target(index: int) -> None:
+        for _ in range(ROUNDS // 10):
+            if index == 0:
+                loader.freeze(strict=False)
+            elif index == 1:
+                loader.set_flags(loader._flags)
+            else:
+                assert Request().connection is Connection()  # type: ignore[call-arg]
+
+    _hammer(target)
+    loader.unfreeze()
+
+
+def test_pool_toggled_during_resolution():
+    def target(index: int) -> None:
+        for i in range(ROUNDS):
+            if index == 0:
+                loader.set_pool(Request, ObjectPool(4) if i % 2 else None)
+                continue
+
+            request = Request()  # type: ignore[call-arg]
+            assert request.connection is Connection()  # type: ignore[call-arg]
+            if Request in loader._pools:
+                try:
+                    loader.release(request)
+                except ValueError:
+                    pass
+
+    _hammer(target)
+    loader.set_pool(Request, None)
+
+
+def test_child_loader_builds_overrides_once():
+    child = loader.child({Settings: Settings})
+
+    connections = []
+    _hammer(lambda _: connections.extend(child.get(Connection) for _ in range(ROUNDS)))
+
+    assert len({id(connection) for connection in connections}) == 1
+    assert connections[0] is not Connection()
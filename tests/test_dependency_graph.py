@@ -0,0 +1,59 @@
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.dependency_graph import DependencyGraph
+from smarti.exceptions import CyclicDependencyException
+import pytest
+
+loader = ClassLoader()
+
+
+class Leaf:
+    pass
+
+
+@autowired(class_loader=loader)
+class Config:
+    def __init__(self, leaf: Leaf) -> None:
+        self.leaf = leaf
+
+
+@autowired(class_loader=loader, as_singleton=False, name="x")
+class Handler:
+    def __init__(self, config: Config, leaf: Leaf, name: str) -> None:
+        self.config = config
+
+
+class Cyclic:
+    def __init__(self, other: "Other") -> None:
+        pass
+
+
+class Other:
+    def __init__(self, cyclic: Cyclic) -> None:
+        pass
+
+
+def test_graph_nodes():
+    graph = DependencyGraph.from_roots(loader, [Handler])
+    handler = graph.roots[0]
+
+    assert handler.type_ is Handler
+    assert handler.autowired
+    assert not handler.as_singleton
+    assert handler.constants == [("name", "x")]
+    assert [(name, node.type_) for name, node in handler.dependencies] == [("config", Config), ("leaf", Leaf)]
+    assert len(graph.nodes) == 4
+
+
+def test_graph_levels():
+    graph = DependencyGraph.from_roots(loader, [Handler])
+
+    levels = [[node.type_ for node in level] for level in graph.levels()]
+
+    assert levels == [[Leaf, Leaf], [Config], [Handler]]
+    assert [node.type_ for node in graph.topological_order()][-1] is Handler
+
+
+def test_graph_detects_cycles():
+    with pytest.raises(CyclicDependencyException, match="Cyclic -> Other -> Cyclic"):
+        DependencyGraph.from_roots(loader, [Cyclic])
@@ -0,0 +1,110 @@
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.class_loader_flags import ClassLoaderFlags
+from smarti.exceptions import CyclicDependencyException
+import pytest
+
+loader = ClassLoader()
+
+
+class A:
+    def __init__(self) -> None:
+        pass
+
+
+class F:
+    def __init__(self, a: str) -> None:
+        self.a = a
+
+
+@autowired(as_singleton=True, class_loader=loader)
+class S:
+    pass
+
+
+@autowired(as_singleton=False, class_loader=loader)
+class T:
+    def __init__(self, s: S, a: A) -> None:
+        self.s = s
+        self.a = a
+
+
+@autowired(as_singleton=False, class_loader=loader, x=3, f_kwargs={"a": "abc"})
+class Root:
+    def __init__(self, t: T, f: F, x: int, y: int = 5) -> None:
+        self.t = t
+        self.f = f
+        self.x = x
+        self.y = y
+
+
+cyclic_loader = ClassLoader()
+
+
+@autowired(class_loader=cyclic_loader)
+class CycA:
+    def __init__(self, b: "CycB") -> None:
+        pass
+
+
+class CycB:
+    def __init__(self, a: CycA) -> None:
+        pass
+
+
+def test_freeze_generates_factories():
+    problems = loader.freeze()
+
+    assert not problems
+    assert set(loader._frozen_factories) == {S, T, Root}
+
+
+def test_frozen_factories_wire_dependencies():
+    loader.freeze()
+
+    instance = Root()
+    other = Root()
+
+    assert instance.x == 3
+    assert instance.y == 5
+    assert instance.f.a == "abc"
+    assert isinstance(instance.t.a, A)
+    assert instance.t is not other.t
+    assert instance.t.s is other.t.s is S()
+
+
+def test_custom_arguments_use_generic_path():
+    loader.freeze()
+
+    instance = Root(x=4, f_kwargs={"a": "xyz"})
+
+    assert instance.x == 4
+    assert instance.f.a == "xyz"
+
+
+def test_unfreeze():
+    loader.freeze()
+    loader.unfreeze()
+
+    assert not loader._frozen_factories
+    assert Root().x == 3
+
+
+def test_freeze_detects_cycles():
+    with pytest.raises(CyclicDependencyException, match="CycA -> CycB -> CycA"):
+        cyclic_loader.freeze()
+
+    problems = cyclic_loader.freeze(strict=False)
+    assert isinstance(problems[CycA], CyclicDependencyException)
+
+
+def test_freeze_detects_unwired_classes():
+    threaded_loader = ClassLoader(ClassLoaderFlags.ALL_DEPENDENCIES_AUTOWIRED)
+
+    @autowired(class_loader=threaded_loader)
+    class U:
+        def __init__(self, a: A) -> None:
+            pass
+
+    with pytest.raises(RuntimeError):
+        threaded_loader.freeze()
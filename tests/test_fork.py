@@ -0,0 +1,97 @@
+import gc
+import os
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+import smarti.fork as fork
+from smarti.fork import ForkPolicy
+import pytest
+
+loader = ClassLoader()
+
+
+@autowired(class_loader=loader)
+class Model:
+    pass
+
+
+@autowired(class_loader=loader, fork_policy="per-process")
+class Connection:
+    pass
+
+
+@autowired(class_loader=loader)
+class Repository:
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+
+def _in_child(function) -> str:
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        os.close(read)
+        try:
+            result = str(function())
+        except BaseException as e:
+            result = repr(e)
+        os.write(write, result.encode())
+        os._exit(0)
+
+    os.close(write)
+    with os.fdopen(read) as pipe:
+        result = pipe.read()
+    os.waitpid(pid, 0)
+
+    return result
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not supported")
+def test_fork_policies():
+    assert loader._instance_storage.is_per_process(Connection)
+    assert not loader._instance_storage.is_per_process(Model)
+
+    timings = loader.warmup([Model, Repository], include_per_process=False)
+    assert set(timings) == {Model}
+
+    model = id(Model())
+    connection = id(Connection())
+
+    assert _in_child(lambda: id(Model()) == model) == "True"
+    assert _in_child(lambda: id(Connection()) != connection and Connection() is Connection()) == "True"
+
+    repository = Repository()
+    assert repository.connection is Connection()
+    assert _in_child(lambda: Repository() is not repository and Repository().connection is Connection()) == "True"
+    assert Repository() is repository
+    assert Connection() is Connection()
+    assert id(Connection()) == connection
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not supported")
+def test_fork_resets_locks():
+    loader._instance_storage._storage_lock.acquire()
+    try:
+        assert _in_child(lambda: Repository().connection is Connection()) == "True"
+    finally:
+        loader._instance_storage._storage_lock.release()
+
+
+def test_invalid_fork_policy():
+    with pytest.raises(ValueError):
+        loader.set_fork_policy(Model, "shared")
+
+    loader.set_fork_policy(Model, ForkPolicy.INHERIT)
+    assert not loader._instance_storage.is_per_process(Model)
+
+
+def test_short_lived_loaders_share_one_hook():
+    gc.collect()
+    registered = len(fork._class_loaders)
+    temporary = ClassLoader()
+    assert len(fork._class_loaders) == registered + 1
+
+    del temporary
+    gc.collect()
+
+    assert len(fork._class_loaders) == registered
@@ -0,0 +1,77 @@
+import json
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.dependency_graph import DependencyGraph
+from smarti.graph_export import critical_path, graph_to_dict, graph_to_dot
+from smarti.lazy import Lazy
+import pytest
+
+loader = ClassLoader()
+
+
+class Model:
+    pass
+
+
+@autowired(class_loader=loader)
+class Db:
+    pass
+
+
+@autowired(class_loader=loader)
+class Cache:
+    pass
+
+
+@autowired(class_loader=loader)
+class Repository:
+    def __init__(self, db: Db) -> None:
+        self.db = db
+
+
+@autowired(class_loader=loader, as_singleton=False)
+class App:
+    def __init__(self, repository: Repository, cache: Cache, model: Lazy[Model]) -> None:
+        self.repository = repository
+
+
+TIMINGS = {App: 0.001, Repository: 0.002, Db: 0.5, Cache: 0.1}
+
+
+def test_critical_path():
+    graph = DependencyGraph.from_roots(loader, [App])
+    path, seconds = critical_path(graph, TIMINGS)
+
+    assert [node.type_ for node in path] == [App, Repository, Db]
+    assert seconds == pytest.approx(0.503)
+
+
+def test_graph_to_dict():
+    data = graph_to_dict(DependencyGraph.from_roots(loader, [App]), TIMINGS)
+    nodes = {node["name"]: node for node in data["nodes"]}
+    app = nodes["App"]
+
+    assert app["root"] and not app["singleton"]
+    assert app["seconds"] == 0.001
+    assert app["lazy_dependencies"] == [{"parameter": "model", "class": f"{__name__}.Model"}]
+    assert {"from": app["id"], "to": nodes["Cache"]["id"], "parameter": "cache"} in data["edges"]
+    assert data["critical_path"] == [app["id"], nodes["Repository"]["id"], nodes["Db"]["id"]]
+
+
+def test_graph_to_dot():
+    dot = graph_to_dot(DependencyGraph.from_roots(loader, [App]), TIMINGS)
+
+    assert dot.startswith("digraph smarti {")
+    assert 'label="Db\\n500.00 ms", color=red' in dot
+    assert '[label="model", style=dashed]' in dot
+
+
+def test_export_graph():
+    data = json.loads(loader.export_graph(roots=[App]))
+
+    assert {node["name"] for node in data["nodes"]} == {"App", "Repository", "Db", "Cache"}
+    assert all(node["seconds"] is None for node in data["nodes"])
+
+    with pytest.raises(ValueError):
+        loader.export_graph("svg")
@@ -0,0 +1,74 @@
+from smarti.check_autowire import CheckAutowire
+from smarti.injection_plan import InjectionPlan, InjectionPlanCache
+
+
+class B:
+    pass
+
+
+class Y:
+    def __init__(self, b: B, s: str, c: int = 3, *args, **kwargs) -> None:
+        pass
+
+
+def dummyA(a, b: B):
+    pass
+
+
+def test_plan_contains_parameters():
+    checker = CheckAutowire()
+    plan = checker.get_plan(Y.__init__)
+
+    assert [p.name for p in plan.parameters] == ["b", "s", "c"]
+    assert plan.parameters[0].type_ is B
+    assert plan.parameters[0].can_autowire
+    assert not plan.parameters[1].can_autowire
+    assert plan.parameters[2].has_default
+    assert plan.parameters[2].default == 3
+    assert not plan.problems
+
+
+def test_plan_contains_problems():
+    checker = CheckAutowire()
+    plan = checker.get_plan(dummyA)
+
+    assert plan.problems == ("a",)
+    assert [p.name for p in plan.parameters] == ["b"]
+
+
+def test_plan_is_cached():
+    checker = CheckAutowire()
+    calls = []
+
+    def factory(callable):
+        calls.append(callable)
+        return InjectionPlan.from_callable(callable, checker.can_autowire_type, CheckAutowire.IGNORED_ARGUMENTS)
+
+    cache = InjectionPlanCache()
+    plan = cache.get(Y.__init__, factory)
+
+    assert cache.get(Y.__init__, factory) is plan
+    assert len(calls) == 1
+
+    cache.get(object.__init__, factory)
+    assert cache.get(object.__init__, factory) is not None
+    assert len(calls) == 2
+    assert len(cache) == 2
+
+    cache.invalidate(Y.__init__)
+    assert cache.get(Y.__init__, factory) is not plan
+
+
+def test_plan_cache_does_not_keep_callables_alive():
+    import gc
+    checker = CheckAutowire()
+
+    def local(b: B):
+        pass
+
+    checker.get_plan(local)
+    assert len(checker._plan_cache) == 1
+
+    del local
+    gc.collect()
+    assert len(checker._plan_cache) == 0
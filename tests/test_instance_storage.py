@@ -1,10 +1,16 @@
 from smarti.instance_storage import InstanceStorage
+from smarti.key_strategy import KeyStrategy
+from smarti.storage_policy import LRUPolicy
 
 
 class Testclass:
     pass
 
 
+class Other:
+    pass
+
+
 def test_add_instance():
     storage = InstanceStorage()
 
@@ -43,11 +49,8 @@ def test_get_instance():
 def test_generate_key():
     expected = (
         "a.B",
-        (
-            "args",
-            b"\x80\x04\x95/\x00\x00\x00\x00\x00\x00\x00]\x94C(\x80\x04\x95\x1d\x00\x00\x00\x00\x00\x00\x00]\x94(C\x05\x80\x04K\x01.\x94C\x05\x80\x04K\x02.\x94C\x05\x80\x04K\x03.\x94e.\x94a.",
-        ),
-        b"\x80\x04\x95\x85\x00\x00\x00\x00\x00\x00\x00]\x94(C\x10\x80\x04\x95\x05\x00\x00\x00\x00\x00\x00\x00\x8c\x01a\x94.\x94C\x10\x80\x04\x95\x05\x00\x00\x00\x00\x00\x00\x00\x8c\x01x\x94.\x94\x86\x94C\x17\x80\x04\x95\x0c\x00\x00\x00\x00\x00\x00\x00\x8c\x08f_kwargs\x94.\x94C9\x80\x04\x95.\x00\x00\x00\x00\x00\x00\x00]\x94C\x10\x80\x04\x95\x05\x00\x00\x00\x00\x00\x00\x00\x8c\x01x\x94.\x94C\x12\x80\x04\x95\x07\x00\x00\x00\x00\x00\x00\x00\x8c\x03bla\x94.\x94\x86\x94a.\x94\x86\x94e.",
+        (tuple, ((int, 1), (int, 2), (int, 3))),
+        frozenset({("a", (str, "x")), ("f_kwargs", (dict, frozenset({((str, "x"), (str, "bla"))})))}),
     )
     storage = InstanceStorage()
 
@@ -56,3 +59,111 @@ def test_generate_key():
     )
 
     assert expected == generated
+
+
+def test_generate_key_caches_identity():
+    storage = InstanceStorage()
+
+    key = storage.generate_key(Testclass, [], {"a": "b"})
+
+    assert key == ("tests.test_instance_storage.Testclass", (), frozenset({("a", (str, "b"))}))
+    assert storage._identities[Testclass] == "tests.test_instance_storage.Testclass"
+
+
+def test_generate_key_ignores_seen_types():
+    storage = InstanceStorage()
+
+    assert storage.generate_key(Testclass, [], {"a": 1}) == storage.generate_key(
+        Testclass, [], {"a": 1, "__already_seen_types__": [Testclass]})
+
+
+def test_custom_key_strategy():
+    class IdentityOnly(KeyStrategy):
+        def generate_key(self, identity, type_, arguments, kwargs):
+            return identity
+
+    storage = InstanceStorage(IdentityOnly())
+    instance = Testclass()
+
+    storage.add_or_get(Testclass, instance, [], {"a": 1})
+
+    assert storage.get_instance(Testclass, [], {"a": 2}) is instance
+
+
+def test_get_or_create_creates_once():
+    import threading
+    import time
+
+    storage = InstanceStorage()
+    created = []
+    barrier = threading.Barrier(8)
+    results = []
+
+    def factory():
+        time.sleep(0.01)
+        instance = Testclass()
+        created.append(instance)
+        return instance
+
+    def worker():
+        barrier.wait()
+        results.append(storage.get_or_create(Testclass, [], {"a": 1}, factory))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
+    assert not storage._creation_locks
+
+
+def test_get_or_create_retries_after_failure():
+    storage = InstanceStorage()
+
+    def failing_factory():
+        raise ValueError()
+
+    try:
+        storage.get_or_create(Testclass, [], None, failing_factory)
+    except ValueError:
+        pass
+
+    instance = Testclass()
+    assert storage.get_or_create(Testclass, [], None, lambda: instance) is instance
+    assert storage.get_instance(Testclass, []) is instance
+
+
+def test_memory_usage():
+    storage = InstanceStorage()
+    storage.set_policy(Other, LRUPolicy(10))
+    for i in range(3):
+        storage.add_or_get(Testclass, Testclass(), [i])
+    storage.add_or_get(Other, Other(), [])
+
+    usage = storage.memory_usage()
+
+    assert usage["tests.test_instance_storage.Testclass"]["instances"] == 3
+    assert usage["tests.test_instance_storage.Testclass"]["key_bytes"] > 0
+    assert usage["tests.test_instance_storage.Other"]["instances"] == 1
+
+
+def test_policies_take_over_existing_instances():
+    storage = InstanceStorage()
+    first, second = Testclass(), Testclass()
+    storage.add_or_get(Testclass, first, [1])
+    storage.add_or_get(Other, Other(), [1])
+
+    storage.set_policy(Testclass, LRUPolicy(10))
+    assert storage.get_instance(Testclass, [1]) is first
+    assert len(storage._storage) == 1
+
+    storage.set_policy(Testclass, None)
+    assert storage.get_instance(Testclass, [1]) is first
+
+    storage.add_or_get(Testclass, second, [2])
+    policy = storage.ensure_policy(Testclass, lambda: LRUPolicy(10))
+    assert len(policy) == 2
+    assert storage.get_instance(Testclass, [2]) is second
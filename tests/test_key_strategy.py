@@ -0,0 +1,97 @@
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.key_strategy import DigestKeyStrategy, PickleKeyStrategy, StructuralKeyStrategy, key_size, make_hashable
+
+
+class Testclass:
+    pass
+
+
+class Unhashable:
+    __hash__ = None  # type: ignore
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+
+def test_structural_key_is_order_independent():
+    strategy = StructuralKeyStrategy()
+
+    assert strategy.generate_key("a.B", Testclass, [], {"a": 1, "b": [1, 2]}) == strategy.generate_key(
+        "a.B", Testclass, [], {"b": [1, 2], "a": 1})
+
+
+def test_structural_key_distinguishes_values():
+    strategy = StructuralKeyStrategy()
+
+    assert strategy.generate_key("a.B", Testclass, [], {"a": [1, 2]}) != strategy.generate_key(
+        "a.B", Testclass, [], {"a": (1, 2)})
+    assert strategy.generate_key("a.B", Testclass, [], {"a": {"x": 1}}) != strategy.generate_key(
+        "a.B", Testclass, [], {"a": {"x": 2}})
+    assert strategy.generate_key("a.B", Testclass, [1], None) != strategy.generate_key(
+        "a.B", Testclass, [], None)
+
+
+def test_structural_key_distinguishes_types():
+    strategy = StructuralKeyStrategy()
+
+    keys = {strategy.generate_key("a.B", Testclass, [], {"flag": value}) for value in (True, 1, 1.0)}
+    assert len(keys) == 3
+    assert strategy.generate_key("a.B", Testclass, [(1,)], None) != strategy.generate_key("a.B", Testclass, [(True,)], None)
+
+
+def test_make_hashable():
+    assert make_hashable("abc") == (str, "abc")
+    assert make_hashable({"a": [1, {2}]}) == (
+        dict, frozenset({((str, "a"), (list, ((int, 1), (set, frozenset({(int, 2)})))))}))
+    assert make_hashable(Unhashable(1)) == make_hashable(Unhashable(1))
+    assert make_hashable(Unhashable(1)) != make_hashable(Unhashable(2))
+
+
+def test_pickle_key_strategy():
+    strategy = PickleKeyStrategy()
+
+    key = strategy.generate_key("a.B", Testclass, [1], {"a": "x"})
+
+    assert key[0] == "a.B"
+    assert key == strategy.generate_key("a.B", Testclass, [1], {"a": "x"})
+
+
+def test_digest_key_strategy():
+    strategy = DigestKeyStrategy(PickleKeyStrategy())
+    payload = {"rows": list(range(100))}
+
+    key = strategy.generate_key("a.B", Testclass, [payload], {"a": "x"})
+    pickled = PickleKeyStrategy().generate_key("a.B", Testclass, [payload], {"a": "x"})
+
+    assert key == strategy.generate_key("a.B", Testclass, [{"rows": list(range(100))}], {"a": "x"})
+    assert key != strategy.generate_key("a.B", Testclass, [{"rows": list(range(101))}], {"a": "x"})
+    assert key_size(key) < key_size(pickled)
+
+
+def test_digest_key_strategy_wraps_structural_keys_by_default():
+    strategy = DigestKeyStrategy()
+
+    assert strategy.generate_key("a.B", Testclass, [Unhashable("x" * 100)], None) == strategy.generate_key(
+        "a.B", Testclass, [Unhashable("x" * 100)], None)
+    assert strategy.generate_key("a.B", Testclass, [1], None) == ("a.B", (tuple, ((int, 1),)), ())
+
+
+pickle_loader = ClassLoader(key_strategy=PickleKeyStrategy())
+
+
+class UnwiredSettings:
+    def __init__(self, name: str = "settings") -> None:
+        self.name = name
+
+
+@autowired(class_loader=pickle_loader)
+class PickleKeyed:
+    def __init__(self, settings: UnwiredSettings) -> None:
+        self.settings = settings
+
+
+def test_pickle_key_strategy_with_unwired_dependency():
+    assert PickleKeyed().settings is PickleKeyed().settings
+    assert PickleKeyed().settings.name == "settings"
+    assert PickleKeyed(settings_kwargs={"name": "x"}).settings.name == "x"  # type: ignore[call-arg]
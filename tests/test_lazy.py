@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import List
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.lazy import Lazy, LazyProxy, is_resolved, resolve
+
+loader = ClassLoader()
+created: List["Model"] = []
+
+
+class Model:
+    def __init__(self) -> None:
+        created.append(self)
+        self.weights = [1, 2, 3]
+
+    def predict(self) -> int:
+        return sum(self.weights)
+
+
+@autowired(class_loader=loader, as_singleton=False)
+class Handler:
+    def __init__(self, model: Lazy[Model]) -> None:
+        self.model = model
+
+
+@autowired(class_loader=loader)
+class Parent:
+    def __init__(self, child: Lazy["Child"]) -> None:
+        self.child = child
+
+
+@autowired(class_loader=loader)
+class Child:
+    def __init__(self, parent: Parent) -> None:
+        self.parent = parent
+
+
+def test_proxy_constructs_once():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.01)
+        return [1, 2]
+
+    proxy = LazyProxy(factory)
+    assert not is_resolved(proxy)
+
+    threads = [threading.Thread(target=lambda: len(proxy)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert is_resolved(proxy)
+    assert list(proxy) == [1, 2]
+    assert resolve(proxy) == [1, 2]
+    assert resolve(3) == 3
+
+
+def test_lazy_dependency_is_constructed_on_first_use():
+    created.clear()
+    handler = Handler()
+
+    assert isinstance(handler.model, LazyProxy)
+    assert not created
+
+    assert handler.model.predict() == 6
+    assert len(created) == 1
+    handler.model.weights = [1]
+    assert handler.model.predict() == 1
+    assert len(created) == 1
+
+
+def test_lazy_dependencies_may_be_cyclic():
+    parent = Parent()
+
+    assert parent.child.parent is parent
+
+
+def test_frozen_lazy_dependency():
+    loader.freeze()
+    try:
+        created.clear()
+        handler = Handler()
+        assert not created
+        assert handler.model.predict() == 6
+    finally:
+        loader.unfreeze()
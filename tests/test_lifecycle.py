@@ -0,0 +1,162 @@
+import asyncio
+import gc
+import threading
+from typing import List, Optional
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.lifecycle import DependencyRecords, dispose, disposal_levels, is_disposable
+
+loader = ClassLoader()
+closed: List[str] = []
+closed_lock = threading.Lock()
+# set by tests which expect two closes to overlap, they only pass the barrier together
+closing_barrier: Optional[threading.Barrier] = None
+
+
+def _closed(name: str) -> None:
+    with closed_lock:
+        closed.append(name)
+
+
+def _overlap() -> None:
+    if closing_barrier is not None:
+        closing_barrier.wait()
+
+
+class Plain:
+    pass
+
+
+class Resource:
+    def __init__(self, name: str = "resource") -> None:
+        self.name = name
+
+    def close(self) -> None:
+        _closed(self.name)
+
+
+class AsyncResource:
+    async def aclose(self) -> None:
+        await asyncio.sleep(0)
+        _closed("async")
+
+
+class Context:
+    def __exit__(self, *args) -> None:
+        _closed("context")
+
+
+@autowired(class_loader=loader)
+class Pool(Resource):
+    def __init__(self) -> None:
+        super().__init__("pool")
+
+
+@autowired(class_loader=loader)
+class Cache:
+    def __init__(self, pool: Pool) -> None:
+        self.pool = pool
+
+
+@autowired(class_loader=loader)
+class Client(Resource):
+    def __init__(self, cache: Cache) -> None:
+        super().__init__("client")
+        self.cache = cache
+
+    def close(self) -> None:
+        _overlap()
+        super().close()
+
+
+@autowired(class_loader=loader)
+class Other(Resource):
+    def __init__(self, pool: Pool) -> None:
+        super().__init__("other")
+
+    def close(self) -> None:
+        _overlap()
+        super().close()
+
+
+def test_dispose():
+    closed.clear()
+    dispose(Resource())
+    dispose(AsyncResource())
+    dispose(Context())
+
+    assert closed == ["resource", "async", "context"]
+    assert not is_disposable(Plain())
+
+
+def test_disposal_levels_follow_dependencies_through_plain_instances():
+    first, middle, last = Resource("first"), Plain(), Resource("last")
+    dependencies = {id(first): [id(middle)], id(middle): [id(last)]}
+
+    levels = disposal_levels([last, middle, first], lambda i: dependencies.get(id(i), ()))
+
+    assert levels == [[first], [last]]
+
+
+def test_dependency_records_vanish_with_their_instances():
+    records = DependencyRecords()
+    instance, dependency = Resource(), Plain()
+    records.record(instance, (id(dependency),))
+    records.record(object(), ())
+
+    assert records.get(instance) == (id(dependency),)
+    assert records.get(dependency) is None
+
+    del instance
+    gc.collect()
+
+    assert len(records) == 0
+
+
+def test_shutdown_disposes_in_reverse_dependency_order(monkeypatch):
+    closed.clear()
+    client = Client()
+    Other()
+
+    monkeypatch.setattr(f"{__name__}.closing_barrier", threading.Barrier(2, timeout=5))
+    assert loader.shutdown() == []
+
+    assert closed[-1] == "pool"
+    assert sorted(closed[:2]) == ["client", "other"]
+    assert Client() is not client
+
+
+def test_shutdown_reports_failures():
+    class Broken(Resource):
+        def close(self) -> None:
+            raise RuntimeError("broken")
+
+    broken = loader.manually_add_instance(Broken, Broken(), [])
+
+    failures = loader.shutdown()
+
+    assert [(instance, type(error)) for instance, error in failures] == [(broken, RuntimeError)]
+
+
+def test_ashutdown():
+    closed.clear()
+    Client()
+    loader.manually_add_instance(AsyncResource, AsyncResource(), [])
+
+    assert asyncio.run(loader.ashutdown()) == []
+    assert sorted(closed) == ["async", "client", "pool"]
+    assert closed[-1] == "pool"
+
+
+def test_shutdown_of_frozen_singletons():
+    loader.freeze()
+    try:
+        closed.clear()
+        Client()
+        assert len(loader._dependencies) == 0
+
+        assert loader.shutdown() == []
+        assert closed == ["client", "pool"]
+    finally:
+        loader.unfreeze()
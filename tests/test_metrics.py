@@ -0,0 +1,34 @@
+from smarti.metrics import ResolutionMetrics, percentile
+
+
+class A:
+    pass
+
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_snapshot():
+    metrics = ResolutionMetrics()
+    metrics.record_construction(A, 0.3, 0.1, 0.2)
+    metrics.record_construction(A, 0.1, 0.0, 0.1)
+    metrics.record_lookup(A, True)
+    metrics.record_lookup(A, True)
+    metrics.record_lookup(A, False)
+    metrics.record_lock_wait(A, 0.5)
+
+    snapshot = metrics.snapshot()
+    stats = snapshot["classes"][f"{__name__}.A"]
+
+    assert snapshot["constructions"] == 2
+    assert stats["p50_seconds"] == 0.1
+    assert stats["p99_seconds"] == 0.3
+    assert stats["introspection_seconds"] == 0.1
+    assert stats["hit_ratio"] == 2 / 3
+    assert snapshot["lock_wait_seconds"] == 0.5
@@ -0,0 +1,112 @@
+import gc
+import os
+import weakref
+from typing import Optional
+
+from smarti.check_autowire import CheckAutowire
+from smarti.class_loader import ClassLoader
+from smarti.injection_plan import InjectionPlan
+from smarti.lazy import Lazy
+from smarti.plan_disk_cache import PlanDiskCache
+import pytest
+
+
+class Dependency:
+    pass
+
+
+class Service:
+    def __init__(self, dependency: Dependency, lazy: Lazy[Dependency], name: str = "x", *, size: int = 3) -> None:
+        pass
+
+
+class Optionals:
+    def __init__(self, dependency: Optional[Dependency] = None) -> None:
+        pass
+
+
+def _compute(cache: PlanDiskCache, callable) -> InjectionPlan:
+    checker = CheckAutowire()
+    checker._disk_cache = cache
+    return checker.get_plan(callable)
+
+
+def _forbid_introspection(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("introspected")
+
+    monkeypatch.setattr(InjectionPlan, "from_callable", fail)
+
+
+def test_plans_are_restored(tmp_path, monkeypatch):
+    cache = PlanDiskCache(str(tmp_path))
+    plan = _compute(cache, Service.__init__)
+    cache.flush()
+
+    assert len(os.listdir(tmp_path)) == 1
+
+    _forbid_introspection(monkeypatch)
+    restored = _compute(PlanDiskCache(str(tmp_path)), Service.__init__)
+
+    assert [(p.name, p.type_, p.default, p.has_default, p.can_autowire, p.lazy) for p in restored.parameters] == [
+        (p.name, p.type_, p.default, p.has_default, p.can_autowire, p.lazy) for p in plan.parameters
+    ]
+    assert restored.parameters[2].default == "x"
+    assert restored.parameters[3].default == 3
+
+
+def test_changed_modules_are_introspected_again(tmp_path, monkeypatch):
+    cache = PlanDiskCache(str(tmp_path), validation="mtime")
+    _compute(cache, Service.__init__)
+    cache.flush()
+
+    stale = PlanDiskCache(str(tmp_path))
+    monkeypatch.setattr(stale, "_stamp", lambda path: [0, 0])
+    _forbid_introspection(monkeypatch)
+
+    with pytest.raises(AssertionError):
+        _compute(stale, Service.__init__)
+
+
+def test_hash_validation(tmp_path, monkeypatch):
+    cache = PlanDiskCache(str(tmp_path), validation="hash")
+    _compute(cache, Service.__init__)
+    cache.flush()
+
+    _forbid_introspection(monkeypatch)
+    assert _compute(PlanDiskCache(str(tmp_path), validation="hash"), Service.__init__).parameters[0].type_ is Dependency
+
+    with pytest.raises(ValueError):
+        PlanDiskCache(str(tmp_path), validation="size")
+
+
+def test_typing_annotations_are_not_persisted(tmp_path):
+    cache = PlanDiskCache(str(tmp_path))
+    _compute(cache, Optionals.__init__)
+    cache.flush()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_fork_replaces_lock(tmp_path):
+    loader = ClassLoader()
+    loader.enable_plan_cache(str(tmp_path))
+    disk_cache = loader._check_autowire._disk_cache
+    assert disk_cache is not None
+    disk_cache._lock.acquire()
+
+    loader._after_fork_in_child()
+
+    assert disk_cache._lock.acquire(blocking=False)
+    disk_cache._lock.release()
+
+
+def test_enabling_again_releases_the_previous_cache(tmp_path):
+    loader = ClassLoader()
+    loader.enable_plan_cache(str(tmp_path / "first"))
+    previous = weakref.ref(loader._check_autowire._disk_cache)
+
+    loader.enable_plan_cache(str(tmp_path / "second"))
+    gc.collect()
+
+    assert previous() is None
@@ -0,0 +1,78 @@
+from typing import List
+
+import pytest
+
+from smarti.pool import ObjectPool
+
+
+class Buffer:
+    def __init__(self) -> None:
+        self.data: List[int] = []
+
+    def __reset__(self) -> None:
+        self.data.clear()
+
+
+def test_acquire_reuses_released_instances():
+    pool = ObjectPool(2)
+    buffer = pool.acquire(Buffer)
+    buffer.data.append(1)
+
+    assert pool.release(buffer)
+    assert pool.acquire(Buffer) is buffer
+    assert buffer.data == []
+    assert pool.stats() == {"created": 1, "reused": 1, "released": 1, "discarded": 0, "in_use": 1, "size": 0}
+
+
+def test_release_discards_when_full():
+    pool = ObjectPool(1)
+    first, second = pool.acquire(Buffer), pool.acquire(Buffer)
+
+    assert pool.release(first)
+    assert not pool.release(second)
+    assert len(pool) == 1
+    assert pool.stats()["discarded"] == 1
+
+
+def test_failing_reset_discards_instance():
+    def reset(_):
+        raise RuntimeError("broken")
+
+    pool = ObjectPool(1, reset=reset)
+    with pytest.raises(RuntimeError):
+        pool.release(pool.acquire(Buffer))
+
+    assert len(pool) == 0
+    assert pool.stats()["discarded"] == 1
+
+
+def test_release_rejects_instances_which_are_not_checked_out():
+    pool = ObjectPool(2)
+    buffer = pool.acquire(Buffer)
+
+    assert pool.release(buffer)
+    with pytest.raises(ValueError):
+        pool.release(buffer)
+    with pytest.raises(ValueError):
+        pool.release(Buffer())
+
+    assert len(pool) == 1
+    assert pool.acquire(Buffer) is buffer
+    assert pool.acquire(Buffer) is not buffer
+
+
+def test_failing_factory_is_not_counted():
+    def factory():
+        raise RuntimeError("broken")
+
+    pool = ObjectPool(1)
+    with pytest.raises(RuntimeError):
+        pool.acquire(factory)
+
+    assert pool.stats()["created"] == 0
+    assert pool.stats()["in_use"] == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        ObjectPool(0)
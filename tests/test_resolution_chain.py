@@ -0,0 +1,41 @@
+from smarti.resolution_chain import ResolutionChain
+
+
+class A:
+    pass
+
+
+class B:
+    pass
+
+
+class C:
+    pass
+
+
+def test_push_and_pop():
+    chain = ResolutionChain([A])
+    chain.push(B)
+
+    assert B in chain
+    assert list(chain) == [A, B]
+
+    assert chain.pop() is B
+    assert B not in chain
+    assert A in chain
+    assert len(chain) == 1
+
+
+def test_cycle():
+    chain = ResolutionChain([A, B, C])
+
+    assert chain.cycle(B) == [B, C, B]
+    assert chain.cycle(A) == [A, B, C, A]
+
+
+def test_of_shares_chains():
+    chain = ResolutionChain([A])
+
+    assert ResolutionChain.of(chain) is chain
+    assert list(ResolutionChain.of([A, B])) == [A, B]
+    assert [] not in chain
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.exceptions import ScopeNotActiveException
+from smarti.scope import Scope
+import pytest
+
+loader = ClassLoader()
+
+
+class Buffer:
+    pass
+
+
+@autowired(class_loader=loader, scope="request")
+class RequestContext:
+    def __init__(self, buffer: Buffer) -> None:
+        self.buffer = buffer
+
+
+@autowired(class_loader=loader, as_singleton=False)
+class Handler:
+    def __init__(self, context: RequestContext) -> None:
+        self.context = context
+
+
+def test_scope_find():
+    outer = Scope("app")
+    inner = Scope("request", outer)
+
+    assert inner.find("request") is inner
+    assert inner.find("app") is outer
+    assert inner.find("task") is None
+
+
+def test_instances_live_once_per_scope():
+    with loader.scope("request") as scope:
+        first = Handler()
+        second = Handler()
+
+        assert first is not second
+        assert first.context is second.context is RequestContext()
+        assert len(scope) == 1
+
+    with loader.scope("request"):
+        assert Handler().context is not first.context
+
+    assert len(scope) == 0
+
+
+def test_scoped_class_outside_of_scope():
+    with pytest.raises(ScopeNotActiveException):
+        RequestContext()
+
+
+def test_nested_scopes():
+    with loader.scope("request"):
+        outer = RequestContext()
+        with loader.scope("request"):
+            assert RequestContext() is not outer
+        assert RequestContext() is outer
+
+
+def test_scopes_are_isolated_between_threads():
+    contexts = []
+
+    def worker():
+        with loader.scope("request"):
+            contexts.append(RequestContext())
+            contexts.append(RequestContext())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(context) for context in contexts}) == 4
+
+
+def test_scopes_are_isolated_between_tasks():
+    async def request():
+        with loader.scope("request"):
+            first = RequestContext()
+            await asyncio.sleep(0)
+            assert RequestContext() is first
+            return first
+
+    async def main():
+        return await asyncio.gather(request(), request())
+
+    first, second = asyncio.run(main())
+    assert first is not second
+
+
+def test_frozen_scoped_classes():
+    loader.freeze()
+    try:
+        with loader.scope("request"):
+            assert Handler().context is Handler().context
+    finally:
+        loader.unfreeze()
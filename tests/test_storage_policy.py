@@ -0,0 +1,112 @@
+import gc
+
+from smarti import autowired
+from smarti.class_loader import ClassLoader
+from smarti.storage_policy import LRUPolicy, TTLPolicy, UnboundedPolicy, WeakValuePolicy
+import pytest
+
+
+class Testclass:
+    pass
+
+
+def test_unbounded_policy():
+    policy = UnboundedPolicy()
+    instance = Testclass()
+
+    assert policy.get("a") is None
+    assert policy.put("a", instance) is instance
+    assert policy.put("a", Testclass()) is instance
+    assert policy.get("a") is instance
+    assert policy.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+
+def test_every_policy_lists_its_keys():
+    instance = Testclass()
+    for policy in (UnboundedPolicy(), LRUPolicy(2), TTLPolicy(60), WeakValuePolicy()):
+        policy.put("a", instance)
+        policy.put("b", instance)
+
+        assert sorted(policy.keys()) == ["a", "b"]
+
+
+def test_lru_policy_evicts_least_recently_used():
+    policy = LRUPolicy(2)
+    a, b, c = Testclass(), Testclass(), Testclass()
+
+    policy.put("a", a)
+    policy.put("b", b)
+    policy.get("a")
+    policy.put("c", c)
+
+    assert policy.get("a") is a
+    assert policy.get("b") is None
+    assert policy.get("c") is c
+    assert policy.stats() == {"hits": 3, "misses": 1, "evictions": 1, "size": 2}
+
+
+def test_lru_policy_validates_size():
+    with pytest.raises(ValueError):
+        LRUPolicy(0)
+
+
+def test_ttl_policy_expires_instances():
+    now = [0.0]
+    policy = TTLPolicy(10, clock=lambda: now[0])
+    instance = Testclass()
+
+    policy.put("a", instance)
+    now[0] = 9.0
+    assert policy.get("a") is instance
+
+    now[0] = 10.0
+    assert policy.get("a") is None
+    assert policy.stats() == {"hits": 1, "misses": 1, "evictions": 1, "size": 0}
+
+
+def test_weak_value_policy_releases_instances():
+    policy = WeakValuePolicy()
+    instance = Testclass()
+
+    policy.put("a", instance)
+    assert policy.get("a") is instance
+
+    del instance
+    gc.collect()
+
+    assert policy.get("a") is None
+    assert policy.stats() == {"hits": 1, "misses": 1, "evictions": 1, "size": 0}
+
+
+def test_decorator_storage_policy():
+    loader = ClassLoader()
+
+    @autowired(class_loader=loader, storage_policy=LRUPolicy(1))
+    class P:
+        def __init__(self, n: int = 0) -> None:
+            self.n = n
+
+    first = P(n=1)
+    assert P(n=1) is first
+    P(n=2)
+    assert P(n=1) is not first
+
+    stats = loader._instance_storage.get_policy(P).stats()
+    assert stats["evictions"] == 2
+    assert stats["size"] == 1
+
+
+def test_implicit_storage_policy():
+    loader = ClassLoader()
+    loader.set_implicit_storage_policy(lambda: LRUPolicy(1))
+
+    @autowired(class_loader=loader)
+    class Q:
+        def __init__(self, t: Testclass) -> None:
+            self.t = t
+
+    Q(t_kwargs={})
+    policy = loader._instance_storage.get_policy(Testclass)
+
+    assert isinstance(policy, LRUPolicy)
+    assert len(policy) == 1
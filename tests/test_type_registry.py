@@ -0,0 +1,48 @@
+from smarti.type_registry import TypeRegistry, qualified_name
+
+
+class First:
+    pass
+
+
+class Second:
+    pass
+
+
+def test_register_and_contains():
+    registry = TypeRegistry()
+    assert First not in registry
+
+    registry.register(First)
+    assert First in registry
+    assert Second not in registry
+    assert len(registry) == 1
+
+    # unhashable values are never registered
+    assert [] not in registry
+
+
+def test_bulk_register_and_unregister():
+    registry = TypeRegistry([First])
+    registry.register_all([Second, First])
+    assert list(registry) == [First, Second]
+
+    registry.unregister_all([First, Second])
+    assert len(registry) == 0
+    assert registry.get_by_name(qualified_name(First)) is None
+    assert registry.get_by_module(__name__) == []
+
+    # unknown classes are ignored
+    registry.unregister(First)
+
+
+def test_indices():
+    registry = TypeRegistry([First, Second])
+
+    assert qualified_name(First) == f"{__name__}.First"
+    assert registry.get_by_name(f"{__name__}.First") is First
+    assert registry.get_by_module(__name__) == [First, Second]
+
+    registry.unregister(First)
+    assert registry.get_by_name(f"{__name__}.First") is None
+    assert registry.get_by_module(__name__) == [Second]